@@ -2,26 +2,63 @@ import requests
 import json
 import time
 import warnings
-from math import radians, cos, sin, sqrt, atan2
-from collections import defaultdict
+from math import radians, cos, sin, sqrt, atan2, log
+from collections import defaultdict, namedtuple, OrderedDict, Counter
+from functools import lru_cache
 import pandas as pd
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
+from tkinter import simpledialog
 import tkinter.font as tkFont
 from urllib.parse import urlparse, parse_qs
-from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from datetime import datetime, timedelta
 from tkinter import filedialog
 import os
+import sys
+import platform
 import threading
 import openpyxl
 import traceback
+import tempfile
+import queue
+import random
+import statistics
+import tracemalloc
+import argparse
 import re
-from concurrent.futures import ThreadPoolExecutor
+import zlib
+import sqlite3
+import hashlib
+import itertools
+import bisect
+import difflib
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait as futures_wait
+import multiprocessing
 from tkinter import font
 from urllib3.exceptions import InsecureRequestWarning
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+from requests.adapters import HTTPAdapter
+
+try:
+    import pyarrow  # optional: Parquet-Export
+except ImportError:
+    pyarrow = None
+try:
+    import resource  # nur Unix: maximale Speicherbelegung (RSS) für den Lasttest
+except ImportError:
+    resource = None
+try:
+    import httpx  # optional: HTTP/2 (zusätzlich 'h2' nötig, z. B. pip install "httpx[http2]")
+except ImportError:
+    httpx = None
 warnings.simplefilter("ignore", InsecureRequestWarning)
 
+__version__ = "2.0.0"
+
 
 # ============================================
 # 🔍 API Anbindung
@@ -29,13 +66,209 @@ warnings.simplefilter("ignore", InsecureRequestWarning)
 # ============================================
 # Anzupassen, falls neue API Anbindung verfügbar
 # ============================================
-session = requests.Session()
-session.headers.update({
+API_URL = "https://rest.arbeitsagentur.de/infosysbub/absuche/pc/v1/ausbildungsangebot"
+# Detailansicht eines einzelnen Angebots (Preise, Dauer, Termine).
+# Nicht offiziell dokumentiert, sondern aus dem Muster der Suche abgeleitet:
+# Liefert der Endpunkt nur 404, schaltet sich die Anreicherung für den Lauf ab.
+DETAIL_URL = API_URL + "/{angebot_id}"
+
+# Standard-Seitengröße; wird durch einen gespeicherten Autotuning-Wert ersetzt
+PAGE_SIZE = 20
+
+# Bekannte Obergrenze der API (siehe Hinweise im README): Meldet sie genau so
+# viele Treffer, ist das Ergebnis vermutlich abgeschnitten und gilt als unvollständig.
+API_RESULT_CAP = 50
+
+API_HEADERS = {
     'User-Agent': 'Ausbildungssuche/1.0 (de.arbeitsagentur.ausbildungssuche)',
-    'Host': 'rest.arbeitsagentur.de',
     'X-API-Key': 'infosysbub-absuche',
-    'Connection': 'keep-alive',
-})
+}
+
+# Globales Budget gleichzeitiger API-Requests – gilt für alle Threads
+# (Seitenabruf, Mehrfach-Links, Matrix-Suche) gemeinsam.
+API_MAX_CONCURRENCY = 6
+api_semaphore = threading.BoundedSemaphore(API_MAX_CONCURRENCY)
+
+
+# ============================================
+# 🔌 Transport (Verbindungspool, Retries, HTTP/2)
+# ============================================
+# Der Pool hält genau so viele Verbindungen offen, wie Requests gleichzeitig
+# laufen dürfen – jede Seite nutzt eine bestehende Verbindung, TCP- und
+# TLS-Handshake fallen nur einmal pro Verbindung an.
+API_POOL_SIZE = API_MAX_CONCURRENCY
+API_TIMEOUT = 30        # Sekunden je Request
+API_RETRIES = 3         # bei Verbindungsfehlern sowie 429/5xx
+API_RETRY_BACKOFF = 0.5
+API_RETRY_STATUS = (429, 500, 502, 503, 504)
+USE_HTTP2 = True        # nur wirksam, wenn httpx und h2 installiert sind
+
+_transport_counts = {'requests': 0, 'new_connections': 0, 'retries': 0}
+_transport_lock = threading.Lock()
+_http_version = "HTTP/1.1"
+_warmed_up = threading.Event()
+
+def _count_transport(key):
+    with _transport_lock:
+        _transport_counts[key] += 1
+
+
+class _CountingPoolMixin:
+    """Zählt Requests und neu aufgebaute Verbindungen eines urllib3-Pools."""
+    def _new_conn(self):
+        _count_transport('new_connections')
+        return super()._new_conn()
+
+    def urlopen(self, *args, **kwargs):
+        _count_transport('requests')
+        return super().urlopen(*args, **kwargs)
+
+
+class CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class CountingRetry(Retry):
+    """Retry-Strategie, die jede Wiederholung mitzählt."""
+    def increment(self, *args, **kwargs):
+        _count_transport('retries')
+        return super().increment(*args, **kwargs)
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter mit zählenden Verbindungspools."""
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': CountingHTTPConnectionPool,
+            'https': CountingHTTPSConnectionPool,
+        }
+
+
+def create_session():
+    """
+    🔌 Erstellt die gemeinsame requests-Session für alle API-Zugriffe.
+    pool_block=True verhindert, dass bei Lastspitzen zusätzliche Verbindungen
+    auf- und gleich wieder abgebaut werden.
+    """
+    retry = CountingRetry(
+        total=API_RETRIES,
+        backoff_factor=API_RETRY_BACKOFF,
+        status_forcelist=API_RETRY_STATUS,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = PooledAdapter(pool_connections=2, pool_maxsize=API_POOL_SIZE, pool_block=True, max_retries=retry)
+    new_session = requests.Session()
+    new_session.headers.update(API_HEADERS)
+    new_session.mount("https://", adapter)
+    new_session.mount("http://", adapter)
+    return new_session
+
+
+def _create_http2_client():
+    """
+    Liefert einen httpx-Client mit HTTP/2 (alle Requests über eine Verbindung
+    gemultiplext) oder None, falls httpx/h2 fehlen oder HTTP/2 abgeschaltet ist.
+    """
+    if not USE_HTTP2 or httpx is None:
+        return None
+    try:
+        transport = httpx.HTTPTransport(
+            http2=True, verify=False, retries=API_RETRIES,
+            limits=httpx.Limits(max_connections=API_POOL_SIZE, max_keepalive_connections=API_POOL_SIZE),
+        )
+        return httpx.Client(transport=transport, headers=API_HEADERS, timeout=API_TIMEOUT)
+    except ImportError:  # h2 nicht installiert
+        return None
+
+
+session = create_session()
+http2_client = _create_http2_client()
+
+
+def _httpx_trace(event, info):
+    # httpcore meldet jeden neuen TCP-Verbindungsaufbau über die Trace-Erweiterung
+    if event == "connection.connect_tcp.complete":
+        _count_transport('new_connections')
+
+
+def _retry_delay(response, attempt):
+    """Wartezeit vor der nächsten Wiederholung: Retry-After der API oder exponentieller Backoff."""
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return min(float(retry_after), API_TIMEOUT)
+    return API_RETRY_BACKOFF * (2 ** attempt)
+
+
+def api_get(url, params=None, method="GET"):
+    """
+    📡 Einziger Einstiegspunkt für HTTP-Requests an die API.
+    Nutzt HTTP/2 über httpx, falls verfügbar, sonst die requests-Session.
+    In beiden Fällen werden 429/5xx bis zu API_RETRIES-mal wiederholt.
+    Fehler werden immer als requests.exceptions.* gemeldet.
+    """
+    global _http_version
+    if http2_client is not None:
+        for attempt in range(API_RETRIES + 1):
+            try:
+                response = http2_client.request(method, url, params=params, extensions={"trace": _httpx_trace})
+            except httpx.TimeoutException as e:
+                raise requests.exceptions.Timeout(str(e)) from e
+            except httpx.HTTPError as e:
+                raise requests.exceptions.ConnectionError(str(e)) from e
+            _count_transport('requests')
+            _http_version = response.http_version
+            if response.status_code not in API_RETRY_STATUS or attempt == API_RETRIES:
+                return response
+            _count_transport('retries')
+            response.close()
+            time.sleep(_retry_delay(response, attempt))
+    return session.request(method, url, params=params, verify=False, timeout=API_TIMEOUT)
+
+
+def warm_up_connections(count=API_POOL_SIZE, force=False):
+    """
+    🔥 Baut vor dem ersten Abruf bis zu `count` Verbindungen parallel auf (HEAD-Requests),
+    damit die ersten Seiten keine Handshakes mehr abwarten müssen.
+    Geschieht einmal je Programmlauf – danach hält der Pool die Verbindungen offen
+    (mit `force=True` erneut). Bei HTTP/2 genügt eine Verbindung.
+    """
+    if _warmed_up.is_set() and not force:
+        return
+    _warmed_up.set()
+    if http2_client is not None:
+        count = 1
+
+    def ping():
+        try:
+            with api_semaphore:
+                api_get(API_URL, method="HEAD")
+        except requests.exceptions.RequestException as e:
+            print(f"Warm-up fehlgeschlagen: {e}")
+
+    threads = [threading.Thread(target=ping, daemon=True) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def transport_stats():
+    """
+    📊 Kennzahlen zur Verbindungsnutzung seit Programmstart:
+    Requests, neu aufgebaute Verbindungen, wiederverwendete Verbindungen, Retries
+    (für requests/urllib3 und httpx gleichermaßen).
+    """
+    with _transport_lock:
+        stats = dict(_transport_counts)
+    stats['reused'] = max(0, stats['requests'] - stats['new_connections'])
+    stats['http_version'] = _http_version
+    return stats
 
 # ============================================
 # 📍 GEO- und API-Hilfsfunktionen
@@ -91,24 +324,193 @@ def is_within_radius(offer, center_lat, center_lon, radius_km):
         # Catch any other unexpected errors, although the checks above should prevent most
         print(f"An unexpected error occurred in is_within_radius for offer {offer.get('id', 'N/A')}: {e}")
         return False
-    
-    
+
+
+# ============================================
+# 🗺️ Ortsverzeichnis (Offline-Gazetteer)
+# ============================================
+# Mitgeliefert wird ein kompaktes Verzeichnis deutscher Städte. Liegt die
+# GeoNames-Postleitzahlendatei 'DE.txt' neben dem Programm, wird stattdessen
+# diese geladen (vollständige PLZ-Abdeckung).
+GAZETTEER_FILE = "gazetteer_de.tsv"
+GEONAMES_FILE = "DE.txt"
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+# Ein Eintrag des Ortsverzeichnisses; `region` (Kreis, Bundesland) unterscheidet
+# gleichnamige Orte und ist beim mitgelieferten Verzeichnis leer.
+Place = namedtuple("Place", "name lat lon region")
+
+
+class AmbiguousPlaceError(ValueError):
+    """
+    Die Ortsangabe passt auf mehrere Orte; `candidates` enthält die Auswahl (Place).
+    """
+    def __init__(self, text, candidates):
+        self.text = text
+        self.candidates = candidates
+        shown = ", ".join(place_label(p) for p in candidates[:5]) + (" …" if len(candidates) > 5 else "")
+        super().__init__(f"Ort '{text}' ist mehrdeutig ({shown}). Bitte PLZ oder Koordinaten angeben.")
+
+def resource_path(name):
+    """
+    📦 Pfad zu einer mitgelieferten Datei – funktioniert auch in der PyInstaller-.exe.
+    """
+    base = getattr(sys, "_MEIPASS", os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base, name)
+
+def app_path(name):
+    """
+    📁 Pfad zu einer Datei neben dem Skript bzw. neben der .exe (für eigene Daten).
+    """
+    if getattr(sys, "frozen", False):
+        base = os.path.dirname(sys.executable)
+    else:
+        base = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base, name)
+
+def normalize_place(text):
+    """
+    🔤 Vereinheitlicht Ortsnamen für den Vergleich
+    ('Köln' → 'koeln', 'Frankfurt (Oder)' → 'frankfurt oder').
+    """
+    text = text.strip().casefold()
+    for umlaut, replacement in (("ä", "ae"), ("ö", "oe"), ("ü", "ue"), ("ß", "ss")):
+        text = text.replace(umlaut, replacement)
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+def _read_gazetteer_rows():
+    """
+    Liefert (Name, PLZ, lat, lon, Region) aus der GeoNames-Datei oder dem mitgelieferten Verzeichnis.
+    """
+    geonames_path = app_path(GEONAMES_FILE)
+    if os.path.exists(geonames_path):
+        # GeoNames-Format: Land, PLZ, Ort, Bundesland, Code, Kreis, ..., lat (Spalte 10), lon (Spalte 11)
+        with open(geonames_path, encoding="utf-8") as f:
+            for line in f:
+                cols = line.rstrip("\n").split("\t")
+                if len(cols) >= 11:
+                    region = ", ".join(part for part in (cols[5], cols[3]) if part)
+                    yield cols[2], cols[1], float(cols[9]), float(cols[10]), region
+        return
+
+    with open(resource_path(GAZETTEER_FILE), encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            name, plz, lat, lon = line.rstrip("\n").split("\t")
+            yield name, plz, float(lat), float(lon), ""
+
+def load_gazetteer():
+    """
+    📚 Lädt das Ortsverzeichnis beim ersten Zugriff (lazy) als sortiertes Array.
+
+    Rückgabe: (keys, entries) – `keys` ist sortiert und erlaubt Präfixsuche per
+    Binärsuche, `entries[i]` ist der zugehörige Place. Gleichnamige Orte in
+    verschiedenen Kreisen bleiben getrennte Einträge (gleicher Schlüssel);
+    die PLZ-Gebiete eines Ortes werden auf ihren Mittelpunkt zusammengefasst.
+    Dauert mit 'DE.txt' einige Sekunden – in der GUI im Hintergrund aufrufen.
+    """
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                places = {}
+                postcodes = {}
+                for name, plz, lat, lon, region in _read_gazetteer_rows():
+                    entry = places.setdefault((normalize_place(name), region), [name, 0.0, 0.0, 0])
+                    entry[1] += lat
+                    entry[2] += lon
+                    entry[3] += 1
+                    if plz and plz not in postcodes:
+                        postcodes[plz] = Place(name, lat, lon, region)
+
+                index = [(key, Place(name, lat_sum / n, lon_sum / n, region))
+                         for (key, region), (name, lat_sum, lon_sum, n) in places.items()]
+                index += postcodes.items()
+                index.sort(key=lambda item: (item[0], item[1].region))
+                _gazetteer = ([key for key, _ in index], [place for _, place in index])
+    return _gazetteer
+
+def place_label(place):
+    """
+    Anzeigename eines Orts, z. B. 'Neustadt (Landkreis Coburg, Bayern)'.
+    """
+    if place.region:
+        return f"{place.name} ({place.region})"
+    return f"{place.name} ({place.lat:.4f}, {place.lon:.4f})"
+
+def lookup_places(text, limit=10):
+    """
+    🔎 Sucht Orte per Präfix (Name oder PLZ) und – falls nichts passt – unscharf.
+
+    Beispiel: 'frankf' → Frankfurt am Main, Frankfurt (Oder); 'Muenchn' → München
+    Gibt eine Liste von Place zurück, exakte Treffer zuerst.
+    """
+    key = normalize_place(text)
+    if not key:
+        return []
+    keys, entries = load_gazetteer()
+
+    results = []
+    i = bisect.bisect_left(keys, key)
+    while i < len(keys) and keys[i].startswith(key) and len(results) < limit:
+        if entries[i] not in results:
+            results.append(entries[i])
+        i += 1
+    if results:
+        return results
+
+    # 🔁 Unscharfe Suche nur innerhalb des gleichen Anfangsbuchstabens
+    lo = bisect.bisect_left(keys, key[0])
+    hi = bisect.bisect_left(keys, chr(ord(key[0]) + 1))
+    matches = difflib.get_close_matches(key, list(dict.fromkeys(keys[lo:hi])), n=limit, cutoff=0.75)
+    for m in matches:
+        results.extend(entries[bisect.bisect_left(keys, m):bisect.bisect_right(keys, m)])
+    return results[:limit]
+
+def resolve_place(text):
+    """
+    📍 Ermittelt Stadtname und Koordinaten für eine Orts- oder PLZ-Eingabe.
+    Gibt {'where', 'lat', 'lon'} zurück oder None, wenn der Ort unbekannt ist.
+    Passt die Eingabe auf mehrere Orte (gleichnamige Orte, mehrdeutiger Präfix),
+    wird AmbiguousPlaceError mit den Kandidaten geworfen – es wird nie geraten.
+    """
+    key = normalize_place(text)
+    keys, entries = load_gazetteer()
+    # Exakter Name (oder PLZ) hat Vorrang vor Präfix- und unscharfen Treffern
+    matches = entries[bisect.bisect_left(keys, key):bisect.bisect_right(keys, key)] if key else []
+    if not matches:
+        matches = lookup_places(text)
+    if not matches:
+        return None
+    if len(matches) > 1:
+        raise AmbiguousPlaceError(text, matches)
+    return place_to_params(matches[0])
+
+def place_to_params(place):
+    return {'where': place.name, 'lat': place.lat, 'lon': place.lon}
+
+
 # ============================================
 # 🔍 Datenabruf & API-Kommunikation
 # ============================================
 # ============================================
 # Anzupassen, falls neue API Anbindung verfügbar
 # ============================================
-def search(page, where, job_id, radius, bart):
+def search(page, where, job_id, radius, bart, size=None):
     """
     📡 Führt einen API-Request an die Ausbildungsstellen-API der BA aus.
-    Holt eine einzelne Seite von Ausbildungsangeboten (20 Einträge pro Seite).
+    Holt eine einzelne Seite von Ausbildungsangeboten (Seitengröße siehe get_page_size()).
     Enthält robustes Fehlerhandling bei Netzwerk- oder API-Problemen.
     """
-    url = "https://rest.arbeitsagentur.de/infosysbub/absuche/pc/v1/ausbildungsangebot"
-    params = {'page': page, 'size': 20, 'ort': where, 'uk': radius, 'ids': job_id, 'bart': bart}
+    url = API_URL
+    params = {'page': page, 'size': size or get_page_size(), 'ort': where, 'uk': radius, 'ids': job_id, 'bart': bart}
     try:
-        response = session.get(url, params=params, verify=False)
+        with api_semaphore:
+            response = api_get(url, params=params)
         return response.json()
     except requests.exceptions.Timeout as e:
         print(f"Request timed out: {e}")
@@ -125,141 +527,2141 @@ def search(page, where, job_id, radius, bart):
         return None
 
 
-# ============================================
-# ⚙️ Parallele Datensammlung (alle Seiten)
-# ============================================
-def get_all_offers(where, job_id, radius, lat, lon, bart):
+# ============================================
+# 🎛️ Seitengröße & Autotuning
+# ============================================
+# Ergebnis des Autotunings je API-Endpunkt, z. B.
+# {"<API_URL>": {"page_size": 100, "max_page_size": 200, "latency": {...}}}
+AUTOTUNE_FILE = "autotune.json"
+AUTOTUNE_CANDIDATES = (20, 50, 100, 200, 500, 1000)
+# Messungen je Seitengröße; der Median glättet einzelne Ausreißer
+AUTOTUNE_SAMPLES = 3
+
+_page_size = None
+
+def _load_autotune():
+    path = app_path(AUTOTUNE_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (ValueError, OSError) as e:
+        print(f"⚠️ Autotuning-Datei konnte nicht gelesen werden: {e}")
+        return {}
+
+def get_page_size():
+    """
+    📐 Aktuelle Seitengröße: gespeicherter Autotuning-Wert für API_URL, sonst PAGE_SIZE.
+    """
+    global _page_size
+    if _page_size is None:
+        _page_size = _load_autotune().get(API_URL, {}).get("page_size", PAGE_SIZE)
+    return _page_size
+
+def set_page_size(size):
+    """
+    Setzt die Seitengröße für alle folgenden Requests (z. B. per Kommandozeile).
+    """
+    global _page_size
+    _page_size = int(size)
+
+def autotune_page_size(where, job_id, radius, bart, candidates=AUTOTUNE_CANDIDATES, concurrency=None,
+                       samples=AUTOTUNE_SAMPLES, save=True):
+    """
+    🎛️ Ermittelt die günstigste Seitengröße für den aktuellen Endpunkt.
+
+    - Prüft nacheinander größere Seitengrößen, bis die API sie nicht mehr vollständig liefert
+    - Misst die Latenz je Seitengröße `samples`-mal (Seite 0 der Beispielsuche) und nimmt den Median
+    - Schätzt die Gesamtdauer: erste Seite + restliche Seiten in Wellen zu `concurrency`
+    - Speichert das Ergebnis je Endpunkt in AUTOTUNE_FILE (außer mit save=False)
+    Gibt die Tuning-Daten zurück.
+    """
+    concurrency = concurrency or API_MAX_CONCURRENCY
+    latency = {}
+    latency_samples = {}
+    total_elements = None
+    max_size = None
+
+    for size in sorted(candidates):
+        timings = []
+        for _ in range(max(1, samples)):
+            started = time.perf_counter()
+            result = search(0, where, job_id, radius, bart, size=size)
+            timings.append(time.perf_counter() - started)
+            if not result or '_embedded' not in result or 'page' not in result:
+                break
+        if not result or '_embedded' not in result or 'page' not in result:
+            break
+        total_elements = result['page'].get('totalElements', 0)
+        returned = len(result['_embedded'].get('termine', []))
+        # Die API kappt zu große Seiten stillschweigend → nicht mehr akzeptiert
+        if returned < min(size, total_elements) or result['page'].get('size', size) < size:
+            break
+        latency[size] = statistics.median(timings)
+        latency_samples[size] = timings
+        max_size = size
+        if size >= total_elements:
+            break
+
+    if not latency:
+        raise RuntimeError("Autotuning fehlgeschlagen: keine gültige Antwort der API.")
+
+    def estimated_wall_time(size):
+        pages = max(1, -(-total_elements // size))
+        waves = -(-(pages - 1) // concurrency)
+        return latency[size] * (1 + waves)
+
+    best = min(latency, key=estimated_wall_time)
+    tuning = {
+        'page_size': best,
+        'max_page_size': max_size,
+        'concurrency': concurrency,
+        'latency': {str(k): round(v, 4) for k, v in latency.items()},
+        'latency_samples': {str(k): [round(t, 4) for t in v] for k, v in latency_samples.items()},
+        'estimated_seconds': {str(k): round(estimated_wall_time(k), 4) for k in latency},
+        'sample_total_elements': total_elements,
+        'tuned_at': datetime.now().isoformat(timespec="seconds"),
+    }
+    if not save:
+        return tuning
+
+    data = _load_autotune()
+    data[API_URL] = tuning
+    try:
+        with open(app_path(AUTOTUNE_FILE), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        print(f"⚠️ Autotuning-Ergebnis konnte nicht gespeichert werden: {e}")
+    set_page_size(best)
+    return tuning
+
+def benchmark_page_sizes(where, job_id, radius, lat, lon, bart, sizes, repeats=AUTOTUNE_SAMPLES):
+    """
+    ⏱️ Ruft dieselbe Suche vollständig mit jeder Seitengröße ab (ohne Such-Cache)
+    und misst Round-Trips und Gesamtdauer (Median über `repeats` Läufe).
+    Seitengröße und ein vorhandener Cache-Eintrag bleiben danach unverändert.
+    Rückgabe: {Seitengröße: {'requests', 'wall_s', 'offers'}}
+    """
+    global _page_size
+    key = _search_cache_key(where, job_id, lat, lon, bart)
+    saved_size = _page_size
+    with search_cache_lock:
+        saved_entry = search_cache.get(key)
+    report = {}
+    try:
+        for size in sizes:
+            set_page_size(size)
+            timings, stats = [], {}
+            for _ in range(max(1, repeats)):
+                with search_cache_lock:
+                    search_cache.pop(key, None)
+                stats = {}
+                started = time.perf_counter()
+                offers = get_all_offers(where, job_id, radius, lat, lon, bart, stats=stats)
+                timings.append(time.perf_counter() - started)
+            report[size] = {
+                'requests': stats.get('requests', 0),
+                'wall_s': round(statistics.median(timings), 4),
+                'offers': len(offers),
+            }
+    finally:
+        _page_size = saved_size
+        with search_cache_lock:
+            search_cache.pop(key, None)
+            if saved_entry is not None:
+                search_cache[key] = saved_entry
+    return report
+
+
+# ============================================
+# ♻️ Such-Cache (Wiederverwendung größerer Radien)
+# ============================================
+# Pro Suchzentrum (Ort, Koordinaten, Job-ID, Bildungsart) wird nur die
+# vollständige Suche mit dem größten Radius aufbewahrt. Kleinere Radien
+# lassen sich daraus lokal per Haversine ableiten. Einträge verfallen nach
+# SEARCH_CACHE_TTL Sekunden; gehalten werden höchstens SEARCH_CACHE_MAX_ENTRIES
+# Suchzentren (die am längsten nicht genutzten fallen zuerst heraus).
+SEARCH_CACHE_TTL = 15 * 60
+SEARCH_CACHE_MAX_ENTRIES = 64
+
+search_cache = OrderedDict()
+search_cache_lock = threading.Lock()
+
+def _search_cache_key(where, job_id, lat, lon, bart):
+    return (where, int(job_id), int(bart), round(float(lat), 6), round(float(lon), 6))
+
+def _is_fresh(entry):
+    return time.monotonic() - entry['stored_at'] <= SEARCH_CACHE_TTL
+
+def lookup_cached_offers(where, job_id, radius, lat, lon, bart):
+    """
+    ♻️ Prüft, ob bereits eine vollständige Suche um dasselbe Zentrum mit gleichem
+    oder größerem Radius vorliegt.
+    Falls ja, werden deren Angebote lokal auf den kleineren Radius gefiltert –
+    ohne einen einzigen API-Aufruf. Gibt sonst None zurück.
+    """
+    key = _search_cache_key(where, job_id, lat, lon, bart)
+    with search_cache_lock:
+        entry = search_cache.get(key)
+        if entry is not None and not _is_fresh(entry):
+            del search_cache[key]
+            entry = None
+        if entry is not None:
+            search_cache.move_to_end(key)
+    if entry is None or entry['radius'] < radius:
+        return None
+    return [o for o in entry['offers'] if is_within_radius(o, lat, lon, radius)]
+
+def store_cached_offers(where, job_id, radius, lat, lon, bart, offers):
+    """
+    💾 Legt das Ergebnis einer vollständigen Suche im Cache ab.
+    Ein bestehender Eintrag wird nur durch einen größeren Radius ersetzt
+    (oder wenn er abgelaufen ist).
+    """
+    key = _search_cache_key(where, job_id, lat, lon, bart)
+    with search_cache_lock:
+        entry = search_cache.get(key)
+        if entry is None or entry['radius'] < radius or not _is_fresh(entry):
+            search_cache[key] = {'radius': radius, 'offers': list(offers), 'stored_at': time.monotonic()}
+        search_cache.move_to_end(key)
+        while len(search_cache) > SEARCH_CACHE_MAX_ENTRIES:
+            search_cache.popitem(last=False)
+
+def evict_cached_offers(where, job_id, lat, lon, bart):
+    """
+    🧹 Entfernt den Cache-Eintrag eines Suchzentrums (z. B. nach Abschluss einer Matrix-Gruppe).
+    """
+    with search_cache_lock:
+        search_cache.pop(_search_cache_key(where, job_id, lat, lon, bart), None)
+
+
+# ============================================
+# ⚙️ Parallele Datensammlung (alle Seiten)
+# ============================================
+# Smart Paging: Liefert die API die Treffer nach Entfernung sortiert, werden
+# die Seiten wellenweise geladen und der Abruf endet, sobald eine komplette
+# Seite außerhalb des Radius liegt. Ist die Sortierung nicht gesichert,
+# werden wie bisher alle Seiten parallel geladen.
+SMART_PAGING = True
+PAGING_ORDER_TOLERANCE_KM = 1.0
+
+def offer_distance(offer, center_lat, center_lon):
+    """
+    📏 Entfernung eines Angebots zum Suchzentrum in km (None ohne gültige Koordinaten).
+    """
+    try:
+        coords = offer['adresse']['ortStrasse']['koordinaten']
+        return haversine(center_lat, center_lon, float(coords['lat']), float(coords['lon']))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def _is_distance_sorted(distances, previous_max=float("-inf")):
+    """
+    Prüft, ob Entfernungen (bis auf eine kleine Toleranz) aufsteigend sortiert sind –
+    auch über die Grenze zur vorherigen Seite hinweg.
+    """
+    last = previous_max
+    for d in distances:
+        if d < last - PAGING_ORDER_TOLERANCE_KM:
+            return False
+        last = max(last, d)
+    return True
+
+def get_all_offers(where, job_id, radius, lat, lon, bart, stats=None, on_offers=None):
+    """
+    🚀 Ruft alle Seiten mit Ausbildungsangeboten parallel ab.
+    Startet mit Seite 0, bestimmt die Gesamtseitenzahl und lädt den Rest asynchron.
+    Nur Angebote im definierten Radius werden übernommen.
+    Liegt bereits eine vollständige Suche mit größerem Radius im Cache, wird diese
+    wiederverwendet. Sind die Treffer nach Entfernung sortiert, werden Seiten
+    jenseits des Radius gar nicht erst angefragt.
+    Optional wird `stats` mit Kennzahlen zum Abruf befüllt; `on_offers` wird
+    für jede geladene Seite mit deren Angeboten im Radius aufgerufen
+    (z. B. für Anreicherung oder Export parallel zum Abruf).
+    """
+    if on_offers is None:
+        on_offers = lambda offers: None
+    if stats is None:
+        stats = {}
+    stats.update({'cache_hit': False, 'requests': 0, 'complete': False, 'capped': False,
+                  'page_size': get_page_size(), 'pages_total': 0, 'distance_sorted': False, 'requests_saved': 0})
+
+    cached = lookup_cached_offers(where, job_id, radius, lat, lon, bart)
+    if cached is not None:
+        stats.update({'cache_hit': True, 'complete': True})
+        on_offers(cached)
+        return cached
+
+    # Seitengröße für den gesamten Durchlauf festhalten, damit die Seiten zusammenpassen
+    page_size = get_page_size()
+    first = search(0, where, job_id, radius, bart, size=page_size)
+    stats['requests'] += 1
+    if not first or '_embedded' not in first or 'termine' not in first['_embedded']:
+        return []
+    
+    total_pages = first['page']['totalPages']
+    total_elements = first['page'].get('totalElements', 0)
+    raw_count = len(first['_embedded']['termine'])
+    failed_pages = 0
+    all_offers = [o for o in first['_embedded']['termine'] if is_within_radius(o, lat, lon, radius)]
+    on_offers(all_offers)
+    stats['pages_total'] = total_pages
+
+    # 🧭 Sortierung nach Entfernung anhand der ersten Seite erkennen
+    distances = [d for d in (offer_distance(o, lat, lon) for o in first['_embedded']['termine']) if d is not None]
+    ordered = SMART_PAGING and total_pages > 1 and len(distances) > 1 and _is_distance_sorted(distances)
+    last_distance = max(distances, default=float("-inf"))
+    stopped_early = False
+
+    def fetch_page(p):
+        result = search(p, where, job_id, radius, bart, size=page_size)
+        if not result or '_embedded' not in result:
+            return None
+        return result['_embedded'].get('termine', [])
+
+    # 🧵 Lade weitere Seiten parallel (ThreadPoolExecutor)
+    with ThreadPoolExecutor(max_workers=API_MAX_CONCURRENCY) as executor:
+        remaining = list(range(1, total_pages))
+        # Sortiert: wellenweise (je Welle so viele Seiten wie parallel möglich), sonst alle auf einmal
+        wave_size = API_MAX_CONCURRENCY if ordered else len(remaining)
+        while remaining:
+            wave, remaining = remaining[:wave_size], remaining[wave_size:]
+            futures = [executor.submit(fetch_page, p) for p in wave]
+            page_outside_radius = False
+            for p, f in zip(wave, futures):
+                stats['requests'] += 1
+                try:
+                    termine = f.result()
+                except Exception as e:
+                    print(f"Fehler bei Seite: {e}")
+                    termine = None
+                if termine is None:
+                    failed_pages += 1
+                    continue
+                raw_count += len(termine)
+                page_offers = [o for o in termine if is_within_radius(o, lat, lon, radius)]
+                all_offers.extend(page_offers)
+                on_offers(page_offers)
+
+                if ordered:
+                    page_distances = [d for d in (offer_distance(o, lat, lon) for o in termine) if d is not None]
+                    if not _is_distance_sorted(page_distances, last_distance):
+                        # ⚠️ Sortierung nicht gesichert → restliche Seiten vollständig laden
+                        ordered = False
+                        wave_size = max(len(remaining), 1)
+                    elif page_distances:
+                        last_distance = max(last_distance, max(page_distances))
+                        if min(page_distances) > radius + PAGING_ORDER_TOLERANCE_KM:
+                            page_outside_radius = True
+
+            if ordered and page_outside_radius and not failed_pages:
+                stopped_early = True
+                stats['requests_saved'] = len(remaining)
+                break
+
+    stats['distance_sorted'] = ordered
+
+    # ✅ Nur vollständige Ergebnisse (nicht von der API abgeschnitten) cachen.
+    # Ist schon totalElements gekappt, hilft der Vergleich mit raw_count nicht –
+    # eine Trefferzahl genau an der bekannten Obergrenze gilt daher als abgeschnitten.
+    stats['capped'] = total_elements == API_RESULT_CAP and not stopped_early
+    if not failed_pages and (stopped_early or (raw_count >= total_elements and not stats['capped'])):
+        stats['complete'] = True
+        store_cached_offers(where, job_id, radius, lat, lon, bart, all_offers)
+
+    return all_offers
+
+
+
+# ============================================
+# 🗃️ Lokale Datenbank (Detail-Cache & gespeicherte Läufe)
+# ============================================
+DATA_DB_FILE = "apisearch.db"
+
+_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS offer_details (
+    angebot_id TEXT PRIMARY KEY,
+    fetched_at TEXT NOT NULL,
+    payload BLOB NOT NULL
+);
+
+-- Gespeicherte Läufe: ein Eintrag je Suche (Job-ID × Ort × Radius × Bildungsart)
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    job_id INTEGER NOT NULL,
+    region TEXT NOT NULL,
+    radius INTEGER NOT NULL,
+    bart INTEGER NOT NULL,
+    offer_count INTEGER NOT NULL,
+    provider_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS offers (
+    offer_id TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    titel TEXT NOT NULL DEFAULT '',     -- Suchfelder, Inhalt des Volltextindex
+    anbieter TEXT NOT NULL DEFAULT '',
+    ort TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS run_offers (
+    run_id INTEGER NOT NULL,
+    offer_id TEXT NOT NULL,
+    PRIMARY KEY (run_id, offer_id)
+);
+
+-- Vorberechnete Rollups für Trendberichte (nach jedem Lauf inkrementell aktualisiert)
+CREATE TABLE IF NOT EXISTS run_providers (
+    run_id INTEGER NOT NULL,
+    provider TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    collapsed_count INTEGER NOT NULL,
+    PRIMARY KEY (run_id, provider)
+);
+CREATE TABLE IF NOT EXISTS trend_segments (
+    job_id INTEGER NOT NULL,
+    region TEXT NOT NULL,
+    radius INTEGER NOT NULL,
+    bart INTEGER NOT NULL,
+    run_count INTEGER NOT NULL,
+    last_run_id INTEGER NOT NULL,
+    prev_run_id INTEGER,
+    last_total INTEGER NOT NULL,
+    prev_total INTEGER NOT NULL,
+    PRIMARY KEY (job_id, region, radius, bart)
+);
+CREATE TABLE IF NOT EXISTS provider_trends (
+    job_id INTEGER NOT NULL,
+    region TEXT NOT NULL,
+    radius INTEGER NOT NULL,
+    bart INTEGER NOT NULL,
+    provider TEXT NOT NULL,
+    first_seen_run INTEGER NOT NULL,
+    last_seen_run INTEGER NOT NULL,
+    last_count INTEGER NOT NULL,
+    prev_count INTEGER NOT NULL,
+    PRIMARY KEY (job_id, region, radius, bart, provider)
+);
+
+-- Delta-Abruf: Signatur je Suchanfrage und Inhalts-Hash je Seite
+CREATE TABLE IF NOT EXISTS query_signatures (
+    query_key TEXT PRIMARY KEY,
+    signature TEXT NOT NULL,
+    checked_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS page_hashes (
+    query_key TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    offers BLOB NOT NULL,
+    PRIMARY KEY (query_key, page)
+);
+"""
+
+# Volltextindex über Titel, Anbieter und Ort als External-Content-Tabelle:
+# die Texte stehen nur in offers (rowid = rowid in offers), Trigger halten den
+# Index bei jedem INSERT/UPDATE/DELETE aktuell. offers hat eine implizite rowid –
+# nach einem VACUUM den Index mit 'fts --rebuild' neu aufbauen.
+_FTS_SCHEMA = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS offers_fts USING fts5(
+        titel, anbieter, ort,
+        content = 'offers', content_rowid = 'rowid',
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS offers_fts_insert AFTER INSERT ON offers BEGIN
+        INSERT INTO offers_fts (rowid, titel, anbieter, ort) VALUES (new.rowid, new.titel, new.anbieter, new.ort);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS offers_fts_delete AFTER DELETE ON offers BEGIN
+        INSERT INTO offers_fts (offers_fts, rowid, titel, anbieter, ort)
+        VALUES ('delete', old.rowid, old.titel, old.anbieter, old.ort);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS offers_fts_update AFTER UPDATE OF titel, anbieter, ort ON offers BEGIN
+        INSERT INTO offers_fts (offers_fts, rowid, titel, anbieter, ort)
+        VALUES ('delete', old.rowid, old.titel, old.anbieter, old.ort);
+        INSERT INTO offers_fts (rowid, titel, anbieter, ort) VALUES (new.rowid, new.titel, new.anbieter, new.ort);
+    END""",
+)
+
+# PRAGMA user_version der Datenbank; open_database migriert ältere Stände automatisch
+# 1: Suchfelder in offers, offers_fts als External-Content-Index mit Triggern
+DB_SCHEMA_VERSION = 1
+FTS_BATCH_SIZE = 1000
+
+def open_database(path=None, shared=False):
+    """
+    🗃️ Öffnet die lokale SQLite-Datenbank (neben dem Programm), legt fehlende Tabellen an
+    und migriert Datenbanken älterer Versionen.
+    Jeder Thread sollte eine eigene Verbindung verwenden; mit `shared=True` darf die
+    Verbindung threadübergreifend genutzt werden (Zugriffe dann selbst per Lock schützen).
+    """
+    conn = sqlite3.connect(path or app_path(DATA_DB_FILE), timeout=30, check_same_thread=not shared)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_DB_SCHEMA)
+    if conn.execute("PRAGMA user_version").fetchone()[0] < DB_SCHEMA_VERSION:
+        _migrate_database(conn)
+    for statement in _FTS_SCHEMA:
+        conn.execute(statement)
+    return conn
+
+def _migrate_database(conn):
+    """
+    Hebt eine Datenbank auf DB_SCHEMA_VERSION an (eine Transaktion; parallel
+    startende Prozesse warten aufeinander und migrieren nur einmal).
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(offers)")}
+            for column in ("titel", "anbieter", "ort"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE offers ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+            # Alter Index speicherte die Texte selbst → durch External-Content-Index ersetzen
+            conn.execute("DROP TABLE IF EXISTS offers_fts")
+            _update_search_fields(conn)
+            for statement in _FTS_SCHEMA:
+                conn.execute(statement)
+            conn.execute("INSERT INTO offers_fts (offers_fts) VALUES ('rebuild')")
+        conn.execute(f"PRAGMA user_version = {DB_SCHEMA_VERSION}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+def pack_json(obj):
+    """Speichert JSON kompakt: ohne Leerzeichen und zlib-komprimiert."""
+    return zlib.compress(json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+def unpack_json(blob):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+# ============================================
+# 🔂 Delta-Abruf (nur geänderte Suchen neu laden)
+# ============================================
+# Für wiederkehrende Suchen (z. B. nächtliche Matrix-Suche): Je Suchanfrage
+# wird eine Signatur gespeichert (Trefferzahl, Seitenzahl), je Seite ein
+# Inhalts-Hash samt Angeboten im Radius.
+# - Stichprobe (Standard): erste, letzte und DELTA_SAMPLE_PAGES zufällige
+#   Seiten laden und einzeln vergleichen. Stimmt alles, werden die gespeicherten
+#   Angebote übernommen – das Ergebnis gilt dann aber nur als 'stichprobe',
+#   nicht als vollständig geprüft.
+# - Vollständige Prüfung (bei Abweichung oder mit DELTA_VERIFY_ALL): jede Seite
+#   wird genau einmal geladen und einzeln verglichen; nur geänderte Seiten werden
+#   neu ausgewertet und in der Datenbank ersetzt.
+DELTA_CRAWL = False
+DELTA_SAMPLE_PAGES = 2
+DELTA_VERIFY_ALL = False
+
+def _delta_query_key(where, job_id, radius, lat, lon, bart, page_size):
+    return f"{where}|{job_id}|{radius}|{round(float(lat), 6)}|{round(float(lon), 6)}|{bart}|{page_size}"
+
+def _page_hash(termine):
+    return hashlib.sha1(json.dumps(termine, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def get_offers_delta(where, job_id, radius, lat, lon, bart, stats=None, on_offers=None, db_path=None,
+                     verify_all=None):
+    """
+    🔂 Wie get_all_offers, aber mit Delta-Abgleich gegen den letzten Abruf.
+
+    `stats` erhält zusätzlich 'delta' ('neu', 'geändert', 'unverändert' oder
+    'stichprobe' = nur die geladenen Seiten geprüft, Ergebnis nicht 'complete'),
+    'pages_changed', 'pages_unchanged' und 'pages_unverified'.
+    """
+    if on_offers is None:
+        on_offers = lambda offers: None
+    if stats is None:
+        stats = {}
+    if verify_all is None:
+        verify_all = DELTA_VERIFY_ALL
+
+    # Größere Suche um dasselbe Zentrum bereits im Speicher → wie gewohnt ableiten
+    if lookup_cached_offers(where, job_id, radius, lat, lon, bart) is not None:
+        return get_all_offers(where, job_id, radius, lat, lon, bart, stats=stats, on_offers=on_offers)
+
+    page_size = get_page_size()
+    key = _delta_query_key(where, job_id, radius, lat, lon, bart, page_size)
+
+    first = search(0, where, job_id, radius, bart, size=page_size)
+    if not first or '_embedded' not in first or 'termine' not in first['_embedded']:
+        return get_all_offers(where, job_id, radius, lat, lon, bart, stats=stats, on_offers=on_offers)
+    total_pages = first['page']['totalPages']
+    total_elements = first['page'].get('totalElements', 0)
+    signature = json.dumps([total_elements, total_pages])
+    fetched = {0: first['_embedded']['termine']}  # Seite → Termine (ungefiltert)
+    failed = set()
+    requests_sent = 1
+
+    def fetch_pages(pages):
+        nonlocal requests_sent
+        def fetch_page(p):
+            result = search(p, where, job_id, radius, bart, size=page_size)
+            if not result or '_embedded' not in result:
+                return None
+            return result['_embedded'].get('termine', [])
+        with ThreadPoolExecutor(max_workers=API_MAX_CONCURRENCY) as executor:
+            for p, termine in zip(pages, executor.map(fetch_page, pages)):
+                requests_sent += 1
+                if termine is None:
+                    failed.add(p)
+                else:
+                    fetched[p] = termine
+
+    def matches(page):
+        return page in fetched and stored_hashes.get(page) == _page_hash(fetched[page])
+
+    conn = open_database(db_path)
+    try:
+        row = conn.execute("SELECT signature FROM query_signatures WHERE query_key = ?", (key,)).fetchone()
+        stored_hashes = dict(conn.execute(
+            "SELECT page, content_hash FROM page_hashes WHERE query_key = ?", (key,)
+        ).fetchall())
+        known = bool(row) and row[0] == signature and set(stored_hashes) == set(range(total_pages))
+
+        # 🔍 Stichprobe: letzte Seite und einige zufällige Seiten dazwischen
+        if known and not verify_all and matches(0):
+            middle = range(1, total_pages - 1)
+            sample = random.sample(middle, min(DELTA_SAMPLE_PAGES, len(middle)))
+            fetch_pages(([total_pages - 1] if total_pages > 1 else []) + sample)
+            if all(matches(p) for p in fetched) and not failed:
+                offers = []
+                for (blob,) in conn.execute(
+                    "SELECT offers FROM page_hashes WHERE query_key = ? ORDER BY page", (key,)
+                ):
+                    offers.extend(unpack_json(blob))
+                stats.update({'cache_hit': False, 'requests': requests_sent, 'complete': False, 'capped': False,
+                              'page_size': page_size, 'pages_total': total_pages, 'distance_sorted': False,
+                              'requests_saved': total_pages - len(fetched),
+                              'delta': 'stichprobe', 'pages_changed': 0, 'pages_unchanged': len(fetched),
+                              'pages_unverified': total_pages - len(fetched)})
+                with conn:
+                    conn.execute("UPDATE query_signatures SET checked_at = ? WHERE query_key = ?",
+                                 (datetime.now().isoformat(timespec="seconds"), key))
+                on_offers(offers)
+                return offers
+
+        # 🔄 Vollständig prüfen: jede noch nicht geladene Seite genau einmal laden
+        failed.clear()
+        fetch_pages([p for p in range(1, total_pages) if p not in fetched])
+        offers, changed, unchanged = [], {}, 0
+        for page in sorted(fetched):
+            if matches(page):
+                # ♻️ Seite unverändert → gespeicherte Angebote im Radius übernehmen
+                (blob,) = conn.execute("SELECT offers FROM page_hashes WHERE query_key = ? AND page = ?",
+                                       (key, page)).fetchone()
+                page_offers = unpack_json(blob)
+                unchanged += 1
+            else:
+                page_offers = [o for o in fetched[page] if is_within_radius(o, lat, lon, radius)]
+                changed[page] = (_page_hash(fetched[page]), pack_json(page_offers))
+            offers.extend(page_offers)
+            on_offers(page_offers)
+
+        raw_count = sum(len(termine) for termine in fetched.values())
+        capped = total_elements == API_RESULT_CAP
+        complete = not failed and raw_count >= total_elements and not capped
+        if row is None:
+            delta = 'neu'
+        elif row[0] != signature or changed:
+            delta = 'geändert'
+        elif not failed:
+            delta = 'unverändert'
+        else:
+            delta = 'stichprobe'  # nicht alle Seiten geladen, die geladenen unverändert
+        stats.update({'cache_hit': False, 'requests': requests_sent, 'complete': complete, 'capped': capped,
+                      'page_size': page_size, 'pages_total': total_pages, 'distance_sorted': False,
+                      'requests_saved': 0, 'delta': delta, 'pages_changed': len(changed),
+                      'pages_unchanged': unchanged, 'pages_unverified': 0})
+
+        if complete:
+            store_cached_offers(where, job_id, radius, lat, lon, bart, offers)
+            with conn:
+                conn.executemany(
+                    "REPLACE INTO page_hashes (query_key, page, content_hash, offers) VALUES (?, ?, ?, ?)",
+                    ((key, page, h, blob) for page, (h, blob) in changed.items()),
+                )
+                # Seiten, die es nicht mehr gibt (weniger Seiten), verwerfen
+                conn.execute("DELETE FROM page_hashes WHERE query_key = ? AND page >= ?", (key, total_pages))
+                conn.execute(
+                    "REPLACE INTO query_signatures (query_key, signature, checked_at) VALUES (?, ?, ?)",
+                    (key, signature, datetime.now().isoformat(timespec="seconds")),
+                )
+        return offers
+    finally:
+        conn.close()
+
+
+# ============================================
+# 💽 Speicherbegrenzter Angebotsspeicher
+# ============================================
+# Für große Matrix-Suchen auf kleinen Rechnern: Ist MEMORY_CAP_MB gesetzt,
+# werden Angebote komprimiert im Speicher gehalten, bis die Grenze erreicht
+# ist; alle weiteren landen in einer temporären SQLite-Datei. Duplikate
+# werden über einen Bloom-Filter vorgeprüft, sodass nur mögliche Treffer
+# auf der Festplatte nachgeschlagen werden müssen.
+# Die Grenze gilt für die komprimierten Angebote selbst, nicht für den
+# gesamten Prozessspeicher (Python-Objekte, Such-Cache, pandas kommen hinzu).
+MEMORY_CAP_MB = None  # None = unbegrenzt (normale dicts)
+# Startgröße des Bloom-Filters, falls die erwartete Anzahl unbekannt ist;
+# wird sie überschritten, kommt ein doppelt so großer Filter hinzu
+BLOOM_INITIAL_CAPACITY = 10_000
+BLOOM_ERROR_RATE = 0.01
+SPILL_COMMIT_EVERY = 1000
+
+class BloomFilter:
+    """
+    🌸 Kompakte Mengenprüfung: `key in bloom` ist bei False sicher nicht
+    enthalten, bei True nur wahrscheinlich (Fehlerrate ≈ error_rate).
+    """
+    def __init__(self, capacity=BLOOM_INITIAL_CAPACITY, error_rate=BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.count = 0
+        self.size = max(8, int(-capacity * log(error_rate) / (log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class OfferStore:
+    """
+    📦 Dict-ähnlicher Angebotsspeicher (ID → Angebot) mit fester Speichergrenze.
+
+    - Angebote werden als komprimiertes JSON gehalten (pack_json); `memory_cap_mb`
+      begrenzt die Summe dieser komprimierten Daten, nicht den Prozessspeicher
+    - Oberhalb von `memory_cap_mb` wird in eine temporäre SQLite-Datei ausgelagert
+    - Schlüssel werden immer als str abgelegt (wie in der SQLite-Datei), `store[123]`
+      und `store["123"]` sind also dasselbe Angebot
+    - Der Bloom-Filter wird für `expected_count` Angebote angelegt und wächst bei Bedarf
+    - values()/items() lesen ausgelagerte Angebote blockweise (streamend)
+    - close() löscht die temporäre Datei
+    """
+    def __init__(self, memory_cap_mb=None, expected_count=None):
+        cap = memory_cap_mb if memory_cap_mb is not None else MEMORY_CAP_MB
+        self.memory_cap = int((cap or 0) * 1024 * 1024)
+        self.memory_bytes = 0
+        self._memory = {}
+        self._blooms = [BloomFilter(max(expected_count or 0, BLOOM_INITIAL_CAPACITY))]
+        self._conn = None
+        self._path = None
+        self._disk_count = 0
+        self._pending = 0
+        self._lock = threading.RLock()
+
+    def _spill_connection(self):
+        if self._conn is None:
+            fd, self._path = tempfile.mkstemp(prefix="apisearch_spill_", suffix=".db")
+            os.close(fd)
+            self._conn = sqlite3.connect(self._path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=OFF")
+            self._conn.execute("PRAGMA synchronous=OFF")
+            self._conn.execute("CREATE TABLE offers (offer_id TEXT PRIMARY KEY, payload BLOB NOT NULL)")
+        return self._conn
+
+    def _disk_get(self, key):
+        if self._conn is None:
+            return None
+        row = self._conn.execute("SELECT payload FROM offers WHERE offer_id = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _maybe_contains(self, key):
+        return any(key in bloom for bloom in self._blooms)
+
+    def _bloom_add(self, key):
+        bloom = self._blooms[-1]
+        if bloom.count >= bloom.capacity:
+            # Voll → weiterer Filter mit doppelter Kapazität und halber Fehlerrate,
+            # damit die Gesamt-Fehlerrate unter 2 × BLOOM_ERROR_RATE bleibt
+            bloom = BloomFilter(bloom.capacity * 2, bloom.error_rate / 2)
+            self._blooms.append(bloom)
+        bloom.add(key)
+
+    def __contains__(self, key):
+        key = str(key)
+        with self._lock:
+            if not self._maybe_contains(key):
+                return False
+            return key in self._memory or self._disk_get(key) is not None
+
+    def __getitem__(self, key):
+        key = str(key)
+        with self._lock:
+            blob = self._memory.get(key)
+            if blob is None and self._maybe_contains(key):
+                blob = self._disk_get(key)
+            if blob is None:
+                raise KeyError(key)
+            return unpack_json(blob)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, offer):
+        key = str(key)
+        blob = pack_json(offer)
+        with self._lock:
+            if key in self._memory:
+                self.memory_bytes += len(blob) - len(self._memory[key])
+                self._memory[key] = blob
+                return
+            exists_on_disk = self._maybe_contains(key) and self._disk_get(key) is not None
+            if not exists_on_disk and self.memory_bytes + len(blob) <= self.memory_cap:
+                self._memory[key] = blob
+                self.memory_bytes += len(blob)
+            else:
+                self._spill_connection().execute(
+                    "INSERT OR REPLACE INTO offers (offer_id, payload) VALUES (?, ?)", (key, blob)
+                )
+                if not exists_on_disk:
+                    self._disk_count += 1
+                self._pending += 1
+                if self._pending >= SPILL_COMMIT_EVERY:
+                    self._conn.commit()
+                    self._pending = 0
+            if not exists_on_disk:
+                self._bloom_add(key)
+
+    def setdefault(self, key, offer):
+        with self._lock:
+            if key in self:
+                return self[key]
+            self[key] = offer
+            return offer
+
+    def update(self, offers):
+        for key, offer in offers.items():
+            self[key] = offer
+
+    def __len__(self):
+        return len(self._memory) + self._disk_count
+
+    def __iter__(self):
+        return self.keys()
+
+    def keys(self):
+        return (key for key, _ in self._blobs())
+
+    def values(self):
+        return (unpack_json(blob) for _, blob in self._blobs())
+
+    def items(self):
+        return ((key, unpack_json(blob)) for key, blob in self._blobs())
+
+    def _blobs(self, chunk_size=500):
+        yield from list(self._memory.items())
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.commit()
+        last_key = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT offer_id, payload FROM offers WHERE offer_id > ? ORDER BY offer_id LIMIT ?",
+                    (last_key, chunk_size),
+                ).fetchall()
+            if not rows:
+                return
+            yield from rows
+            last_key = rows[-1][0]
+
+    def close(self):
+        with self._lock:
+            self._memory.clear()
+            self.memory_bytes = 0
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                try:
+                    os.remove(self._path)
+                except OSError:
+                    pass
+
+
+def new_offer_store(memory_cap_mb=None, expected_count=None):
+    """
+    Liefert einen Angebotsspeicher: ein normales dict oder – mit Speichergrenze –
+    einen OfferStore, der auf die Festplatte auslagert.
+    """
+    if (memory_cap_mb if memory_cap_mb is not None else MEMORY_CAP_MB):
+        return OfferStore(memory_cap_mb, expected_count)
+    return {}
+
+
+class RunOfferStore:
+    """
+    🧹 Angebotsspeicher eines GUI-Laufs mit zwei Nutzern: dem Hintergrund-Thread
+    (Auswertung, Export) und dem Fortschrittsfenster (Export-Knopf, Ergebnisansicht).
+    Wer ihn zuletzt freigibt, schließt ihn – samt temporärer Auslagerungsdatei.
+    """
+    OWNERS = ("task", "window")
+
+    def __init__(self):
+        self.offers = None
+        self.index = None               # Future aus build_offer_index(); liest noch aus dem Speicher
+        self._pending = set(self.OWNERS)
+        self._lock = threading.Lock()
+
+    def release(self, owner):
+        with self._lock:
+            self._pending.discard(owner)
+            if self._pending or self.offers is None:
+                return
+            offers, self.offers = self.offers, None
+        if self.index is not None:
+            futures_wait([self.index])
+        if isinstance(offers, OfferStore):
+            offers.close()
+
+
+def dump_offers_json(items, f, indent=4):
+    """
+    💾 Schreibt (ID, Angebot)-Paare als JSON-Objekt Eintrag für Eintrag in die Datei
+    (gleiches Format wie json.dump, aber ohne das Ganze im Speicher aufzubauen).
+    """
+    pad = " " * indent
+    f.write("{")
+    first = True
+    for key, offer in items:
+        f.write("\n" if first else ",\n")
+        first = False
+        body = json.dumps(offer, ensure_ascii=False, indent=indent).replace("\n", "\n" + pad)
+        f.write(f"{pad}{json.dumps(str(key), ensure_ascii=False)}: {body}")
+    f.write("}" if first else "\n}")
+
+
+# ============================================
+# 🔬 Anreicherung mit Angebotsdetails
+# ============================================
+DETAIL_MAX_PARALLEL = 2
+# Gespeicherte Details gelten so lange als aktuell, danach werden sie neu geladen
+DETAIL_CACHE_TTL_DAYS = 7
+# So viele 404 ohne einen einzigen Treffer → Endpunkt gilt als nicht vorhanden
+DETAIL_MISSING_AFTER = 3
+
+def detail_id(offer):
+    """
+    ID für die Detailabfrage: Angebots-ID (mehrere Termine teilen sich ein Angebot).
+    """
+    return str(offer.get("angebot", {}).get("id") or offer.get("id"))
+
+def fetch_offer_detail(angebot_id):
+    """
+    📡 Lädt die Detaildaten eines Angebots.
+    Gibt (HTTP-Status, Daten) zurück; Daten sind None bei Fehlern.
+    """
+    try:
+        with api_semaphore:
+            response = api_get(DETAIL_URL.format(angebot_id=angebot_id))
+        if response.status_code != 200:
+            print(f"Detailabruf {angebot_id}: HTTP {response.status_code}")
+            return response.status_code, None
+        return 200, response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"Detailabruf {angebot_id} fehlgeschlagen: {e}")
+        return None, None
+
+
+class DetailEnricher:
+    """
+    🔬 Lädt Angebotsdetails inkrementell und parallel zum Seitenabruf.
+
+    - `submit(offers)` kann direkt als `on_offers` an get_all_offers übergeben werden
+    - Es werden nur IDs geladen, die nicht (oder vor mehr als DETAIL_CACHE_TTL_DAYS)
+      im Detail-Cache liegen
+    - Antwortet DETAIL_URL wiederholt nur mit 404, werden keine weiteren Abrufe gestartet
+    - `wait()` wartet auf ausstehende Abrufe und liefert Kennzahlen
+    - `close()` beendet Abrufe und Datenbankverbindung (auch nach Fehlern aufrufen)
+    """
+
+    def __init__(self, db_path=None, max_parallel=DETAIL_MAX_PARALLEL, ttl_days=DETAIL_CACHE_TTL_DAYS):
+        self.conn = open_database(db_path, shared=True)
+        self.conn_lock = threading.Lock()
+        fresh_since = (datetime.now() - timedelta(days=ttl_days)).isoformat(timespec="seconds")
+        self.known = {row[0] for row in self.conn.execute(
+            "SELECT angebot_id FROM offer_details WHERE fetched_at >= ?", (fresh_since,))}
+        self.queued = set()
+        self.queue_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_parallel)
+        self.futures = []
+        self.stats = {'cached': 0, 'fetched': 0, 'failed': 0, 'not_found': 0, 'endpoint_missing': False}
+        self.closed = False
+
+    def submit(self, offers):
+        with self.queue_lock:
+            if self.stats['endpoint_missing'] or self.closed:
+                return
+            for offer in offers:
+                key = detail_id(offer)
+                if key in self.queued:
+                    continue
+                self.queued.add(key)
+                if key in self.known:
+                    self.stats['cached'] += 1
+                else:
+                    self.futures.append(self.executor.submit(self._fetch, key))
+
+    def _fetch(self, key):
+        if self.stats['endpoint_missing']:
+            return
+        status, detail = fetch_offer_detail(key)
+        if detail is None:
+            with self.queue_lock:
+                self.stats['failed'] += 1
+                if status == 404:
+                    self.stats['not_found'] += 1
+                    if not self.stats['fetched'] and self.stats['not_found'] >= DETAIL_MISSING_AFTER:
+                        self.stats['endpoint_missing'] = True
+            return
+        with self.conn_lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO offer_details (angebot_id, fetched_at, payload) VALUES (?, ?, ?)",
+                (key, datetime.now().isoformat(timespec="seconds"), pack_json(detail)),
+            )
+            self.conn.commit()
+        with self.queue_lock:
+            self.known.add(key)
+            self.stats['fetched'] += 1
+
+    def wait(self):
+        for f in list(self.futures):
+            f.result()
+        self.executor.shutdown(wait=True)
+        return dict(self.stats)
+
+    def details_for(self, offers):
+        """
+        Liefert {Angebots-ID: Detaildaten} für die übergebenen Angebote aus dem Cache.
+        """
+        keys = list({detail_id(o) for o in offers})
+        details = {}
+        with self.conn_lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self.conn.execute(
+                    f"SELECT angebot_id, payload FROM offer_details WHERE angebot_id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                details.update((k, unpack_json(p)) for k, p in rows)
+        return details
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        with self.conn_lock:
+            self.conn.close()
+
+
+# ============================================
+# 🏷️ Anbieter-Normalisierung & Zusammenführung
+# ============================================
+# Schreibvarianten desselben Anbieters ('WBS TRAINING AG' vs. 'WBS Training AG
+# Berlin') werden auf einen kanonischen Namen abgebildet. Zuordnungen werden in
+# PROVIDER_CACHE_FILE gespeichert; PROVIDER_MAPPING_FILE erlaubt manuelle
+# Korrekturen im Format {"Variante": "Kanonischer Name"}.
+PROVIDER_CACHE_FILE = "anbieter_cache.json"
+PROVIDER_MAPPING_FILE = "anbieter_mapping.json"
+PROVIDER_SIMILARITY = 0.9
+
+# Rechtsformen und Füllwörter, die für den Vergleich ignoriert werden
+_PROVIDER_STOPWORDS = {
+    "gmbh", "ggmbh", "mbh", "ag", "kg", "co", "ug", "haftungsbeschraenkt",
+    "se", "ohg", "gbr", "kgaa", "ev", "e", "v", "und", "u",
+}
+
+# MinHash-Blocking: 30 Hashes in 10 Bändern à 3 Zeilen
+_MINHASH_PERMUTATIONS = 30
+_MINHASH_ROWS = 3
+_MINHASH_SEEDS = [(i * 0x9E3779B1) & 0xFFFFFFFF for i in range(1, _MINHASH_PERMUTATIONS + 1)]
+
+def normalize_provider_name(name):
+    """
+    🔤 Vereinheitlicht Anbieternamen: Groß-/Kleinschreibung, Umlaute, Satzzeichen,
+    Leerzeichen und Rechtsformen ('GmbH', 'AG', 'e.V.' …) werden angeglichen.
+    """
+    key = normalize_place(name)
+    tokens = [t for t in key.split() if t not in _PROVIDER_STOPWORDS]
+    return " ".join(tokens) or key
+
+def _minhash_bands(key):
+    """
+    Liefert die LSH-Bänder der MinHash-Signatur über Zeichen-3-Gramme.
+    Nur Namen mit mindestens einem gemeinsamen Band werden verglichen.
+    """
+    padded = f"  {key} ".encode()
+    grams = list({padded[i:i + 3] for i in range(len(padded) - 2)})
+    # Je Seed eine eigene Hashfunktion (CRC32 mit Startwert), Minimum über alle 3-Gramme
+    signature = [min(map(zlib.crc32, grams, itertools.repeat(seed, len(grams))))
+                 for seed in _MINHASH_SEEDS]
+    return [(i, tuple(signature[i:i + _MINHASH_ROWS]))
+            for i in range(0, _MINHASH_PERMUTATIONS, _MINHASH_ROWS)]
+
+def _same_provider(key_a, key_b):
+    """
+    Prüft zwei normalisierte Namen: hohe Zeichenähnlichkeit oder
+    Standortzusatz ('wbs training' ↔ 'wbs training berlin').
+    """
+    short, long = sorted((key_a, key_b), key=len)
+    if len(short.split()) >= 2 and len(short) >= 8 and long.startswith(short + " "):
+        return True
+    return difflib.SequenceMatcher(None, key_a, key_b).ratio() >= PROVIDER_SIMILARITY
+
+
+class ProviderResolver:
+    """
+    🧩 Index zur Zuordnung von Anbieternamen zu kanonischen Anbietern.
+
+    - Bekannte Namen werden direkt über den normalisierten Schlüssel aufgelöst
+    - Neue Namen werden per MinHash-Blocking nur mit ähnlichen Kandidaten verglichen
+      (kein paarweiser Vergleich aller Namen)
+    - Ein neuer Name wird immer mit dem kanonischen Namen einer Gruppe verglichen,
+      nicht mit beliebigen Mitgliedern – Gruppen wachsen nicht über Ketten ähnlicher Namen
+    - Als kanonischer Name gilt die zuerst gesehene Variante einer Gruppe; er wird
+      gespeichert und ändert sich danach nicht mehr (stabile Schlüssel für Trendberichte),
+      sofern die Mapping-Datei nichts anderes vorgibt
+    """
+
+    def __init__(self, cache_path=None, mapping_path=None):
+        self.cache_path = cache_path or app_path(PROVIDER_CACHE_FILE)
+        self.mapping_path = mapping_path or app_path(PROVIDER_MAPPING_FILE)
+        self.lock = threading.Lock()
+        self.entity_of = {}      # normalisierter Name → Entitäts-ID
+        self.names = {}          # Entitäts-ID → kanonischer Anzeigename
+        self.buckets = defaultdict(set)
+        self.overrides = {}
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.mapping_path):
+            try:
+                with open(self.mapping_path, encoding="utf-8") as f:
+                    self.overrides = {normalize_provider_name(k): v for k, v in json.load(f).items()}
+            except (ValueError, OSError, AttributeError) as e:
+                print(f"⚠️ Anbieter-Mapping '{self.mapping_path}' ist ungültig und wird ignoriert: {e}")
+        if os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, encoding="utf-8") as f:
+                    cache = json.load(f)
+                self.names = {int(k): v for k, v in cache.get("entities", {}).items()}
+                for key, entity in cache.get("members", {}).items():
+                    self._add_member(key, entity)
+            except (ValueError, OSError) as e:
+                print(f"⚠️ Anbieter-Cache konnte nicht gelesen werden: {e}")
+
+    def _add_member(self, key, entity, bands=None):
+        self.entity_of[key] = entity
+        for band in bands or _minhash_bands(key):
+            self.buckets[band].add(key)
+
+    def resolve(self, name, key=None, bands=None):
+        """
+        Gibt den kanonischen Anbieternamen für einen Rohnamen zurück.
+        `key`/`bands` können vorab berechnet übergeben werden (siehe resolve_provider_names).
+        """
+        key = key or normalize_provider_name(name)
+        with self.lock:
+            entity = self.entity_of.get(key)
+            if entity is None:
+                bands = bands or _minhash_bands(key)
+                candidates = set()
+                for band in bands:
+                    candidates.update(self.buckets.get(band, ()))
+                # Vergleich gegen den kanonischen Namen der Kandidatengruppen (nicht transitiv)
+                entities = sorted({self.entity_of[c] for c in candidates})
+                entity = next((e for e in entities
+                               if _same_provider(key, normalize_provider_name(self.names[e]))), None)
+                if entity is None:
+                    entity = len(self.names)
+                    self.names[entity] = name
+                self._add_member(key, entity, bands)
+                self.dirty = True
+            canonical = self.names[entity]
+            if key in self.overrides:
+                return self.overrides[key]
+            return self.overrides.get(normalize_provider_name(canonical), canonical)
+
+    def save(self):
+        """
+        💾 Schreibt die gelernten Zuordnungen, damit spätere Läufe sie wiederverwenden.
+        """
+        with self.lock:
+            if not self.dirty:
+                return
+            cache = {"entities": self.names, "members": self.entity_of}
+            tmp_path = self.cache_path + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(cache, f, ensure_ascii=False)
+                os.replace(tmp_path, self.cache_path)
+                self.dirty = False
+            except OSError as e:
+                print(f"⚠️ Anbieter-Cache konnte nicht gespeichert werden: {e}")
+
+
+_provider_resolver = None
+_provider_resolver_lock = threading.Lock()
+
+def get_provider_resolver():
+    """
+    Liefert den gemeinsamen ProviderResolver (wird beim ersten Zugriff geladen).
+    """
+    global _provider_resolver
+    if _provider_resolver is None:
+        with _provider_resolver_lock:
+            if _provider_resolver is None:
+                _provider_resolver = ProviderResolver()
+    return _provider_resolver
+
+
+# ============================================
+# 📊 Anbieteranalyse & -auswertung
+# ============================================
+def offer_fingerprint(provider, title, location, beginn="", ende="", street="", offer_id=None):
+    """
+    🧬 Bildet einen kompakten Hash aus normalisiertem Anbieter, Titel, Ort, Straße und Termin.
+    Angebote mit gleichem Fingerabdruck, aber unterschiedlicher ID gelten als
+    Beinahe-Duplikate (z. B. mehrfach eingestellte Kurse desselben Anbieters).
+    Fehlen Beginn und Ende, lässt sich ein Duplikat nicht von einem weiteren Termin
+    unterscheiden – dann ist der Fingerabdruck die ID selbst (keine Zusammenfassung).
+    """
+    if not beginn and not ende:
+        fields = ("id", str(offer_id))
+    else:
+        fields = (
+            normalize_provider_name(provider),
+            normalize_place(title),
+            normalize_place(location),
+            normalize_place(street),
+            beginn,
+            ende,
+        )
+    return hashlib.blake2b("\x1f".join(fields).encode("utf-8"), digest_size=8).digest()
+
+
+def _provider_rows(data, resolve_names=True, names=None):
+    """
+    Zerlegt Angebote in kompakte Zeilen
+    (Anbieter, Rohname, ID, Ort, Titel, Beginn, Ende, Straße) für die Auswertung.
+    Jeder Rohname wird nur einmal kanonisiert; `names` übernimmt bereits
+    aufgelöste Namen (Rohname → kanonischer Name).
+    """
+    resolver = get_provider_resolver() if resolve_names else None
+    canonical = dict(names or {})
+    for offer in data:
+        try:
+            raw_name = offer["angebot"]["bildungsanbieter"]["name"]
+            name = canonical.get(raw_name)
+            if name is None:
+                name = canonical[raw_name] = resolver.resolve(raw_name) if resolver else raw_name
+            yield (
+                name,
+                raw_name,
+                offer["id"],
+                offer["adresse"]["ortStrasse"]["name"],
+                offer["angebot"]["titel"],
+                str(offer.get("beginn") or ""),
+                str(offer.get("ende") or ""),
+                offer["adresse"]["ortStrasse"].get("strasse") or "",
+            )
+        except Exception as e: # Catch other unexpected errors
+            print(f"An unexpected error occurred processing offer ID {offer.get('id', 'N/A')}: {e}")
+            continue
+
+
+def _aggregate_rows(rows):
+    """
+    Zählt Angebotszeilen je Anbieter (IDs, Standorte, Titel, Varianten, Fingerabdrücke).
+    Läuft auch in Worker-Prozessen – gibt daher ein einfaches dict zurück.
+    """
+    provider_data = defaultdict(lambda: {'ids': set(), 'locations': set(), 'titles': set(),
+                                         'variants': set(), 'fingerprints': set()})
+    for name, raw_name, offer_id, location, title, beginn, ende, street in rows:
+        p = provider_data[name]
+        p['variants'].add(raw_name)
+        p['ids'].add(offer_id)
+        p['locations'].add(location)
+        p['titles'].add(title)
+        p['fingerprints'].add(offer_fingerprint(name, title, location, beginn, ende, street, offer_id))
+
+    # 🔢 Anzahl eindeutiger Angebote pro Anbieter zählen
+    for p in provider_data.values():
+        p['count'] = len(p['ids'])
+        p['collapsed_count'] = len(p['fingerprints'])
+    return dict(provider_data)
+
+
+def count_offers_by_provider(data, resolve_names=True):
+    """
+    🧮 Gruppiert Angebote nach Bildungsanbieter.
+    Zählt eindeutige Angebote pro Anbieter, erfasst Standorte und Kurstitel.
+    Schreibvarianten eines Anbieters werden (optional) zusammengeführt.
+    Im selben Durchlauf werden Beinahe-Duplikate erkannt: 'count' ist die Zahl
+    eindeutiger IDs, 'collapsed_count' die Zahl nach Zusammenfassung der Duplikate.
+    Dient als Grundlage für die spätere Excel-Auswertung.
+    """
+    return _aggregate_rows(_provider_rows(data, resolve_names))
+
+
+# ============================================
+# ⚡ Parallele Auswertung großer Datenmengen
+# ============================================
+# Ab dieser Anzahl Angebote lohnt sich der Start eines Prozess-Pools
+PARALLEL_AGGREGATION_THRESHOLD = 50000
+# Ab dieser Anzahl verschiedener Rohnamen wird auch die Normalisierung verteilt
+PARALLEL_NORMALIZE_THRESHOLD = 5000
+AGGREGATION_WORKERS = os.cpu_count() or 1
+SHARDS_PER_WORKER = 4
+
+def _process_pool(workers):
+    """
+    Prozess-Pool mit 'spawn'-Start: Die Auswertung läuft oft in einem
+    Hintergrund-Thread der GUI, und fork() aus einem Thread heraus kopiert
+    gesperrte Locks (Tk, Logging) in die Kinder.
+    """
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+def _normalize_names(names):
+    """
+    Normalisiert Rohnamen und berechnet ihre MinHash-Bänder (läuft in Worker-Prozessen).
+    """
+    result = []
+    for name in names:
+        key = normalize_provider_name(name)
+        result.append((name, key, _minhash_bands(key)))
+    return result
+
+def _raw_provider_names(offers):
+    for offer in offers:
+        try:
+            yield offer["angebot"]["bildungsanbieter"]["name"]
+        except (KeyError, TypeError):
+            continue
+
+def resolve_provider_names(raw_names, pool=None, workers=None):
+    """
+    🏷️ Kanonisiert viele Rohnamen auf einmal: {Rohname: kanonischer Name}.
+
+    Normalisierung und MinHash-Signaturen sind zustandslos und werden bei vielen
+    Namen im Prozess-Pool berechnet; die Zuordnung zu Gruppen (zustandsbehaftet)
+    bleibt im Hauptprozess. `pool` übernimmt einen bereits laufenden Pool.
+    """
+    names = list(dict.fromkeys(raw_names))
+    resolver = get_provider_resolver()
+    workers = workers or AGGREGATION_WORKERS
+    if len(names) < PARALLEL_NORMALIZE_THRESHOLD or (pool is None and workers < 2):
+        return {name: resolver.resolve(name) for name in names}
+
+    chunk = -(-len(names) // (workers * SHARDS_PER_WORKER))
+    chunks = [names[i:i + chunk] for i in range(0, len(names), chunk)]
+    if pool is None:
+        with _process_pool(workers) as own_pool:
+            normalized = list(own_pool.map(_normalize_names, chunks))
+    else:
+        normalized = list(pool.map(_normalize_names, chunks))
+    return {name: resolver.resolve(name, key, bands)
+            for part in normalized for name, key, bands in part}
+
+def count_offers_by_provider_parallel(data, resolve_names=True, workers=None):
+    """
+    ⚡ Wie count_offers_by_provider, aber auf mehrere CPU-Kerne verteilt.
+
+    - Anbieternamen werden vorab im Pool normalisiert (resolve_provider_names)
+    - Angebote werden in kompakte Zeilen zerlegt (keine kompletten Datensätze an die Worker)
+    - Zeilen werden per Hash des Anbieternamens auf Shards verteilt, sodass jeder
+      Anbieter vollständig in genau einem Shard liegt
+    - Shards werden im Prozess-Pool ausgewertet; die Teilergebnisse sind disjunkt
+      und werden einfach zusammengeführt
+    Unterhalb von PARALLEL_AGGREGATION_THRESHOLD wird seriell gerechnet.
+    """
+    offers = data if isinstance(data, list) else list(data)
+    workers = workers or AGGREGATION_WORKERS
+    if workers < 2 or len(offers) < PARALLEL_AGGREGATION_THRESHOLD:
+        return _aggregate_rows(_provider_rows(offers, resolve_names))
+
+    merged = {}
+    with _process_pool(workers) as pool:
+        names = resolve_provider_names(_raw_provider_names(offers), pool=pool, workers=workers) if resolve_names else None
+
+        # Mehr Shards als Worker gleichen ungleich große Anbieter aus
+        shards = [[] for _ in range(workers * SHARDS_PER_WORKER)]
+        for row in _provider_rows(offers, resolve_names, names=names):
+            shards[zlib.crc32(row[0].encode("utf-8")) % len(shards)].append(row)
+
+        for partial in pool.map(_aggregate_rows, [shard for shard in shards if shard]):
+            merged.update(partial)
+    return merged
+
+
+def benchmark_aggregation(total_offers=200000, workers=None, providers=2000):
+    """
+    ⏱️ Misst serielle und parallele Anbieterauswertung auf synthetischen Angeboten
+    (gleiches Ergebnis vorausgesetzt). Rückgabe: Laufzeiten in Sekunden.
+    """
+    workers = workers or AGGREGATION_WORKERS
+    offers = []
+    for i in range(total_offers):
+        offer = _mock_offer("bench", i, total_offers)
+        offer['angebot']['bildungsanbieter']['name'] = f"Anbieter {i % providers} GmbH"
+        offers.append(offer)
+
+    started = time.perf_counter()
+    serial = count_offers_by_provider(offers, resolve_names=False)
+    serial_s = time.perf_counter() - started
+    started = time.perf_counter()
+    parallel = count_offers_by_provider_parallel(offers, resolve_names=False, workers=max(2, workers))
+    parallel_s = time.perf_counter() - started
+    if {k: v['collapsed_count'] for k, v in serial.items()} != {k: v['collapsed_count'] for k, v in parallel.items()}:
+        raise RuntimeError("Parallele Auswertung weicht von der seriellen ab.")
+    return {
+        'offers': total_offers,
+        'workers': max(2, workers),
+        'cpu_count': os.cpu_count(),
+        'serial_s': round(serial_s, 3),
+        'parallel_s': round(parallel_s, 3),
+        'speedup': round(serial_s / parallel_s, 2) if parallel_s else None,
+    }
+
+
+def find_inflated_providers(stats):
+    """
+    🚩 Liefert Anbieter, deren Rohzahl durch Beinahe-Duplikate aufgebläht ist,
+    als Liste (Anbieter, Rohzahl, bereinigte Zahl) – größte Differenz zuerst.
+    """
+    inflated = [(name, p['count'], p['collapsed_count'])
+                for name, p in stats.items() if p['count'] > p['collapsed_count']]
+    return sorted(inflated, key=lambda row: row[1] - row[2], reverse=True)
+
+
+# ============================================
+# 📤 Export der Ergebnisse nach Excel
+# ============================================
+def export_to_excel(data, search_url, filename='anbieter_stats.xlsx', metadata=None):
+    """
+    📁 Exportiert die zusammengefassten Anbieter-Daten in eine Excel-Datei.
+    Enthält Anbietername, Anzahl Angebote und Titel; Suchlink und optionale
+    Metadaten (z. B. das Lauf-Manifest) stehen einmalig im Blatt 'Metadaten'.
+    Ideal für Auswertungen und Vergleiche in Teams.
+    """
+    rows = []
+    for provider, info in data.items():
+        title = ""
+        if 'titles' in info and info['titles']:
+            title = next(iter(info['titles']), "")
+        else:
+            print(f"Skipping {provider} due to missing or empty titles")
+
+        variants = sorted(info.get('variants', ()))
+        rows.append({
+            "Anbieter": provider,
+            "Anzahl Angebote": info['count'],
+            "Anzahl ohne Duplikate": info.get('collapsed_count', info['count']),
+            "Titel": title,
+            "Namensvarianten": " | ".join(variants) if len(variants) > 1 else "",
+        })
+
+    if not rows:
+        print("No providers to export – writing metadata only.")
+    # Auch ohne Anbieter: leere Tabelle mit Spaltenköpfen, damit das Blatt 'Metadaten' den Lauf belegt
+    df = pd.DataFrame(rows, columns=["Anbieter", "Anzahl Angebote", "Anzahl ohne Duplikate", "Titel", "Namensvarianten"])
+    meta_rows = [("für Suche verwendeter Link", search_url)] + _flatten_metadata(metadata or {})
+    with pd.ExcelWriter(filename) as writer:
+        df.to_excel(writer, index=False)
+        pd.DataFrame(meta_rows, columns=["Feld", "Wert"]).to_excel(writer, sheet_name="Metadaten", index=False)
+    print(f"Exported {len(rows)} providers to {filename}")
+
+
+def _flatten_metadata(metadata, prefix=""):
+    """Verschachtelte Metadaten als (Feld, Wert)-Zeilen, z. B. ('timings_s.abruf', 1.23)."""
+    rows = []
+    for key, value in metadata.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            rows.extend(_flatten_metadata(value, name + "."))
+        elif isinstance(value, (list, tuple)):
+            rows.append((name, ", ".join(str(v) for v in value)))
+        else:
+            rows.append((name, value))
+    return rows
+
+
+# ============================================
+# 🧾 Lauf-Manifest (reproduzierbare Vergleiche)
+# ============================================
+# Jeder Export erhält eine kleine JSON-Datei mit Suchparametern, Abruf-
+# Kennzahlen, Laufzeiten je Schritt und Programmversion – so lassen sich
+# Läufe und Versionen miteinander vergleichen.
+MANIFEST_SUFFIX = ".manifest.json"
+
+def export_filename(params, directory, now=None):
+    """
+    Excel-Zielpfad eines Laufs aus Datum, Job-ID und Stadt; die übrigen Exporte
+    erhalten denselben Namen mit eigener Endung.
+    """
+    now = now or datetime.now()
+    # Zeichen ersetzen, die in Dateinamen Probleme machen
+    safe_city = re.sub(r'[\\/:*?"<>|; ]', '-', params['where']).strip('_') or "default_city"
+    return os.path.join(
+        directory,
+        f"{now:%Y-%m-%d}_{params['job_id']}_{safe_city}_Arbeitsagentur_Ausbildungssuche_{now:%H-%M-%S}.xlsx"
+    )
+
+def _base_manifest(started_at, fields, transport=None, timings=None, counts=None):
+    # Gemeinsamer Rahmen aller Manifeste; ohne eigenen API-Abruf (Dienst-Modus) kein 'transport'
+    manifest = {
+        'version': __version__,
+        'python': platform.python_version(),
+        'started_at': started_at.isoformat(timespec="seconds"),
+        'finished_at': None,  # wird nach dem Export gesetzt (finish_manifest)
+        **fields,
+        'api_url': API_URL,
+    }
+    if transport is not None:
+        manifest['transport'] = transport
+    manifest['timings_s'] = {stage: round(seconds, 3) for stage, seconds in (timings or {}).items()}
+    manifest['counts'] = counts or {}
+    return manifest
+
+def build_run_manifest(params, search_url, started_at, fetch_stats=None, transport=None,
+                       timings=None, counts=None):
+    """
+    🧾 Stellt das Manifest eines Laufs zusammen.
+    `transport` ist die Differenz von transport_stats() über den Abruf
+    (None, wenn ein Dienst abgerufen hat – dann fehlt der Eintrag).
+    """
+    query = SearchQuery(
+        where=params['where'], job_id=int(params['job_id']), radius=int(params['radius']),
+        lat=round(float(params['lat']), 6), lon=round(float(params['lon']), 6), bart=int(params['bart']),
+    )
+    fetch_stats = fetch_stats or {}
+    return _base_manifest(started_at, {
+        'query': query._asdict(),
+        'search_url': search_url,
+        'paging': {key: fetch_stats[key] for key in (
+            'page_size', 'pages_total', 'requests', 'requests_saved', 'distance_sorted',
+            'cache_hit', 'complete', 'capped', 'delta', 'pages_changed', 'pages_unchanged', 'pages_unverified',
+        ) if key in fetch_stats},
+    }, transport, timings, counts)
+
+def build_sweep_manifest(cells, started_at, delta=False, transport=None, timings=None, counts=None):
+    """
+    🧾 Manifest einer Matrix-Suche: statt einer Suchanfrage alle Suchzellen
+    mit ihrer Anzahl eindeutiger Angebote.
+    """
+    labels = sweep_place_labels(cells)
+    return _base_manifest(started_at, {
+        'sweep': {
+            'delta': bool(delta),
+            'cells': [{'job_id': int(cell.job_id), 'where': sweep_cell_place(labels, cell),
+                       'lat': round(float(cell.lat), 6), 'lon': round(float(cell.lon), 6),
+                       'radius': int(cell.radius), 'bart': int(cell.bart), 'offers': len(cell.offer_ids)}
+                      for cell in cells],
+        },
+    }, transport, timings, counts)
+
+def finish_manifest(manifest, export_seconds):
+    """Trägt nach dem Export dessen Dauer und den Endzeitpunkt ins Manifest ein."""
+    timings = manifest.setdefault('timings_s', {})
+    timings['export'] = round(export_seconds, 3)
+    if 'gesamt' in timings:
+        timings['gesamt'] = round(timings['gesamt'] + export_seconds, 3)
+    manifest['finished_at'] = datetime.now().isoformat(timespec="seconds")
+    return manifest
+
+def write_manifest(path, manifest):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+# ============================================
+# 🚚 Export-Pipeline (parallel zum Abruf)
+# ============================================
+# NDJSON entsteht fortlaufend, während die Suche läuft; Excel, JSON und Parquet
+# direkt nach dem Abruf in Hintergrund-Threads. Geschrieben wird in temporäre
+# Dateien im Exportverzeichnis; "Export starten" wartet nur noch auf die
+# Schreiber und benennt die Dateien um (os.replace).
+EXPORT_WORKERS = 3
+
+class ExportAborted(Exception):
+    """Der Lauf wurde abgebrochen (Fortschrittsfenster geschlossen)."""
+
+
+class ExportPipeline:
+    """
+    📤 Sammelt die Export-Ziele eines Laufs.
+
+    - feed(offers): Angebote seitenweise entgegennehmen (on_offers-Hook);
+      NDJSON wird dabei fortlaufend geschrieben
+    - finish(...): Excel, JSON und Parquet sofort parallel in temporäre Dateien
+      im Exportverzeichnis schreiben – am Ziel erscheint noch nichts
+    - commit(): auf die Schreiber warten und die Dateien atomar an ihr Ziel
+      verschieben (erst, wenn der Nutzer tatsächlich exportiert)
+    - abort(): Lauf verwerfen (z. B. wenn das Fenster geschlossen wird) und die
+      temporären Dateien löschen; danach sind feed/finish wirkungslos und commit
+      schlägt fehl
+    """
+    def __init__(self, directory, ndjson=False):
+        self.directory = directory
+        self.aborted = False
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS)
+        self._jobs = []
+        self._manifest = None
+        self._export_start = None
+        self._temp_files = []
+        self._ndjson_queue = None
+        self._ndjson_thread = None
+        if ndjson:
+            os.makedirs(directory, exist_ok=True)
+            self._ndjson_file = self._temp_path(".ndjson")
+            self._ndjson_queue = queue.Queue()
+            self._ndjson_thread = threading.Thread(target=self._write_ndjson, daemon=True)
+            self._ndjson_thread.start()
+
+    def _temp_path(self, suffix):
+        fd, path = tempfile.mkstemp(prefix=".~APISearch_", suffix=suffix, dir=self.directory)
+        os.close(fd)
+        self._temp_files.append(path)
+        return path
+
+    def feed(self, offers):
+        if self._ndjson_queue is not None and not self.aborted:
+            self._ndjson_queue.put(list(offers))
+
+    def _write_ndjson(self):
+        # Eigene Duplikatprüfung: Seiten können sich überschneiden
+        seen = set()
+        with open(self._ndjson_file, "w", encoding="utf-8") as f:
+            while True:
+                batch = self._ndjson_queue.get()
+                if batch is None:
+                    return
+                for offer in batch:
+                    if is_valid_offer(offer) and offer["id"] not in seen:
+                        seen.add(offer["id"])
+                        f.write(json.dumps(offer, ensure_ascii=False) + "\n")
+
+    def _stop_ndjson(self):
+        if self._ndjson_thread is not None:
+            self._ndjson_queue.put(None)
+            self._ndjson_thread.join()
+
+    def finish(self, filename, offers, stats, search_url, details=None, json_export=False, parquet=False,
+               manifest=None):
+        """
+        Startet die Schreiber für alle Formate (in temporäre Dateien). `filename` ist der
+        Excel-Zielpfad (auch ohne Anbieter – dann nur mit Blatt 'Metadaten'); die anderen
+        Formate erhalten denselben Namen mit eigener Endung. Ein `manifest` wird im Blatt
+        'Metadaten' eingetragen und beim commit() mit der Export-Dauer als
+        <Name>.manifest.json abgelegt. `offers` darf bis zum commit() nicht geschlossen werden.
+        Gibt False zurück, wenn der Lauf bereits abgebrochen wurde.
+        """
+        base = os.path.splitext(filename)[0]
+        writers = [(lambda path: export_to_excel(stats, search_url, path, manifest), ".xlsx", filename)]
+        if json_export:
+            writers.append((lambda path: self._write_json(path, offers, details), ".json", base + ".json"))
+        if parquet and pyarrow is not None:
+            writers.append((lambda path: self._write_parquet(path, offers), ".parquet", base + ".parquet"))
+        if manifest is not None:
+            # Exportliste vor dem Start der Schreiber festlegen – Excel übernimmt sie als Metadaten
+            targets = [base + ".ndjson"] if self._ndjson_thread is not None else []
+            targets += [target for _, _, target in writers] + [base + MANIFEST_SUFFIX]
+            manifest['exports'] = [os.path.basename(target) for target in targets]
+
+        with self._lock:
+            if self.aborted:
+                return False
+            self._export_start = time.perf_counter()
+            os.makedirs(self.directory, exist_ok=True)
+            if self._ndjson_thread is not None:
+                # Die Suche ist vorbei – NDJSON-Strom abschließen
+                self._jobs.append((self._executor.submit(self._stop_ndjson), self._ndjson_file, base + ".ndjson"))
+            for write, suffix, target in writers:
+                tmp = self._temp_path(suffix)
+                self._jobs.append((self._executor.submit(write, tmp), tmp, target))
+            if manifest is not None:
+                self._manifest = (manifest, base + MANIFEST_SUFFIX)
+        return True
+
+    @staticmethod
+    def _write_json(path, offers, details):
+        items = offers.items()
+        if details:
+            items = ((k, {**o, 'angebotsdetails': details.get(detail_id(o))}) for k, o in offers.items())
+        with open(path, "w", encoding="utf-8") as f:
+            dump_offers_json(items, f, indent=4)
+
+    @staticmethod
+    def _write_parquet(path, offers):
+        df = pd.DataFrame(
+            _provider_rows(offers.values()),
+            columns=["Anbieter", "Anbieter (Original)", "id", "Ort", "Titel", "Beginn", "Ende", "Straße"],
+        )
+        df.to_parquet(path, engine="pyarrow", index=False)
+
+    def commit(self):
+        """
+        Wartet auf die in finish() gestarteten Schreiber und verschiebt die Dateien an
+        ihr Ziel. Schlägt ein Schreiber fehl, wird nichts verschoben. Gibt die Zielpfade zurück.
+        """
+        with self._lock:
+            if self.aborted:
+                raise ExportAborted("Der Lauf wurde abgebrochen.")
+            jobs = self._jobs
+        try:
+            for future, _, _ in jobs:
+                future.result()
+            if self._manifest is not None:
+                # Manifest zuletzt: erst jetzt stehen Export-Dauer und Endzeitpunkt fest
+                manifest, target = self._manifest
+                tmp = self._temp_path(".json")
+                write_manifest(tmp, finish_manifest(manifest, time.perf_counter() - self._export_start))
+                jobs.append((None, tmp, target))
+                self._manifest = None
+        except Exception:
+            self.abort()
+            raise
+        with self._lock:
+            if self.aborted:
+                raise ExportAborted("Der Lauf wurde abgebrochen.")
+            paths = []
+            for _, tmp, target in jobs:
+                os.replace(tmp, target)
+                self._temp_files.remove(tmp)
+                paths.append(target)
+            self._jobs = []
+        self._executor.shutdown(wait=False)
+        return paths
+
+    def abort(self):
+        with self._lock:
+            self.aborted = True
+            self._manifest = None
+        self._stop_ndjson()
+        self._ndjson_thread = None
+        # Noch nicht gestartete Schreiber verwerfen, laufende abwarten – erst dann löschen
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        for path in self._temp_files:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._temp_files = []
+        self._jobs = []
+
+
+# ============================================
+# 📈 Gespeicherte Läufe & Trendbericht
+# ============================================
+def trend_region(params):
+    """
+    Ortsschlüssel eines Trendsegments im 'ort'-Format der Links ('Berlin_13.38_52.53'),
+    damit gleichnamige Orte und Suchen per Name bzw. Koordinaten getrennt bleiben.
+    Ohne Koordinaten bleibt es beim Ortsnamen.
+    """
+    if params.get('lat') is None or params.get('lon') is None:
+        return params['where']
+    return f"{params['where']}_{round(float(params['lon']), 6)}_{round(float(params['lat']), 6)}"
+
+def store_run(params, offers, stats=None, db_path=None):
+    """
+    💾 Speichert einen Lauf (Angebote + Anbieterzahlen) in der lokalen Datenbank
+    und aktualisiert die Trend-Rollups inkrementell.
+
+    Ein Trendsegment ist (Job-ID, Ort, Radius, Bildungsart), der Ort samt Koordinaten
+    (siehe trend_region). Für jedes Segment
+    werden nur die Zahlen des letzten und vorletzten Laufs fortgeschrieben –
+    Berichte müssen so nie die Rohdaten neu auswerten.
+    Gibt die neue run_id zurück.
+    """
+    offers = list(offers)
+    if stats is None:
+        stats = count_offers_by_provider_parallel(offers)
+    segment = (int(params['job_id']), trend_region(params), int(params['radius']), int(params['bart']))
+    providers = resolve_provider_names(_raw_provider_names(offers))
+
+    conn = open_database(db_path)
+    try:
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO runs (started_at, job_id, region, radius, bart, offer_count, provider_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (datetime.now().isoformat(timespec="seconds"), *segment, len(offers), len(stats)),
+            )
+            run_id = cur.lastrowid
+
+            store_offers(conn, offers, providers)
+            conn.executemany(
+                "INSERT OR IGNORE INTO run_offers (run_id, offer_id) VALUES (?, ?)",
+                ((run_id, str(o['id'])) for o in offers),
+            )
+            conn.executemany(
+                "INSERT INTO run_providers (run_id, provider, count, collapsed_count) VALUES (?, ?, ?, ?)",
+                ((run_id, name, p['count'], p['collapsed_count']) for name, p in stats.items()),
+            )
+
+            # 🔁 Rollups fortschreiben: bisheriger Stand wird zum Vorlauf
+            total = sum(p['count'] for p in stats.values())
+            conn.execute(
+                "INSERT INTO trend_segments (job_id, region, radius, bart, run_count, last_run_id, prev_run_id, last_total, prev_total) "
+                "VALUES (?, ?, ?, ?, 1, ?, NULL, ?, 0) "
+                "ON CONFLICT (job_id, region, radius, bart) DO UPDATE SET "
+                "run_count = run_count + 1, prev_run_id = last_run_id, prev_total = last_total, "
+                "last_run_id = excluded.last_run_id, last_total = excluded.last_total",
+                (*segment, run_id, total),
+            )
+            conn.execute(
+                "UPDATE provider_trends SET prev_count = last_count, last_count = 0 "
+                "WHERE job_id = ? AND region = ? AND radius = ? AND bart = ?",
+                segment,
+            )
+            conn.executemany(
+                "INSERT INTO provider_trends (job_id, region, radius, bart, provider, first_seen_run, last_seen_run, last_count, prev_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0) "
+                "ON CONFLICT (job_id, region, radius, bart, provider) DO UPDATE SET "
+                "last_seen_run = excluded.last_seen_run, last_count = excluded.last_count",
+                ((*segment, name, run_id, run_id, p['count']) for name, p in stats.items()),
+            )
+        return run_id
+    finally:
+        conn.close()
+
+
+def trend_report(job_id=None, region=None, db_path=None):
     """
-    🚀 Ruft alle Seiten mit Ausbildungsangeboten parallel ab.
-    Startet mit Seite 0, bestimmt die Gesamtseitenzahl und lädt den Rest asynchron.
-    Nur Angebote im definierten Radius werden übernommen.
+    📈 Liest den Trendbericht aus den vorberechneten Rollups.
+
+    Rückgabe: (trends, timeline)
+    - trends: je Segment und Anbieter aktuelle/vorherige Anzahl, Marktanteile,
+      Veränderung in Prozentpunkten und Status (neu / ausgeschieden / aktiv);
+      'neu' heißt: im Vorlauf nicht vertreten – das gilt auch für Anbieter,
+      die nach einer Pause zurückkehren
+    - timeline: Anbieterzahlen je Lauf (Zeitreihe); Läufe ohne Anbieter
+      erscheinen mit provider = None, damit sie als gemessen erkennbar bleiben
     """
-    first = search(0, where, job_id, radius, bart)
-    if not first or '_embedded' not in first or 'termine' not in first['_embedded']:
-        return []
-    
-    total_pages = first['page']['totalPages']
-    all_offers = [o for o in first['_embedded']['termine'] if is_within_radius(o, lat, lon, radius)]
+    where_sql, args = "", []
+    if job_id is not None:
+        where_sql += " AND s.job_id = ?"
+        args.append(int(job_id))
+    if region:
+        # Ortsname allein passt auf alle Segmente dieses Namens (beliebige Koordinaten)
+        where_sql += " AND (s.region = ? OR substr(s.region, 1, length(?) + 1) = ? || '_')"
+        args += [region, region, region]
+
+    conn = open_database(db_path)
+    try:
+        trends = pd.read_sql_query(
+            "SELECT s.job_id, s.region, s.radius, s.bart, t.provider, t.last_count, t.prev_count, "
+            "s.last_total, s.prev_total, s.prev_run_id "
+            "FROM provider_trends t JOIN trend_segments s USING (job_id, region, radius, bart) "
+            "WHERE (t.last_count > 0 OR t.prev_count > 0)" + where_sql,
+            conn, params=args,
+        )
+        timeline = pd.read_sql_query(
+            "SELECT r.job_id, r.region, r.radius, r.bart, r.started_at, p.provider, p.count "
+            "FROM runs r LEFT JOIN run_providers p USING (run_id) "
+            "JOIN trend_segments s USING (job_id, region, radius, bart) WHERE 1 = 1" + where_sql,
+            conn, params=args,
+        )
+    finally:
+        conn.close()
+
+    if not trends.empty:
+        trends['share_last'] = trends['last_count'] / trends['last_total'].where(trends['last_total'] > 0)
+        trends['share_prev'] = trends['prev_count'] / trends['prev_total'].where(trends['prev_total'] > 0)
+        trends['share_delta_pp'] = (trends['share_last'].fillna(0) - trends['share_prev'].fillna(0)) * 100
+        has_prev = trends['prev_run_id'].notna()
+        trends['status'] = "aktiv"
+        trends.loc[has_prev & (trends['prev_count'] == 0), 'status'] = "neu"
+        trends.loc[has_prev & (trends['last_count'] == 0), 'status'] = "ausgeschieden"
+        trends = trends.drop(columns=['prev_run_id'])
+        trends = trends.sort_values(['job_id', 'region', 'radius', 'bart', 'share_delta_pp'],
+                                    ascending=[True, True, True, True, False])
+    return trends, timeline
+
+
+def export_trend_report(filename, job_id=None, region=None, db_path=None):
+    """
+    📤 Exportiert den Trendbericht nach Excel (Blätter 'Trends' und 'Zeitreihe').
+    Gibt die Anzahl der Trendzeilen zurück.
+    """
+    trends, timeline = trend_report(job_id, region, db_path)
+    trends = trends.rename(columns={
+        'job_id': "Job-ID", 'region': "Ort", 'radius': "Radius (km)", 'bart': "Bildungsart",
+        'provider': "Anbieter", 'last_count': "Anzahl aktuell", 'prev_count': "Anzahl vorher",
+        'last_total': "Gesamt aktuell", 'prev_total': "Gesamt vorher",
+        'share_last': "Marktanteil aktuell", 'share_prev': "Marktanteil vorher",
+        'share_delta_pp': "Δ Marktanteil (Prozentpunkte)", 'status': "Status",
+    })
+    with pd.ExcelWriter(filename) as writer:
+        trends.to_excel(writer, sheet_name="Trends", index=False)
+        pivot = timeline_pivot(timeline)
+        if not pivot.empty:
+            pivot.to_excel(writer, sheet_name="Zeitreihe")
+    return len(trends)
+
+
+def timeline_pivot(timeline):
+    """
+    Zeitreihe je Segment und Anbieter (Spalten: Laufzeitpunkte).
+    0 = Lauf des Segments ohne diesen Anbieter, leer (NaN) = Segment zu diesem
+    Zeitpunkt nicht gemessen.
+    """
+    segment = ['job_id', 'region', 'radius', 'bart']
+    present = timeline.dropna(subset=['provider'])
+    if present.empty:
+        return pd.DataFrame()
+    pivot = present.pivot_table(index=segment + ['provider'], columns='started_at',
+                                values='count', aggfunc='sum')
+    measured = (timeline.drop_duplicates(segment + ['started_at']).assign(measured=True)
+                .pivot_table(index=segment, columns='started_at', values='measured', aggfunc='any'))
+    measured = measured.reindex(index=pivot.index.droplevel('provider'), columns=pivot.columns)
+    return pivot.mask(pivot.isna() & measured.notna().to_numpy(), 0)
 
-    def fetch_page(p):
-        result = search(p, where, job_id, radius, bart)
-        if not result or '_embedded' not in result:
-            return []
-        return [o for o in result['_embedded']['termine'] if is_within_radius(o, lat, lon, radius)]
 
-    # 🧵 Lade weitere Seiten parallel (ThreadPoolExecutor)
-    with ThreadPoolExecutor(max_workers=6) as executor:
-        futures = [executor.submit(fetch_page, p) for p in range(1, total_pages)]
-        for f in futures:
-            try:
-                all_offers.extend(f.result())
-            except Exception as e:
-                print(f"Fehler bei Seite: {e}")
+# ============================================
+# 🔍 Volltextsuche über gespeicherte Angebote
+# ============================================
+# Jeder gespeicherte Lauf schreibt seine Angebote zusätzlich in einen
+# SQLite-FTS5-Index (Titel, Anbieter, Ort). Suchen über alle Läufe dauern
+# damit Millisekunden statt eines Durchsuchens der JSON-Exporte.
+FTS_DEFAULT_LIMIT = 1000
+
+def _offer_search_fields(offer, provider):
+    """Texte eines Angebots für den Volltextindex: (Titel, Anbieter, Ort)."""
+    raw_name = offer['angebot']['bildungsanbieter']['name']
+    address = offer.get('adresse') or {}
+    place = address.get('ortStrasse') or {}
+    return (
+        offer['angebot'].get('titel') or "",
+        provider if raw_name == provider else f"{provider} {raw_name}",
+        " ".join(str(part) for part in (place.get('name'), place.get('plz') or address.get('plz')) if part),
+    )
 
-    return all_offers
 
+def store_offers(conn, offers, providers):
+    """
+    Schreibt Angebote samt Suchfeldern in die Tabelle offers; die Trigger
+    halten den Volltextindex aktuell.
+    `providers` bildet Rohnamen auf kanonische Namen ab (resolve_provider_names).
+    Bestehende Angebote behalten ihre rowid, ihr Indexeintrag wird ersetzt.
+    """
+    for offer in offers:
+        provider = providers[offer['angebot']['bildungsanbieter']['name']]
+        conn.execute(
+            "INSERT INTO offers (offer_id, provider, payload, titel, anbieter, ort) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (offer_id) DO UPDATE SET provider = excluded.provider, payload = excluded.payload, "
+            "titel = excluded.titel, anbieter = excluded.anbieter, ort = excluded.ort",
+            (str(offer['id']), provider, pack_json(offer), *_offer_search_fields(offer, provider)),
+        )
 
 
-# ============================================
-# 📊 Anbieteranalyse & -auswertung
-# ============================================
-def count_offers_by_provider(data):
+def _update_search_fields(conn, batch_size=FTS_BATCH_SIZE):
     """
-    🧮 Gruppiert Angebote nach Bildungsanbieter.
-    Zählt eindeutige Angebote pro Anbieter, erfasst Standorte und Kurstitel.
-    Dient als Grundlage für die spätere Excel-Auswertung.
+    Berechnet die Suchfelder aller gespeicherten Angebote aus dem Payload neu,
+    blockweise nach rowid statt alles auf einmal zu laden. Gibt die Anzahl zurück.
     """
-    provider_data = defaultdict(lambda: {'ids': set(), 'locations': set(), 'titles': set()})
-    for offer in data:
-        try:
-            name = offer["angebot"]["bildungsanbieter"]["name"]
-            location = offer["adresse"]["ortStrasse"]["name"]
-            offer_id = offer["id"]
-            title = offer["angebot"]["titel"]
-            provider_data[name]['ids'].add(offer_id)
-            provider_data[name]['locations'].add(location)
-            provider_data[name]['titles'].add(title)
-        except Exception as e: # Catch other unexpected errors
-            print(f"An unexpected error occurred processing offer ID {offer.get('id', 'N/A')}: {e}")
-            continue
-        
-    # 🔢 Anzahl eindeutiger Angebote pro Anbieter zählen
-    for provider in provider_data:
-        provider_data[provider]['count'] = len(provider_data[provider]['ids'])
-    return provider_data
+    count, last_rowid = 0, 0
+    while True:
+        batch = conn.execute(
+            "SELECT rowid, provider, payload FROM offers WHERE rowid > ? ORDER BY rowid LIMIT ?",
+            (last_rowid, batch_size),
+        ).fetchall()
+        if not batch:
+            return count
+        conn.executemany(
+            "UPDATE offers SET titel = ?, anbieter = ?, ort = ? WHERE rowid = ? "
+            "AND NOT (titel = ? AND anbieter = ? AND ort = ?)",
+            [(*fields, rowid, *fields) for rowid, fields in
+             ((rowid, _offer_search_fields(unpack_json(payload), provider)) for rowid, provider, payload in batch)],
+        )
+        count += len(batch)
+        last_rowid = batch[-1][0]
+
+
+def rebuild_fts_index(db_path=None, batch_size=FTS_BATCH_SIZE):
+    """
+    🔁 Berechnet die Suchfelder aller gespeicherten Angebote neu (blockweise) und baut
+    den Volltextindex daraus neu auf, z. B. nach einem VACUUM. Gibt die Anzahl zurück.
+    """
+    conn = open_database(db_path)
+    try:
+        with conn:
+            count = _update_search_fields(conn, batch_size)
+            conn.execute("INSERT INTO offers_fts (offers_fts) VALUES ('rebuild')")
+            conn.execute("INSERT INTO offers_fts (offers_fts) VALUES ('optimize')")
+        return count
+    finally:
+        conn.close()
 
 
-# ============================================
-# 📤 Export der Ergebnisse nach Excel
-# ============================================
-def export_to_excel(data, search_url, filename='anbieter_stats.xlsx'):
+def build_fts_query(text):
     """
-    📁 Exportiert die zusammengefassten Anbieter-Daten in eine Excel-Datei.
-    Enthält Anbietername, Anzahl Angebote, Titel und den genutzten Suchlink.
-    Ideal für Auswertungen und Vergleiche in Teams.
+    Übersetzt eine Eingabe wie 'Fachinformatiker oder SAP' in eine FTS5-Abfrage.
+    Jedes Wort wird als Präfix gesucht, Wörter sind UND-verknüpft,
+    'oder'/'or' verknüpft mit ODER.
     """
-    rows = []
-    for provider, info in data.items():
-        title = ""
-        if 'titles' in info and info['titles']:
-            title = next(iter(info['titles']), "")
+    groups, current = [], []
+    for word in re.findall(r"\w+", text):
+        if word.casefold() in ("oder", "or"):
+            if current:
+                groups.append(current)
+            current = []
         else:
-            print(f"Skipping {provider} due to missing or empty titles")
+            current.append(f'"{word}"*')
+    if current:
+        groups.append(current)
+    return " OR ".join("(" + " AND ".join(group) + ")" for group in groups)
 
-        rows.append({
-            "Anbieter": provider,
-            "Anzahl Angebote": info['count'],
-            "Titel": title,
-            "für Suche verwendeter Link (wiederholend)": search_url
-        })
 
-    if not rows:
-        print("No data to export.")
-    else:
-        df = pd.DataFrame(rows)
-        df.to_excel(filename, index=False)
-        print(f"Exported {len(rows)} providers to {filename}")
+def search_stored_offers(text, limit=FTS_DEFAULT_LIMIT, db_path=None):
+    """
+    🔍 Durchsucht alle gespeicherten Angebote (Titel, Anbieter, Ort).
+    Gibt bis zu `limit` Angebote als dict (ID → Angebot) zurück, beste Treffer zuerst.
+    """
+    query = build_fts_query(text)
+    if not query:
+        return {}
+    conn = open_database(db_path)
+    try:
+        rows = conn.execute(
+            "SELECT o.offer_id, o.payload FROM offers_fts f JOIN offers o ON o.rowid = f.rowid "
+            "WHERE offers_fts MATCH ? ORDER BY f.rank LIMIT ?",
+            (query, limit),
+        ).fetchall()
+    finally:
+        conn.close()
+    return {offer_id: unpack_json(payload) for offer_id, payload in rows}
+
 
 # ============================================
 # 🔗 URL-Parser (Ausbildungsagentur-Links)
 # ============================================
-def parse_url(url):
+def parse_ort(ort):
     """
-    🔍 Zerlegt einen Link der Arbeitsagentur-Ausbildungssuche in seine Einzelparameter.
-    Extrahiert Stadt, Koordinaten, Radius, Beruf-ID und Kategorie (bart-Code).
+    🏙️ Zerlegt ein 'ort'-Feld im Format der BA-Links in Stadt und Koordinaten.
+    Beispiel: 'Berlin_13.386738_52.531976' → ('Berlin', 52.531976, 13.386738)
     """
-    parsed = urlparse(url)
-    qs = parse_qs(parsed.query)
+    ort_parts = ort.split('_')
+    if len(ort_parts) != 3:
+        raise ValueError("Ungültiges 'ort'-Feld im Link.")
+    city, lon, lat = ort_parts
+    return city, float(lat), float(lon)
 
-    job_id = int(qs.get('beruf', ['0'])[0])
-    radius = int(qs.get('uk', ['0'])[0])
-    kat = qs.get('kat', [''])[0]
 
-    # 🏙️ Beispiel: 'Berlin_13.386738_52.531976' → Stadt, Längengrad, Breitengrad
-    ort_parts = qs.get('ort', [''])[0].split('_')
-    if len(ort_parts) == 3:
-        city, lon, lat = ort_parts
-    else:
-        raise ValueError("Ungültiges 'ort'-Feld im Link.")
+def resolve_center(text):
+    """
+    📍 Wandelt eine Zentrumsangabe in (Stadt, lat, lon) um.
+    Akzeptiert das 'ort'-Format der Links ('Berlin_13.38_52.53') sowie
+    Ortsnamen oder PLZ aus dem Ortsverzeichnis.
+    """
+    if text.count('_') == 2:
+        return parse_ort(text)
+    place = resolve_place(text)
+    if place is None:
+        raise ValueError(f"Unbekannter Ort: '{text}'")
+    return place['where'], place['lat'], place['lon']
+
+
+# 🔁 Umwandlung der 'kat'-Kategorie der Links in den passenden BART-Code
+KAT_TO_BART = {
+    "0": 102,
+    "1": 109,
+    "2": 101,
+    "3": 105
+}
+DEFAULT_BART = 109
+DEFAULT_RADIUS = 50
+
+# Normalisierte Suchanfrage – gleiche Links (andere Parameter-Reihenfolge,
+# zusätzliche Tracking-Parameter, Leerzeichen …) ergeben denselben Schlüssel
+SearchQuery = namedtuple("SearchQuery", "where job_id radius lat lon bart")
+
+@lru_cache(maxsize=4096)
+def normalize_link(url):
+    """
+    🔍 Zerlegt einen Link der Arbeitsagentur-Ausbildungssuche in eine SearchQuery.
+    Einzige Stelle, an der Links ausgewertet werden; Ergebnisse werden zwischengespeichert.
+    Wirft ValueError mit verständlicher Meldung bei ungültigen Links.
+    """
+    qs = parse_qs(urlparse(url.strip()).query)
+
+    beruf = qs.get('beruf', [''])[0].strip()
+    if not beruf.isdigit():
+        raise ValueError("Link enthält keine Job-ID ('beruf=...').")
+    if 'ort' not in qs:
+        raise ValueError("Link enthält kein 'ort'-Feld.")
+    city, lat, lon = parse_ort(qs['ort'][0])
+
+    uk = qs.get('uk', [str(DEFAULT_RADIUS)])[0].strip()
+    if not uk.isdigit():
+        raise ValueError(f"Ungültiger Radius 'uk={uk}'.")
+
+    kat = qs.get('kat', [''])[0].strip()
+
+    return SearchQuery(
+        where=city.strip(),
+        job_id=int(beruf),
+        radius=int(uk),
+        lat=round(lat, 6),
+        lon=round(lon, 6),
+        bart=KAT_TO_BART.get(kat, DEFAULT_BART),
+    )
 
-    # 🔁 Umwandlung der 'kat'-Kategorie in den passenden BART-Code
-    reverse_bart_map = {
-        "0": 102,
-        "1": 109,
-        "2": 101,
-        "3": 105
-    }
 
-    bart = reverse_bart_map.get(kat, -1)
+def parse_url(url):
+    """
+    🔍 Zerlegt einen Link in seine Einzelparameter (Stadt, Koordinaten, Radius,
+    Beruf-ID, bart-Code) und gibt sie als Dictionary zurück.
+    """
+    return normalize_link(url)._asdict()
 
-    return {
-        'where': city,
-        'job_id': job_id,
-        'radius': radius,
-        'lat': float(lat),
-        'lon': float(lon),
-        'bart': bart
-    }
+
+def validate_links(lines):
+    """
+    ✅ Prüft viele Links auf einmal, bevor ein einziger Request gesendet wird.
+
+    Rückgabe: (links, invalid, duplicates)
+    - links: Liste (Link, SearchQuery) – je normalisierter Suchanfrage nur der erste Link
+    - invalid: Liste (Zeilennummer, Link, Fehlermeldung) aller ungültigen Zeilen
+    - duplicates: Anzahl der Links, die einer bereits enthaltenen Suche entsprechen
+    """
+    links = {}
+    invalid = []
+    duplicates = 0
+    for line_no, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            query = normalize_link(line)
+        except ValueError as e:
+            invalid.append((line_no, line, str(e)))
+            continue
+        if query in links:
+            duplicates += 1
+        else:
+            links[query] = line
+    return [(line, query) for query, line in links.items()], invalid, duplicates
 
 
 # ============================================
@@ -286,21 +2688,7 @@ def populate_fields_from_link():
         # ------------------------------------------------------------
         # 🔍 URL einlesen & Parameter auswerten
         # ------------------------------------------------------------
-        url = url_entry.get()
-        parsed = urlparse(url)
-        params = parse_qs(parsed.query)
-
-        # Extrahiere Werte aus URL-Parametern
-        city = params.get("ort", [""])[0].split("_")[0]
-        lon = float(params.get("ort", [""])[0].split("_")[1])
-        lat = float(params.get("ort", [""])[0].split("_")[2])
-        radius = int(params.get("uk", [50])[0])
-        job_id = int(params.get("beruf", [0])[0])
-        kat = int(params.get("kat", [1])[0])
-
-        # 🧭 Übersetze Kategorie (kat) in Bildungsart-ID (bart)
-        bart_map = {1: 109, 0: 102, 2: 101, 3: 105}
-        bart = bart_map.get(kat, 109)
+        city, job_id, radius, lat, lon, bart = normalize_link(url_entry.get())
 
         # ------------------------------------------------------------
         # ✏️ Felder temporär aktivieren & befüllen
@@ -349,12 +2737,14 @@ def toggle_input_mode():
         # URL-Modus aktiv → manuelle Felder sperren
         for entry in [city_entry, job_id_entry, radius_entry, lat_entry, lon_entry, bart_entry]:
             entry.config(state="disabled")
+        coords_button.config(state="disabled")
         parse_button.config(state="normal")
         url_entry.config(state="normal")
     else:
         # Manueller Modus → Felder freigeben
         for entry in [city_entry, job_id_entry, radius_entry, lat_entry, lon_entry, bart_entry]:
             entry.config(state="normal")
+        coords_button.config(state="normal")
         parse_button.config(state="disabled")
         url_entry.config(state="disabled")
 
@@ -401,6 +2791,266 @@ def show_progress_window():
 
     return progress_win, listbox, ok_button
 
+# ============================================
+# 🔎 Ergebnisansicht (Index + Tabelle)
+# ============================================
+# Die Tabelle hält nur ein Fenster von höchstens VIEWER_WINDOW Zeilen; beim Scrollen
+# wird das Fenster blockweise (VIEWER_CHUNK) verschoben statt immer weiter angehängt.
+# Suche, Filter und Sortierung laufen über einen einmal (im Hintergrund) aufgebauten
+# Index, nicht über die Angebote selbst – auch bei 100.000 Angeboten flüssig.
+VIEWER_CHUNK = 200
+VIEWER_WINDOW = 3 * VIEWER_CHUNK
+
+class OfferIndex:
+    """
+    🗂️ Such- und Sortierindex über die Angebote eines Laufs.
+
+    - Wortindex (normalisierte Wörter aus Anbieter, Titel, Ort → Zeilennummern),
+      Präfixsuche über das sortierte Vokabular
+    - Zeilen je Anbieter
+    - Sortierreihenfolgen je Spalte (bei Bedarf berechnet und gemerkt)
+    """
+    COLUMNS = ("Anbieter", "Titel", "Ort", "Beginn", "Ende", "ID")
+
+    def __init__(self, offers):
+        self.rows = [
+            (name, title, location, beginn, ende, str(offer_id))
+            for name, _, offer_id, location, title, beginn, ende, _street in _provider_rows(offers)
+        ]
+        postings = defaultdict(list)
+        self.by_provider = defaultdict(list)
+        for i, (name, title, location, *_rest) in enumerate(self.rows):
+            self.by_provider[name].append(i)
+            for token in set(normalize_place(f"{name} {title} {location}").split()):
+                postings[token].append(i)
+        self.postings = dict(postings)
+        self.vocabulary = sorted(self.postings)
+        self._ranks = {}
+
+    def _prefix_matches(self, term):
+        lo = bisect.bisect_left(self.vocabulary, term)
+        hi = bisect.bisect_left(self.vocabulary, term + "\x7f")
+        matches = set()
+        for token in self.vocabulary[lo:hi]:
+            matches.update(self.postings[token])
+        return matches
+
+    def _rank(self, column):
+        # rank[i] = Position von Zeile i in der aufsteigenden Sortierung nach `column`
+        if column not in self._ranks:
+            order = sorted(range(len(self.rows)), key=lambda i: str(self.rows[i][column]).casefold())
+            rank = [0] * len(order)
+            for position, i in enumerate(order):
+                rank[i] = position
+            self._ranks[column] = (order, rank)
+        return self._ranks[column]
+
+    def query(self, text="", provider=None, sort_column=None, descending=False):
+        """
+        Liefert die Zeilennummern passend zu Suchtext (alle Wörter als Präfix)
+        und Anbieter, sortiert nach `sort_column` (Index in COLUMNS).
+        """
+        selected = None
+        for term in normalize_place(text).split():
+            matches = self._prefix_matches(term)
+            selected = matches if selected is None else selected & matches
+        if provider:
+            rows = set(self.by_provider.get(provider, ()))
+            selected = rows if selected is None else selected & rows
+
+        if sort_column is None:
+            result = list(range(len(self.rows))) if selected is None else sorted(selected)
+        else:
+            order, rank = self._rank(sort_column)
+            result = list(order) if selected is None else sorted(selected, key=rank.__getitem__)
+        if descending:
+            result.reverse()
+        return result
+
+
+def build_offer_index(offers):
+    """
+    Baut den OfferIndex in einem Hintergrund-Thread.
+    Gibt ein Future zurück – so kann die Ergebnisansicht beliebig oft geöffnet
+    werden, ohne den Index neu zu berechnen oder die Oberfläche zu blockieren.
+    """
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(OfferIndex, offers.values())
+    executor.shutdown(wait=False)
+    return future
+
+
+def viewer_window_offset(offset, shown, total, first, last):
+    """
+    Neuer Fensteranfang für die Ergebnistabelle oder None, falls das Fenster bleiben kann.
+    `first`/`last` sind die sichtbaren Anteile (0..1) innerhalb der `shown` geladenen Zeilen.
+    """
+    near_end = last > 0.9 and offset + shown < total
+    near_start = first < 0.1 and offset > 0
+    if not (near_end or near_start):
+        return None
+    top = offset + int(first * shown)
+    return max(0, min(top - VIEWER_CHUNK, total - VIEWER_WINDOW))
+
+
+def show_results_window(offers, stats, index=None):
+    """
+    🔎 Zeigt Anbieter und Angebote eines Laufs in einer sortier- und durchsuchbaren Tabelle.
+    - Reiter 'Anbieter': Anzahl je Anbieter (Doppelklick filtert die Angebote)
+    - Reiter 'Angebote': Suche (Präfixe, mehrere Wörter), Anbieterfilter, Sortierung per Spaltenkopf
+    `index` ist ein Future aus build_offer_index(); fehlt es, wird der Index hier gestartet.
+    """
+    if index is None:
+        index = build_offer_index(offers)
+
+    win = tk.Toplevel(root)
+    win.title(f"Ergebnisse – {len(offers)} Angebote von {len(stats)} Anbietern")
+    win.geometry("950x560")
+
+    notebook = ttk.Notebook(win)
+    notebook.pack(fill="both", expand=True, padx=10, pady=10)
+
+    # ------------------------------------------------------------
+    # 🏢 Anbieter
+    # ------------------------------------------------------------
+    provider_tab = ttk.Frame(notebook)
+    notebook.add(provider_tab, text="Anbieter")
+    provider_columns = ("Anbieter", "Anzahl Angebote", "Anzahl ohne Duplikate")
+    provider_tree = ttk.Treeview(provider_tab, columns=provider_columns, show="headings")
+    for col, width in zip(provider_columns, (500, 150, 170)):
+        provider_tree.heading(col, text=col)
+        provider_tree.column(col, width=width, anchor="w" if col == "Anbieter" else "e")
+    provider_scroll = ttk.Scrollbar(provider_tab, command=provider_tree.yview)
+    provider_tree.configure(yscrollcommand=provider_scroll.set)
+    provider_scroll.pack(side="right", fill="y")
+    provider_tree.pack(fill="both", expand=True)
+    for name, info in sorted(stats.items(), key=lambda item: -item[1]['count']):
+        provider_tree.insert("", tk.END, values=(name, info['count'], info.get('collapsed_count', info['count'])))
+
+    # ------------------------------------------------------------
+    # 📄 Angebote
+    # ------------------------------------------------------------
+    offer_tab = ttk.Frame(notebook)
+    notebook.add(offer_tab, text="Angebote")
+
+    toolbar = ttk.Frame(offer_tab)
+    toolbar.pack(fill="x", pady=(0, 5))
+    ttk.Label(toolbar, text="Suche:").pack(side="left")
+    search_var = tk.StringVar()
+    ttk.Entry(toolbar, textvariable=search_var, width=30).pack(side="left", padx=5)
+    ttk.Label(toolbar, text="Anbieter:").pack(side="left", padx=(10, 0))
+    provider_var = tk.StringVar(value="")
+    provider_box = ttk.Combobox(toolbar, textvariable=provider_var, width=40, state="readonly", values=[""])
+    provider_box.pack(side="left", padx=5)
+    count_label = ttk.Label(toolbar, text="Index wird aufgebaut...")
+    count_label.pack(side="right")
+
+    tree_frame = ttk.Frame(offer_tab)
+    tree_frame.pack(fill="both", expand=True)
+    tree = ttk.Treeview(tree_frame, columns=OfferIndex.COLUMNS, show="headings")
+    for col, width in zip(OfferIndex.COLUMNS, (220, 320, 140, 90, 90, 90)):
+        tree.column(col, width=width, anchor="w")
+    scrollbar = ttk.Scrollbar(tree_frame)
+    scrollbar.pack(side="right", fill="y")
+    tree.pack(fill="both", expand=True)
+
+    state = {'index': None, 'rows': [], 'offset': 0, 'shown': 0,
+             'sort': None, 'descending': False, 'pending': None}
+
+    def show_window(offset, top):
+        # Tabelle mit rows[offset:offset + VIEWER_WINDOW] füllen, Zeile `top` oben anzeigen
+        rows = state['index'].rows
+        window = state['rows'][offset:offset + VIEWER_WINDOW]
+        tree.delete(*tree.get_children())
+        for i in window:
+            tree.insert("", tk.END, values=rows[i])
+        state['offset'], state['shown'] = offset, len(window)
+        if window:
+            tree.yview_moveto((top - offset) / len(window))
+
+    def on_tree_scroll(first, last):
+        # Bildlaufleiste zeigt die Position in allen Treffern, nicht nur im geladenen Fenster
+        first, last = float(first), float(last)
+        total, offset, shown = len(state['rows']), state['offset'], state['shown']
+        if total:
+            scrollbar.set((offset + first * shown) / total, (offset + last * shown) / total)
+        else:
+            scrollbar.set(0, 1)
+        new_offset = viewer_window_offset(offset, shown, total, first, last)
+        if new_offset is not None and new_offset != offset:
+            show_window(new_offset, offset + int(first * shown))
+
+    def on_scrollbar(*args):
+        # Ziehen der Leiste springt direkt an die Zielposition; Pfeile/Seiten scrollen im Fenster
+        if args[0] == "moveto" and state['rows']:
+            target = min(int(float(args[1]) * len(state['rows'])), len(state['rows']) - 1)
+            offset = max(0, min(target - VIEWER_CHUNK, len(state['rows']) - VIEWER_WINDOW))
+            show_window(offset, max(target, 0))
+        else:
+            tree.yview(*args)
+
+    tree.configure(yscrollcommand=on_tree_scroll)
+    scrollbar.configure(command=on_scrollbar)
+
+    def refresh():
+        state['pending'] = None
+        index = state['index']
+        if index is None:
+            return
+        state['rows'] = index.query(search_var.get(), provider_var.get() or None,
+                                    state['sort'], state['descending'])
+        show_window(0, 0)
+        count_label.config(text=f"{len(state['rows'])} von {len(index.rows)} Angeboten")
+
+    def schedule_refresh(*_):
+        # Beim Tippen erst nach kurzer Pause suchen
+        if state['pending']:
+            win.after_cancel(state['pending'])
+        state['pending'] = win.after(250, refresh)
+
+    def sort_by(column):
+        if state['sort'] == column:
+            state['descending'] = not state['descending']
+        else:
+            state['sort'], state['descending'] = column, False
+        for i, col in enumerate(OfferIndex.COLUMNS):
+            arrow = (" ▼" if state['descending'] else " ▲") if i == column else ""
+            tree.heading(col, text=col + arrow)
+        refresh()
+
+    for i, col in enumerate(OfferIndex.COLUMNS):
+        tree.heading(col, text=col, command=lambda c=i: sort_by(c))
+
+    def filter_provider(event):
+        selection = provider_tree.selection()
+        if selection:
+            provider_var.set(provider_tree.item(selection[0], "values")[0])
+            notebook.select(offer_tab)
+            refresh()
+
+    def wait_for_index():
+        # Index wird im Hintergrund gebaut; Oberfläche bleibt bedienbar
+        if not win.winfo_exists():
+            return
+        if not index.done():
+            win.after(100, wait_for_index)
+            return
+        try:
+            state['index'] = index.result()
+        except Exception as e:
+            count_label.config(text=f"Index fehlgeschlagen: {e}")
+            return
+        by_provider = state['index'].by_provider
+        provider_box.config(values=[""] + sorted(by_provider, key=lambda p: -len(by_provider[p])))
+        refresh()
+
+    search_var.trace_add("write", schedule_refresh)
+    provider_box.bind("<<ComboboxSelected>>", lambda e: refresh())
+    provider_tree.bind("<Double-1>", filter_provider)
+    wait_for_index()
+    return win
+
+
 # ============================================
 # 📁 Export-Verzeichnis auswählen
 # ============================================
@@ -420,56 +3070,614 @@ def validate_inputs():
     """
     Prüft, ob alle Eingabefelder gültige Werte enthalten.
     - Alle Zahlenfelder müssen konvertierbar sein (int / float)
+    - Im manuellen Modus dürfen Koordinaten fehlen, dann wird die Stadt beim Start
+      im Ortsverzeichnis nachgeschlagen (siehe resolve_place_interactive)
+    - Im URL-Modus wird der Link selbst geprüft (Mehrfach-Links: siehe validate_links)
     - Gibt True zurück, wenn alles in Ordnung ist
     - Zeigt eine Fehlermeldung bei ungültiger Eingabe
     """
+    if multi_url_mode.get():
+        return True
+    if use_url_mode.get():
+        try:
+            normalize_link(url_entry.get())
+            return True
+        except ValueError as e:
+            messagebox.showerror("Ungültiger Link", str(e))
+            return False
+
     try:
         int(job_id_entry.get())
         int(radius_entry.get())
-        float(lat_entry.get())
-        float(lon_entry.get())
         int(bart_entry.get())
 
+        # Leere Koordinaten sind erlaubt – dann genügt die Stadt
+        if lat_entry.get().strip() or lon_entry.get().strip():
+            float(lat_entry.get())
+            float(lon_entry.get())
+        elif not city_entry.get().strip():
+            messagebox.showerror("Eingabefehler", "Bitte eine Stadt oder Koordinaten angeben.")
+            return False
+
         return True
     except ValueError:
         messagebox.showerror("Eingabefehler", "Bitte stellen Sie sicher, dass alle numerischen Felder gültige Zahlen enthalten.")
         return False
     
+# ============================================
+# 📍 Ort nachschlagen (mit Rückfrage bei Mehrdeutigkeit)
+# ============================================
+def ask_place_choice(text, candidates):
+    """
+    Lässt den Nutzer einen von mehreren passenden Orten auswählen.
+    Gibt den gewählten Place zurück oder None bei Abbruch.
+    """
+    dialog = tk.Toplevel(root)
+    dialog.title("Ort auswählen")
+    dialog.transient(root)
+    ttk.Label(dialog, text=f"'{text}' passt auf mehrere Orte – bitte auswählen:").pack(padx=10, pady=(10, 5), anchor="w")
+    listbox = tk.Listbox(dialog, width=60, height=min(len(candidates), 12))
+    for place in candidates:
+        listbox.insert(tk.END, place_label(place))
+    listbox.selection_set(0)
+    listbox.pack(padx=10, fill="both", expand=True)
+
+    choice = {'place': None}
+
+    def accept(event=None):
+        selection = listbox.curselection()
+        if selection:
+            choice['place'] = candidates[selection[0]]
+        dialog.destroy()
+
+    buttons = ttk.Frame(dialog)
+    buttons.pack(pady=10)
+    ttk.Button(buttons, text="Übernehmen", command=accept).pack(side="left", padx=5)
+    ttk.Button(buttons, text="Abbrechen", command=dialog.destroy).pack(side="left", padx=5)
+    listbox.bind("<Double-1>", accept)
+    dialog.grab_set()
+    dialog.wait_window()
+    return choice['place']
+
+
+def resolve_place_interactive(text, on_resolved):
+    """
+    Sucht einen Ort im Hintergrund (das Ortsverzeichnis lädt beim ersten Zugriff
+    einige Sekunden) und ruft anschließend im GUI-Thread on_resolved(params) mit
+    {'where', 'lat', 'lon'} auf. Bei mehrdeutigen Angaben wählt der Nutzer den Ort aus;
+    bei unbekannten Orten, Fehlern oder Abbruch wird on_resolved nicht aufgerufen.
+    """
+    def done(place=None, candidates=None, error=None):
+        root.config(cursor="")
+        if error is not None:
+            messagebox.showerror("Ortssuche fehlgeschlagen", f"'{text}' konnte nicht nachgeschlagen werden:\n{error}")
+        elif candidates:
+            place = ask_place_choice(text, candidates)
+            if place is not None:
+                on_resolved(place_to_params(place))
+        elif place is None:
+            messagebox.showwarning("Ort nicht gefunden", f"'{text}' ist nicht im Ortsverzeichnis enthalten. Bitte Koordinaten angeben.")
+        else:
+            on_resolved(place)
+
+    def work():
+        try:
+            place = resolve_place(text)
+            root.after(0, lambda: done(place))
+        except AmbiguousPlaceError as e:
+            # Werte beim Binden übernehmen – `e` ist nach dem except-Block nicht mehr gebunden
+            root.after(0, lambda c=e.candidates: done(candidates=c))
+        except Exception as e:
+            root.after(0, lambda err=e: done(error=err))
+
+    root.config(cursor="watch")
+    threading.Thread(target=work, daemon=True).start()
+
+
 # ============================================
 # 🧹 Datensicherung & Bereinigung
 # ============================================
+def is_valid_offer(offer):
+    """
+    Prüft, ob ein Angebot alle Pflichtfelder enthält (ID, Titel, Anbietername).
+    """
+    try:
+        # Must have an ID
+        if not offer.get("id"):
+            return False
+        # Must have a title
+        if not offer.get("angebot", {}).get("titel"):
+            return False
+        # Should have a provider
+        if not offer.get("angebot", {}).get("bildungsanbieter", {}).get("name"):
+            return False
+        return True
+    except:
+        return False
+
+
 def safeback(offers):
     """
     Filtert und dedupliziert Angebotsdaten anhand ihrer ID.
 
-    - Entfernt Einträge ohne gültige ID
-    - Überspringt doppelte Angebote
-    - Gibt ein Dictionary mit eindeutigen Datensätzen zurück
-    - Loggt Anzahl der übersprungenen oder doppelten Einträge in der Konsole
+    - Entfernt Einträge ohne gültige ID
+    - Überspringt doppelte Angebote
+    - Gibt ein Dictionary (bzw. mit MEMORY_CAP_MB einen OfferStore) mit eindeutigen Datensätzen zurück
+    - Loggt Anzahl der übersprungenen oder doppelten Einträge in der Konsole
+    """
+    new_offers = new_offer_store()
+    missing_ids = 0
+    duplicate_ids = 0
+
+    for offer in offers:
+        # Skip any malformed or missing IDs
+        offer_id = offer.get("id")
+        if not offer_id:
+            missing_ids += 1
+            print("⚠️ Offer skipped (missing ID):", offer.get("angebot", {}).get("titel", "Kein Titel"))
+            continue
+
+        if offer_id in new_offers:
+            duplicate_ids += 1
+            continue
+
+        new_offers[offer_id] = offer
+
+    print(f"✅ safeback: {len(new_offers)} eindeutige Angebote gespeichert")
+    print(f"⚠️ {missing_ids} Angebote ohne ID übersprungen")
+    print(f"🔁 {duplicate_ids} doppelte Angebote ignoriert")
+
+    return new_offers
+
+
+def clean_offers(offers, memory_cap_mb=None):
+    """
+    🧹 Übernimmt gültige Angebote nach ID eindeutig in einen Angebotsspeicher
+    (new_offer_store, ggf. mit Speichergrenze). Rückgabe: (Speicher, Anzahl gültiger Angebote).
+    """
+    store = new_offer_store(memory_cap_mb, expected_count=len(offers))
+    valid_count = 0
+    for o in offers:
+        if is_valid_offer(o):
+            valid_count += 1
+            if o["id"] not in store:
+                store[o["id"]] = o
+    return store, valid_count
+
+# ============================================
+# 🧮 Matrix-Suche (Job-IDs × Orte × Radien × Bildungsarten)
+# ============================================
+# Anzahl Suchgruppen, die gleichzeitig laufen. Die eigentliche Last auf der
+# API begrenzt zusätzlich API_MAX_CONCURRENCY über alle Gruppen hinweg.
+SWEEP_MAX_PARALLEL = 3
+
+# Eine Suchzelle der Matrix; lat/lon unterscheiden gleichnamige Zentren.
+# provider_counts zählt die Angebote der Zelle je Rohname des Anbieters,
+# damit die Pivot-Tabelle nicht für jedes Angebot den Anbieter nachschlagen muss.
+SweepCell = namedtuple("SweepCell", "job_id where radius bart lat lon offer_ids provider_counts",
+                       defaults=(None,))
+
+def plan_sweep(job_ids, centers, radii, barts):
+    """
+    🗺️ Plant das Kreuzprodukt aller Suchparameter.
+
+    - `centers` sind 'ort'-Felder im Link-Format (z. B. 'Berlin_13.38_52.53'),
+      Ortsnamen oder Postleitzahlen
+    - Doppelte Kombinationen werden entfernt (auch verschiedene Eingaben für dasselbe Zentrum)
+    - Alle Radien um dasselbe Zentrum (gleiche Job-ID & Bildungsart) werden zu einer
+      Gruppe zusammengefasst: nur der größte Radius wird abgefragt, die kleineren
+      werden über den Such-Cache lokal abgeleitet
+    """
+    groups = {}
+    for ort in dict.fromkeys(centers):
+        city, lat, lon = resolve_center(ort)
+        for job_id in dict.fromkeys(int(j) for j in job_ids):
+            for bart in dict.fromkeys(int(b) for b in barts):
+                group = groups.setdefault((job_id, city, round(lat, 6), round(lon, 6), bart), {
+                    'where': city, 'job_id': job_id, 'lat': lat, 'lon': lon,
+                    'bart': bart, 'radii': set()
+                })
+                group['radii'].update(int(r) for r in radii)
+
+    plan = []
+    for group in groups.values():
+        group['radii'] = sorted(group['radii'], reverse=True)
+        plan.append(group)
+    return plan
+
+
+def run_sweep(plan, progress=None, max_parallel=SWEEP_MAX_PARALLEL, delta=None, memory_cap_mb=None):
+    """
+    🚀 Führt eine geplante Matrix-Suche aus.
+
+    Alle Gruppen teilen sich einen gemeinsamen Angebotsspeicher (ID → Angebot);
+    pro Suchzelle werden nur die Angebots-IDs (als Tupel) und die Anzahl je
+    Anbieter festgehalten. Gibt (offer_store, cells) zurück, wobei `cells` eine
+    Liste von SweepCell-Einträgen ist. Mit Speichergrenze (`memory_cap_mb` bzw.
+    MEMORY_CAP_MB) ist der Angebotsspeicher ein OfferStore und Cache-Einträge
+    fertiger Gruppen werden verworfen. Die ID-Tupel der Zellen liegen weiterhin
+    im Speicher und wachsen mit der Summe aller Zellgrößen.
+    Mit `delta` (Standard: DELTA_CRAWL) werden unveränderte Suchen aus der Datenbank übernommen.
+    """
+    fetch = get_offers_delta if (DELTA_CRAWL if delta is None else delta) else get_all_offers
+    offer_store = new_offer_store(memory_cap_mb)
+    bounded = isinstance(offer_store, OfferStore)
+    cells = []
+    lock = threading.Lock()
+
+    def run_group(group):
+        # Größter Radius zuerst → kleinere Radien sind Cache-Treffer
+        for radius in group['radii']:
+            fetch_stats = {}
+            offers = fetch(
+                group['where'], group['job_id'], radius,
+                group['lat'], group['lon'], group['bart'],
+                stats=fetch_stats
+            )
+            cell_offers = {o['id']: o for o in offers if is_valid_offer(o)}
+            provider_counts = Counter(o['angebot']['bildungsanbieter']['name'] for o in cell_offers.values())
+            with lock:
+                for offer_id, o in cell_offers.items():
+                    offer_store.setdefault(offer_id, o)
+                cells.append(SweepCell(group['job_id'], group['where'], radius, group['bart'],
+                                       group['lat'], group['lon'], tuple(cell_offers), provider_counts))
+            if progress:
+                source = "Cache" if fetch_stats['cache_hit'] else f"{fetch_stats['requests']} Requests"
+                if fetch_stats.get('delta'):
+                    source += f", {fetch_stats['delta']}"
+                progress(f"{group['job_id']} / {group['where']} / {radius} km / {group['bart']}: "
+                         f"{len(cell_offers)} Angebote ({source})")
+        if bounded:
+            evict_cached_offers(group['where'], group['job_id'], group['lat'], group['lon'], group['bart'])
+
+    warm_up_connections()
+    with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+        futures = [executor.submit(run_group, g) for g in plan]
+        for f in futures:
+            try:
+                f.result()
+            except Exception as e:
+                print(f"Fehler in Matrix-Suche: {e}")
+                if progress:
+                    progress(f"⚠️ Fehler in Suchgruppe: {e}")
+
+    return offer_store, cells
+
+
+def sweep_place_labels(cells):
+    """
+    🏷️ Anzeigename je Zentrum (Ort, lat, lon): der Ortsname – bei gleichnamigen
+    Zentren (z. B. mehrere 'Neustadt') ergänzt um die Koordinaten.
+    """
+    centers = defaultdict(set)
+    for cell in cells:
+        centers[cell.where].add((round(cell.lat, 6), round(cell.lon, 6)))
+    labels = {}
+    for where, coords in centers.items():
+        for lat, lon in coords:
+            labels[(where, lat, lon)] = where if len(coords) == 1 else f"{where} ({lat:.4f}, {lon:.4f})"
+    return labels
+
+
+def sweep_cell_place(labels, cell):
+    return labels[(cell.where, round(cell.lat, 6), round(cell.lon, 6))]
+
+
+def build_sweep_pivot(offer_store, cells):
+    """
+    📊 Erstellt eine Pivot-Tabelle Anbieter × (Job-ID, Ort, Radius, Bildungsart)
+    mit der Anzahl eindeutiger Angebote je Zelle (Anbieter kanonisiert).
+    Gleichnamige Zentren erhalten eigene Spalten (siehe sweep_place_labels).
+    """
+    # Gesamtzahl je Rohname in einem Durchlauf über den Speicher; gezählt wird
+    # je Anbieter (nicht je Angebot), der Speicherbedarf hängt also nur von der
+    # Zahl der Anbieter ab
+    raw_totals = Counter(offer["angebot"]["bildungsanbieter"]["name"] for offer in offer_store.values())
+    names = resolve_provider_names(raw_totals)
+    labels = sweep_place_labels(cells)
+    counts = defaultdict(int)
+    for cell in cells:
+        place = sweep_cell_place(labels, cell)
+        provider_counts = cell.provider_counts
+        if provider_counts is None:
+            provider_counts = Counter(offer_store[i]["angebot"]["bildungsanbieter"]["name"] for i in cell.offer_ids)
+        for raw, n in provider_counts.items():
+            counts[(names[raw], cell.job_id, place, cell.radius, cell.bart)] += n
+    if not counts:
+        return pd.DataFrame()
+
+    index = pd.MultiIndex.from_tuples(
+        counts.keys(), names=["Anbieter", "Job-ID", "Ort", "Radius (km)", "Bildungsart"]
+    )
+    pivot = pd.Series(list(counts.values()), index=index).unstack(
+        ["Job-ID", "Ort", "Radius (km)", "Bildungsart"], fill_value=0
+    )
+    # Gesamtzahl eindeutiger Angebote je Anbieter über alle Zellen hinweg
+    totals = Counter()
+    for raw, n in raw_totals.items():
+        totals[names[raw]] += n
+    total = pd.Series(totals)
+    total = total[total.index.isin(pivot.index)]
+    pivot[("Gesamt (eindeutig)", "", "", "")] = total
+    return pivot.loc[total.sort_values(ascending=False).index]
+
+
+def export_sweep(pivot, filename, manifest=None):
+    """
+    📁 Schreibt die Matrix nach Excel; ein `manifest` steht im Blatt 'Metadaten'
+    und wird nach dem Export (mit dessen Dauer) als <Name>.manifest.json abgelegt.
+    Gibt die geschriebenen Pfade zurück.
+    """
+    export_start = time.perf_counter()
+    base = os.path.splitext(filename)[0]
+    if manifest is not None:
+        manifest['exports'] = [os.path.basename(filename), os.path.basename(base + MANIFEST_SUFFIX)]
+    with pd.ExcelWriter(filename) as writer:
+        pivot.to_excel(writer)
+        if manifest is not None:
+            pd.DataFrame(_flatten_metadata(manifest), columns=["Feld", "Wert"]).to_excel(
+                writer, sheet_name="Metadaten", index=False)
+    if manifest is None:
+        return [filename]
+    write_manifest(base + MANIFEST_SUFFIX, finish_manifest(manifest, time.perf_counter() - export_start))
+    return [filename, base + MANIFEST_SUFFIX]
+
+
+def run_sweep_with_manifest(plan, progress=None, delta=None, memory_cap_mb=None, store=False):
+    """
+    🧮 Matrix-Suche samt Auswertung für den Export (GUI und Kommandozeile):
+    run_sweep, Pivot-Tabelle, optional Läufe für Trendberichte speichern.
+    Rückgabe: (pivot, manifest, Anzahl eindeutiger Angebote) – das Manifest
+    erhält Laufzeiten, Transport-Kennzahlen und je Suchzelle die Angebotszahl.
+    """
+    started_at = datetime.now()
+    run_clock = time.perf_counter()
+    timings = {}
+    transport_before = transport_stats()
+
+    stage_start = time.perf_counter()
+    offer_store, cells = run_sweep(plan, progress=progress, delta=delta, memory_cap_mb=memory_cap_mb)
+    timings['abruf'] = time.perf_counter() - stage_start
+    transport_after = transport_stats()
+
+    stage_start = time.perf_counter()
+    pivot = build_sweep_pivot(offer_store, cells)
+    timings['auswertung'] = time.perf_counter() - stage_start
+    if store:
+        # Jede Suchzelle als eigener Lauf → eigene Trendsegmente
+        stage_start = time.perf_counter()
+        for cell in cells:
+            store_run({'job_id': cell.job_id, 'where': cell.where, 'lat': cell.lat, 'lon': cell.lon,
+                       'radius': cell.radius, 'bart': cell.bart},
+                      [offer_store[i] for i in cell.offer_ids])
+        timings['lauf_speichern'] = time.perf_counter() - stage_start
+        if progress:
+            progress(f"📈 {len(cells)} Läufe für Trendbericht gespeichert")
+    get_provider_resolver().save()
+    offer_count = len(offer_store)
+    if isinstance(offer_store, OfferStore):
+        offer_store.close()
+
+    timings['gesamt'] = time.perf_counter() - run_clock
+    transport = {key: transport_after[key] - transport_before[key] for key in ('requests', 'new_connections', 'retries')}
+    transport['http_version'] = transport_after['http_version']
+    manifest = build_sweep_manifest(
+        cells, started_at, delta=DELTA_CRAWL if delta is None else delta, transport=transport, timings=timings,
+        counts={'cells': len(cells), 'offers_unique': offer_count, 'providers': len(pivot)},
+    )
+    return pivot, manifest, offer_count
+
+
+# ============================================
+# 🌐 Lokaler Abfragedienst (HTTP/JSON)
+# ============================================
+# Mehrere Nutzer teilen sich über diesen Dienst einen Such-Cache, einen
+# Angebotsspeicher und das begrenzte Request-Budget zur BA-API.
+SERVICE_DEFAULT_PORT = 8765
+SERVICE_TIMEOUT = 300
+
+# Angebotsspeicher: ID → (Zeitpunkt, Angebot), älteste Einträge zuerst
+SERVICE_STORE_TTL = SEARCH_CACHE_TTL
+SERVICE_STORE_MAX_OFFERS = 200000
+
+service_offer_store = OrderedDict()
+service_store_lock = threading.Lock()
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def _stats_to_json(stats):
+    """
+    Wandelt Anbieterstatistiken in JSON-taugliche Form um (Mengen → sortierte Listen).
+    """
+    return {
+        name: {
+            'count': p['count'],
+            'collapsed_count': p['collapsed_count'],
+            'titles': sorted(p['titles']),
+            'locations': sorted(p['locations']),
+            'variants': sorted(p['variants']),
+        }
+        for name, p in stats.items()
+    }
+
+def store_service_offers(offers):
+    """
+    🗄️ Legt gültige Angebote im gemeinsamen Speicher ab und gibt sie nach ID zurück.
+    Ein erneuter Abruf überschreibt den gespeicherten Stand; abgelaufene Einträge
+    und – oberhalb von SERVICE_STORE_MAX_OFFERS – die ältesten werden entfernt.
+    """
+    now = time.monotonic()
+    with service_store_lock:
+        unique = {}
+        for o in offers:
+            if is_valid_offer(o):
+                service_offer_store[o['id']] = (now, o)
+                service_offer_store.move_to_end(o['id'])
+                unique[o['id']] = o
+        while service_offer_store:
+            stored_at, _ = next(iter(service_offer_store.values()))
+            if now - stored_at <= SERVICE_STORE_TTL and len(service_offer_store) <= SERVICE_STORE_MAX_OFFERS:
+                break
+            service_offer_store.popitem(last=False)
+    return unique
+
+def get_service_offer(offer_id):
+    """
+    📄 Liefert ein gespeichertes Angebot nach ID (aus einer früheren Suche eines
+    beliebigen Nutzers) oder None, wenn es unbekannt oder abgelaufen ist.
+    """
+    with service_store_lock:
+        entry = service_offer_store.get(offer_id)
+        if entry is None:
+            return None
+        stored_at, offer = entry
+        if time.monotonic() - stored_at > SERVICE_STORE_TTL:
+            del service_offer_store[offer_id]
+            return None
+        return offer
+
+def run_search(params):
+    """
+    🔎 Führt eine Suche inkl. Bereinigung und Anbieterauswertung aus.
+
+    Gleichzeitige identische Anfragen werden zusammengefasst (nur ein API-Durchlauf),
+    Angebote werden im gemeinsamen Speicher nach ID abgelegt.
+    Rückgabe: {'params', 'fetch', 'offers', 'stats'}
+    """
+    key = _search_cache_key(params['where'], params['job_id'], params['lat'], params['lon'], params['bart']) + (params['radius'],)
+    with _inflight_lock:
+        pending = _inflight.get(key)
+        owner = pending is None
+        if owner:
+            pending = _inflight[key] = {'event': threading.Event(), 'result': None, 'error': None}
+
+    if not owner:
+        pending['event'].wait()
+        if pending['error'] is not None:
+            raise pending['error']
+        return pending['result']
+
+    try:
+        fetch_stats = {}
+        offers = get_all_offers(
+            params['where'], params['job_id'], params['radius'],
+            params['lat'], params['lon'], params['bart'],
+            stats=fetch_stats
+        )
+        unique = store_service_offers(offers)
+        stats = count_offers_by_provider(unique.values())
+        pending['result'] = {
+            'params': params,
+            'fetch': fetch_stats,
+            'offers': list(unique.values()),
+            'stats': _stats_to_json(stats),
+        }
+        return pending['result']
+    except Exception as e:
+        pending['error'] = e
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        pending['event'].set()
+
+
+class SearchRequestHandler(BaseHTTPRequestHandler):
+    """
+    Beantwortet GET /search?beruf=&ort=&uk=&bart=, GET /offer?id= und GET /health.
+    'ort' im Link-Format ('Berlin_13.38_52.53') oder als Ortsname/PLZ;
+    /offer liefert ein Angebot aus dem gemeinsamen Speicher (ohne API-Abruf).
     """
-    new_offers = {}
-    missing_ids = 0
-    duplicate_ids = 0
 
-    for offer in offers:
-        # Skip any malformed or missing IDs
-        offer_id = offer.get("id")
-        if not offer_id:
-            missing_ids += 1
-            print("⚠️ Offer skipped (missing ID):", offer.get("angebot", {}).get("titel", "Kein Titel"))
-            continue
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == "/health":
+            self._send_json(200, {'status': 'ok', 'version': __version__, 'cached_searches': len(search_cache),
+                                  'stored_offers': len(service_offer_store),
+                                  'transport': transport_stats()})
+            return
+        if parsed.path == "/offer":
+            offer_id = parse_qs(parsed.query).get('id', [""])[0]
+            offer = get_service_offer(int(offer_id) if offer_id.isdigit() else offer_id)
+            if offer is None:
+                self._send_json(404, {'error': f"Angebot '{offer_id}' nicht gespeichert"})
+            else:
+                self._send_json(200, offer)
+            return
+        if parsed.path != "/search":
+            self._send_json(404, {'error': 'Unbekannter Pfad'})
+            return
 
-        if offer_id in new_offers:
-            duplicate_ids += 1
-            continue
+        qs = parse_qs(parsed.query)
+        try:
+            city, lat, lon = resolve_center(qs['ort'][0])
+            params = {
+                'where': city,
+                'job_id': int(qs['beruf'][0]),
+                'radius': int(qs.get('uk', [DEFAULT_RADIUS])[0]),
+                'lat': lat,
+                'lon': lon,
+                'bart': int(qs.get('bart', [DEFAULT_BART])[0]),
+            }
+        except (KeyError, ValueError) as e:
+            self._send_json(400, {'error': f"Ungültige Parameter: {e}"})
+            return
+        except Exception as e:
+            traceback.print_exc()
+            self._send_json(500, {'error': str(e)})
+            return
 
-        new_offers[offer_id] = offer
+        try:
+            self._send_json(200, run_search(params))
+        except Exception as e:
+            traceback.print_exc()
+            self._send_json(500, {'error': str(e)})
 
-    print(f"✅ safeback: {len(new_offers)} eindeutige Angebote gespeichert")
-    print(f"⚠️ {missing_ids} Angebote ohne ID übersprungen")
-    print(f"🔁 {duplicate_ids} doppelte Angebote ignoriert")
+    def log_message(self, format, *args):
+        print(f"[Dienst] {self.address_string()} {format % args}")
 
-    return new_offers
+
+def serve(host="127.0.0.1", port=SERVICE_DEFAULT_PORT):
+    """
+    🖥️ Startet den lokalen Abfragedienst. Jede Anfrage läuft in einem eigenen Thread.
+    """
+    server = ThreadingHTTPServer((host, port), SearchRequestHandler)
+    server.daemon_threads = True
+    warm_up_connections()
+    print(f"APISearch-Dienst läuft auf http://{host}:{port}/search")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        get_provider_resolver().save()
+
+
+def fetch_offers_from_service(service_url, params):
+    """
+    📡 Thin-Client: holt Angebote über den lokalen Dienst statt direkt von der BA-API.
+    Gibt (offers, fetch_stats) zurück – wie get_all_offers mit `stats`.
+    """
+    query = {
+        'beruf': params['job_id'],
+        'ort': f"{params['where']}_{params['lon']}_{params['lat']}",
+        'uk': params['radius'],
+        'bart': params['bart'],
+    }
+    response = requests.get(service_url.rstrip("/") + "/search", params=query, timeout=SERVICE_TIMEOUT)
+    payload = response.json()
+    if response.status_code != 200:
+        raise RuntimeError(f"Dienst meldet Fehler: {payload.get('error', response.status_code)}")
+    return payload['offers'], payload['fetch']
 
 
 # ============================================
@@ -478,9 +3686,9 @@ def safeback(offers):
 # ============================================
 # ============================================
 
-def run_main_logic():
+def run_main_logic(link=None):
     """
-    Führt den kompletten Analyse-Prozess aus:
+    Führt den kompletten Analyse-Prozess aus (optional für einen vorgegebenen Link):
     - Liest Suchparameter (entweder aus URL oder manueller Eingabe)
     - Fragt passende Ausbildungsangebote von der BA-API ab
     - Bereinigt und prüft alle Ergebnisse
@@ -491,6 +3699,19 @@ def run_main_logic():
     
     # Neues Fenster für Fortschrittsanzeige öffnen
     progress_win, progress_listbox, ok_button = show_progress_window()
+    search_url = link or url_entry.get()
+
+    # Exportdateien entstehen im Hintergrund; beim Schließen ohne Export verwerfen
+    pipeline = ExportPipeline(export_directory.get(), ndjson=export_ndjson_var.get())
+    # Angebotsspeicher erst schließen, wenn Lauf und Fenster beide fertig sind
+    run_offers = RunOfferStore()
+
+    def on_progress_destroy(event):
+        if event.widget is progress_win:
+            pipeline.abort()
+            run_offers.release("window")
+
+    progress_win.bind("<Destroy>", on_progress_destroy)
 
     # ------------------------------------------------------------
     # 🧩 Hilfsfunktion: Fortschrittsanzeige aktualisieren
@@ -509,27 +3730,44 @@ def run_main_logic():
     # 🧠 Hintergrundprozess: führt eigentliche Logik aus
     # ------------------------------------------------------------
     def task():
+        enricher = None
         try:
             # ============================================
             # 🔧 Parameter einlesen
             # ============================================
-            if use_url_mode.get():
+            if link or use_url_mode.get():
                 # Wenn URL-Modus aktiv: Parameter aus Link parsen
-                params = parse_url(url_entry.get())
+                params = parse_url(search_url)
             else:
                 # Wenn manuelle Eingabe aktiv: Werte direkt aus Eingabefeldern übernehmen
                 params = {
                     'where': city_entry.get(),
                     'job_id': int(job_id_entry.get()),
                     'radius': int(radius_entry.get()),
-                    'lat': float(lat_entry.get()),
-                    'lon': float(lon_entry.get()),
+                    'lat': lat_entry.get(),
+                    'lon': lon_entry.get(),
                     'bart': int(bart_entry.get())
                 }
+                if params['lat'].strip() and params['lon'].strip():
+                    params['lat'] = float(params['lat'])
+                    params['lon'] = float(params['lon'])
+                else:
+                    # Keine Koordinaten angegeben → offline im Ortsverzeichnis nachschlagen
+                    place = resolve_place(params['where'])
+                    if place is None:
+                        raise ValueError(f"Ort '{params['where']}' nicht im Ortsverzeichnis gefunden.")
+                    params.update(place)
+
+            # Laufzeiten je Schritt für das Lauf-Manifest
+            run_started = datetime.now()
+            run_clock = time.perf_counter()
+            timings = {}
+
+            # Verbindungen zur API schon aufbauen, während die Parameter angezeigt werden
+            transport_before = transport_stats()
+            if not service_url_var.get().strip() and not _warmed_up.is_set():
+                threading.Thread(target=warm_up_connections, daemon=True).start()
 
-            # Container für alle gefundenen Angebote & Statistiken
-            all_offers = {}
-            all_stats = []
             total_raw = 0     # Gesamtanzahl aller eingelesenen Datensätze
             
             root.after(0, lambda: add_progress(f"Suche starten..."))
@@ -582,48 +3820,73 @@ def run_main_logic():
             # ============================================
             # 🌐 Ausbildungsangebote über BA-API abrufen
             # ============================================
-            offers = get_all_offers(
-                params['where'], params['job_id'], params['radius'],
-                params['lat'], params['lon'], params['bart']
-            )
+            # Optional: Angebotsdetails parallel zum Seitenabruf nachladen (nur für den JSON-Export)
+            if enrich_details_var.get() and export_json_var.get():
+                enricher = DetailEnricher()
+            elif enrich_details_var.get():
+                root.after(0, lambda: add_progress("ℹ️ Angebotsdetails werden nur mit JSON-Export nachgeladen"))
+
+            def on_offers(page_offers):
+                # Jede geladene Seite sofort an Anreicherung & Export weiterreichen
+                if pipeline.aborted:
+                    raise ExportAborted("Fortschrittsfenster geschlossen")  # beendet den Abruf
+                if enricher:
+                    enricher.submit(page_offers)
+                pipeline.feed(page_offers)
+
+            stage_start = time.perf_counter()
+            service_url = service_url_var.get().strip()
+            if service_url:
+                # Thin-Client-Modus: gemeinsamer Dienst übernimmt Abruf & Cache
+                offers, fetch_stats = fetch_offers_from_service(service_url, params)
+                on_offers(offers)
+            else:
+                fetch_stats = {}
+                fetch = get_offers_delta if delta_crawl_var.get() else get_all_offers
+                offers = fetch(
+                    params['where'], params['job_id'], params['radius'],
+                    params['lat'], params['lon'], params['bart'],
+                    stats=fetch_stats,
+                    on_offers=on_offers
+                )
+            timings['abruf'] = time.perf_counter() - stage_start
+            transport_after = transport_stats()
+            sent = transport_after['requests'] - transport_before['requests']
+            if sent and not service_url:
+                opened = transport_after['new_connections'] - transport_before['new_connections']
+                retried = transport_after['retries'] - transport_before['retries']
+                root.after(0, lambda: add_progress(
+                    f"🔌 {sent} Requests über {opened} neue Verbindungen ({transport_after['http_version']}), {retried} Wiederholungen"))
+            if fetch_stats.get('delta') == 'unverändert':
+                root.after(0, lambda: add_progress(f"🔂 Suche unverändert seit dem letzten Abruf – alle {fetch_stats['pages_total']} Seiten geprüft"))
+            elif fetch_stats.get('delta') == 'stichprobe':
+                root.after(0, lambda: add_progress(
+                    f"🔂 Stichprobe unverändert ({fetch_stats['requests']} Requests) – gespeicherte Angebote übernommen, "
+                    f"{fetch_stats['pages_unverified']} Seiten ungeprüft"))
+            elif fetch_stats.get('delta') == 'geändert':
+                root.after(0, lambda: add_progress(f"🔂 Suche geändert: {fetch_stats['pages_changed']} von {fetch_stats['pages_changed'] + fetch_stats['pages_unchanged']} Seiten neu"))
+            if fetch_stats.get('capped'):
+                root.after(0, lambda: add_progress(f"⚠️ Die API meldet genau {API_RESULT_CAP} Treffer (bekannte Obergrenze) – Ergebnis ist vermutlich unvollständig"))
+            if fetch_stats['cache_hit']:
+                root.after(0, lambda: add_progress("♻️ Ergebnis aus größerer, bereits geladener Suche abgeleitet (keine API-Aufrufe)"))
+            elif fetch_stats.get('requests_saved'):
+                root.after(0, lambda n=fetch_stats['requests_saved']: add_progress(f"⏩ Treffer nach Entfernung sortiert – {n} Seitenabrufe eingespart"))
             
             total_raw += len(offers)
+            stage_start = time.perf_counter()
             
-            # ------------------------------------------------------------
-            # 🧹 Ungültige Einträge entfernen
-            # ------------------------------------------------------------
-            def is_valid_offer(offer):
-                try:
-                    # Must have an ID
-                    if not offer.get("id"):
-                        return False
-                    # Must have a title
-                    if not offer.get("angebot", {}).get("titel"):
-                        return False
-                    # Should have a provider
-                    if not offer.get("angebot", {}).get("bildungsanbieter", {}).get("name"):
-                        return False
-                    return True
-                except:
-                    return False
-                
-            offers = [o for o in offers if is_valid_offer(o)]
-
             # ============================================
-            # 🧾 Duplikate bereinigen
+            # 🧹 Ungültige Einträge entfernen & 🧾 Duplikate bereinigen
             # ============================================
-        
-            unique = {o.get("id"): o for o in offers if o.get("id")}
-            new_unique_offers = {
-                k: v for k, v in unique.items() if k not in all_offers
-            }
-        
-            # Save only new offers
-            all_offers.update(new_unique_offers)
-        
-            initial_count = len(offers)
-            deduped_count = len(unique)
-            duplicates_removed = initial_count - deduped_count
+            # Angebote wandern direkt in den (ggf. speicherbegrenzten) Angebotsspeicher
+            all_offers, initial_count = clean_offers(offers, gui_memory_cap())
+            run_offers.offers = all_offers
+            del offers
+            if isinstance(all_offers, OfferStore):
+                # Der Such-Cache hielte sonst alle Angebote ungekürzt im Speicher
+                evict_cached_offers(params['where'], params['job_id'], params['lat'], params['lon'], params['bart'])
+            duplicates_removed = initial_count - len(all_offers)
+            timings['bereinigung'] = time.perf_counter() - stage_start
 
             time.sleep(0.1)
             root.after(0, lambda: add_progress(f"{duplicates_removed} doppelte Angebote entfernt"))
@@ -631,32 +3894,27 @@ def run_main_logic():
             # ============================================
             # 📊 Auswertung nach Bildungsanbietern
             # ============================================
-            if new_unique_offers:
-                stats = count_offers_by_provider(new_unique_offers.values())
-                all_stats.append(stats)
-        
-                total_in_stats = sum(p["count"] for p in stats.values())
+            stage_start = time.perf_counter()
+            merged_stats = count_offers_by_provider_parallel(all_offers.values())
+            get_provider_resolver().save()
+            timings['auswertung'] = time.perf_counter() - stage_start
+            if all_offers:
+                total_in_stats = sum(p["count"] for p in merged_stats.values())
                 root.after(0, lambda: add_progress(f"{total_in_stats} neue Angebote gefunden"))
         
-                # Warnung, falls ein Anbieter auffällig viele Angebote liefert
-                for provider_name, p in stats.items():
-                    if p.get("count", 0) > params['radius']:
-                        root.after(0, lambda pn=provider_name, c=p["count"]: 
-                            add_progress(f"⚠️Warnung: Anbieter '{pn}' hat {c} Angebote in diesem Lauf, bitte Anzahl überprüfen!"))
+                # Warnung, falls ein Anbieter Beinahe-Duplikate liefert (gleicher Titel, Ort & Termin)
+                for provider_name, raw, collapsed in find_inflated_providers(merged_stats):
+                    root.after(0, lambda pn=provider_name, c=raw, k=collapsed:
+                        add_progress(f"⚠️Warnung: Anbieter '{pn}' hat {c} Angebote, davon nur {k} ohne Duplikate – bitte Anzahl überprüfen!"))
         
             else:
                 root.after(0, lambda: add_progress(f"ℹ️ Keine neuen Angebote im Such - Durchlauf."))
         
-            root.after(0, lambda n=len(new_unique_offers): add_progress(f"✅ Such - Durchlauf abgeschlossen – {n} neue Angebote gefunden"))
+            root.after(0, lambda n=len(all_offers): add_progress(f"✅ Such - Durchlauf abgeschlossen – {n} neue Angebote gefunden"))
             
             # ============================================
             # 📦 Ergebnisse zusammenfassen & exportieren
             # ============================================
-            unique_offers = safeback(all_offers.values())
-            merged_stats = count_offers_by_provider(unique_offers.values())
-
-
-                
             total_offers_final = len(all_offers)
             
             time.sleep(0.1)
@@ -667,7 +3925,22 @@ def run_main_logic():
             root.after(0, lambda: add_progress(f"Insgesamt {total_removed} doppelte Angebote entfernt ({total_raw} → {total_offers_final})"))
         
             
-            unique_offers = safeback(all_offers.values())
+            # all_offers ist bereits nach ID eindeutig (s. o.) – kein zweiter safeback-Durchlauf
+            unique_offers = all_offers
+
+            # Angebotsdetails abwarten und den Angeboten für den JSON-Export zuordnen
+            offer_details = {}
+            if enricher:
+                stage_start = time.perf_counter()
+                detail_stats = enricher.wait()
+                timings['details_warten'] = time.perf_counter() - stage_start
+                offer_details = enricher.details_for(unique_offers.values())
+                enricher.close()
+                root.after(0, lambda d=detail_stats: add_progress(
+                    f"🔬 Details: {d['fetched']} neu geladen, {d['cached']} aus Cache, {d['failed']} fehlgeschlagen"))
+                if detail_stats['endpoint_missing']:
+                    root.after(0, lambda: add_progress(
+                        "⚠️ Detail-Endpunkt antwortet nur mit 404 – Anreicherung abgebrochen (DETAIL_URL prüfen)"))
             
             time.sleep(0.1)
             root.after(0, add_progress("Fertig!"))
@@ -675,70 +3948,105 @@ def run_main_logic():
             root.after(0, lambda: add_progress("==========================="))
             time.sleep(0.1)
             root.after(0, lambda: add_progress("✅ Suche abgeschlossen."))
-            merged_stats = count_offers_by_provider(unique_offers.values())
+
+            # Lauf für Trendberichte in der lokalen Datenbank ablegen
+            if store_runs_var.get():
+                try:
+                    stage_start = time.perf_counter()
+                    run_id = store_run(params, unique_offers.values(), merged_stats)
+                    timings['lauf_speichern'] = time.perf_counter() - stage_start
+                    root.after(0, lambda r=run_id: add_progress(f"📈 Lauf #{r} für Trendbericht gespeichert"))
+                except Exception as e:
+                    print(f"Lauf konnte nicht gespeichert werden: {e}")
+                    root.after(0, lambda e=e: add_progress(f"⚠️ Lauf nicht gespeichert: {e}"))
             time.sleep(0.1)
             root.after(0, lambda: add_progress(f"{len(unique_offers)} Angebote von {len(merged_stats)} Anbietern können exportiert werden."))
             
             
             # Dateinamen dynamisch anhand Datum, Stadt und Job-ID erzeugen
-            now = datetime.now()
-            date_str = now.strftime("%Y-%m-%d")
-            date_time = now.strftime("%H-%M-%S")
-            safe_city = params['where']
-            # Replace common problematic characters
-            safe_city = re.sub(r'[\\/:*?"<>|; ]', '-', safe_city)
-            # You might also want to remove leading/trailing underscores
-            safe_city = safe_city.strip('_')
-            # Ensure it's not empty, or provide a default if it becomes empty
-            if not safe_city:
-                safe_city = "default_city"
-            filename = os.path.join(
-                export_directory.get(),
-                f"{date_str}_{params['job_id']}_{safe_city}_Arbeitsagentur_Ausbildungssuche_{date_time}.xlsx"
-            )
+            filename = export_filename(params, export_directory.get())
 
             # ------------------------------------------------------------
-            # 💾 Export in Excel + optional JSON
+            # 💾 Export in Excel + optional JSON / NDJSON / Parquet
             # ------------------------------------------------------------
+            # Die Schreiber starten sofort im Hintergrund (temporäre Dateien) …
+            timings['gesamt'] = time.perf_counter() - run_clock
+            transport = None
+            if not service_url:
+                transport = {key: transport_after[key] - transport_before[key]
+                             for key in ('requests', 'new_connections', 'retries')}
+                transport['http_version'] = transport_after['http_version']
+            manifest = build_run_manifest(
+                params, search_url, run_started, fetch_stats=fetch_stats, transport=transport,
+                timings=timings,
+                counts={
+                    'offers_raw': total_raw,
+                    'offers_valid': initial_count,
+                    'offers_unique': len(unique_offers),
+                    'offers_removed': total_raw - len(unique_offers),  # ungültig oder doppelt
+                    'providers': len(merged_stats),
+                    'offer_details': len(offer_details),
+                },
+            )
+            if not pipeline.finish(
+                filename, unique_offers, merged_stats, search_url, details=offer_details,
+                json_export=export_json_var.get(), parquet=export_parquet_var.get(), manifest=manifest
+            ):
+                raise ExportAborted("Fortschrittsfenster geschlossen")
+
             def finalize_export():
                 """
-                Erstellt die Exportdateien (Excel, optional JSON)
-                und zeigt eine Erfolgsmeldung an.
+                … und werden beim Klick auf Export nur noch abgewartet und atomar an ihr
+                Ziel verschoben. Zeigt anschließend eine Erfolgsmeldung an.
                 """
-                try:
-                    # Get the directory path and ensure it exists
-                    export_dir_path = export_directory.get()
-                    os.makedirs(export_dir_path, exist_ok=True)
-                    
-                    export_to_excel(merged_stats, search_url=url_entry.get(), filename=filename)
-                    add_progress(f"Excel gespeichert als:\n{filename}")
-            
-                    if export_json_var.get():
-                        json_path = filename.replace(".xlsx", ".json")
-                        with open(json_path, "w", encoding="utf-8") as f:
-                            json.dump(unique_offers, f, ensure_ascii=False, indent=4)
-                        add_progress(f"JSON gespeichert als:\n{json_path}")
-            
+                ok_button.config(state="disabled")
+                add_progress("Export läuft...")
+
+                def write():
+                    try:
+                        paths = pipeline.commit()
+                    except Exception as e:
+                        root.after(0, lambda e=e: (ok_button.config(state="normal"),
+                                                   messagebox.showerror("Fehler beim Export", str(e))))
+                        return
+                    root.after(0, lambda: done(paths))
+
+                def done(paths):
+                    for path in paths:
+                        add_progress(f"Gespeichert als:\n{path}")
                     add_progress("Export abgeschlossen.")
                     messagebox.showinfo(
                         "Fertig",
-                        f"{len(all_offers)} Angebote von {len(merged_stats)} Anbietern wurden exportiert."
+                        f"{len(unique_offers)} Angebote von {len(merged_stats)} Anbietern wurden exportiert."
                     )
                     progress_win.destroy()
-            
-                except Exception as e:
-                    messagebox.showerror("Fehler beim Export", str(e))
+
+                threading.Thread(target=write, daemon=True).start()
 
         
             root.after(0, lambda: ok_button.config(state="normal", command=finalize_export))
+
+            # Ergebnisse direkt in der Anwendung ansehen (ohne Datei);
+            # der Index entsteht einmal im Hintergrund und dient jedem geöffneten Fenster
+            offer_index = run_offers.index = build_offer_index(unique_offers)
+            root.after(0, lambda: ttk.Button(
+                progress_win, text="🔎 Ergebnisse anzeigen",
+                command=lambda: show_results_window(unique_offers, merged_stats, offer_index)
+            ).pack(side="left", padx=10, pady=10))
             
             # Export-Button aktivieren, sobald alles fertig ist
             ok_button.config(state="normal", command=finalize_export)
 
+        except ExportAborted:
+            print("Lauf abgebrochen: Fortschrittsfenster wurde geschlossen.")
         except Exception as e:
             print("Fehler aufgetreten:", str(e))
             traceback.print_exc()
             root.after(0, lambda e=e: messagebox.showerror("Fehler", str(e)))
+        finally:
+            if enricher:
+                enricher.close()
+            run_offers.release("task")
 
 
     # ============================================
@@ -748,383 +4056,1138 @@ def run_main_logic():
 
 
 
+# ============================================
+# 🧪 Lasttest gegen eine lokale Mock-API
+# ============================================
+# Simuliert viele gleichzeitige Nutzer mit mehreren Links, ohne die echte
+# BA-API zu belasten. Die Mock-API liefert deterministische Angebote rund um
+# ein festes Zentrum, nach Entfernung sortiert (wie die echte API).
+MOCK_CENTER = (52.520008, 13.404954)  # Berlin
+MOCK_MAX_DISTANCE_KM = 300
+MOCK_MAX_PAGE_SIZE = 1000
+
+class MockBARequestHandler(BaseHTTPRequestHandler):
+    """
+    🎭 Beantwortet Such- und Detailanfragen im Format der BA-API.
+    Einstellungen stehen am Server: total_offers, latency (s), error_rate.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and random.random() < server.error_rate:
+            self._send_json(503, {'error': 'simulierter Fehler'})
+            return
+
+        parsed = urlparse(self.path)
+        qs = parse_qs(parsed.query)
+        detail_id = parsed.path.rstrip("/").rsplit("/", 1)[-1]
+        if not parsed.path.rstrip("/").endswith("ausbildungsangebot"):
+            self._send_json(200, {'id': detail_id, 'kosten': 0, 'dauer': "mock"})
+            return
+
+        page = int(qs.get('page', ['0'])[0])
+        size = min(int(qs.get('size', [PAGE_SIZE])[0]), MOCK_MAX_PAGE_SIZE)
+        job_id = qs.get('ids', ['0'])[0]
+        total = server.total_offers
+        radius = qs.get('uk', [''])[0]
+        if radius.isdigit():
+            # Nur Angebote im Umkreis: Angebot i liegt MOCK_MAX_DISTANCE_KM * i / total_offers km entfernt
+            total = min(total, int(radius) * server.total_offers // MOCK_MAX_DISTANCE_KM + 1)
+        first = page * size
+        offers = [_mock_offer(job_id, i, server.total_offers) for i in range(first, min(first + size, total))]
+        self._send_json(200, {
+            '_embedded': {'termine': offers},
+            'page': {'size': size, 'number': page, 'totalElements': total,
+                     'totalPages': (total + size - 1) // size},
+        })
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _mock_offer(job_id, i, total):
+    """Angebot Nr. i: je höher i, desto weiter vom Zentrum entfernt."""
+    distance = MOCK_MAX_DISTANCE_KM * i / max(total, 1)
+    bearing = radians((i * 137.5) % 360)
+    lat = MOCK_CENTER[0] + distance / 111.2 * cos(bearing)
+    lon = MOCK_CENTER[1] + distance / (111.2 * cos(radians(MOCK_CENTER[0]))) * sin(bearing)
+    return {
+        'id': f"{job_id}-{i}",
+        'angebot': {'id': f"{job_id}-{i // 3}", 'titel': f"Mock-Kurs {job_id}/{i % 11}",
+                    'bildungsanbieter': {'name': f"Mock-Anbieter {i % 37}"}},
+        'adresse': {'ortStrasse': {'name': "Mockstadt", 'koordinaten': {'lat': lat, 'lon': lon}}},
+        'beginn': "2026-01-01",
+        'ende': "2026-12-31",
+    }
+
+
+def start_mock_server(host="127.0.0.1", port=0, total_offers=500, latency_ms=0, error_rate=0.0):
+    """
+    Startet die Mock-API in einem Hintergrund-Thread.
+    Gibt (server, api_url) zurück; beenden mit server.shutdown().
+    """
+    server = ThreadingHTTPServer((host, port), MockBARequestHandler)
+    server.daemon_threads = True
+    server.total_offers = total_offers
+    server.latency = latency_ms / 1000
+    server.error_rate = error_rate
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/infosysbub/absuche/pc/v1/ausbildungsangebot"
+
+
+def run_autotune_benchmark(total_offers=2000, latency_ms=20, radius=MOCK_MAX_DISTANCE_KM, samples=AUTOTUNE_SAMPLES):
+    """
+    ⏱️ Autotuning gegen die Mock-API mit Vorher/Nachher-Vergleich:
+    Round-Trips und Gesamtdauer eines vollständigen Abrufs mit PAGE_SIZE
+    und mit der ermittelten Seitengröße. AUTOTUNE_FILE bleibt unberührt.
+    """
+    global API_URL, DETAIL_URL, _page_size
+    server, mock_url = start_mock_server(total_offers=total_offers, latency_ms=latency_ms)
+    saved = (API_URL, DETAIL_URL, _page_size)
+    API_URL, DETAIL_URL = mock_url, mock_url + "/{angebot_id}"
+    try:
+        tuning = autotune_page_size("Mockstadt", 1, radius, DEFAULT_BART, samples=samples, save=False)
+        sizes = sorted({PAGE_SIZE, tuning['page_size']})
+        measured = benchmark_page_sizes("Mockstadt", 1, radius, *MOCK_CENTER, DEFAULT_BART, sizes, repeats=samples)
+    finally:
+        server.shutdown()
+        server.server_close()
+        API_URL, DETAIL_URL, _page_size = saved
+    return {
+        'tuning': tuning,
+        'before': {'page_size': PAGE_SIZE, **measured[PAGE_SIZE]},
+        'after': {'page_size': tuning['page_size'], **measured[tuning['page_size']]},
+    }
+
+
+def arrival_times(count, pattern="constant", rate=1.0):
+    """
+    ⏱️ Startzeitpunkte (Sekunden ab Teststart) für `count` Nutzer:
+    - constant: gleichmäßig, `rate` Nutzer pro Sekunde
+    - poisson: zufällige Abstände (exponentialverteilt) mit mittlerer Rate `rate`
+    - burst: alle gleichzeitig
+    """
+    if pattern == "burst":
+        return [0.0] * count
+    if pattern == "poisson":
+        times, t = [], 0.0
+        for _ in range(count):
+            times.append(t)
+            t += random.expovariate(rate)
+        return times
+    if pattern == "constant":
+        return [i / rate for i in range(count)]
+    raise ValueError(f"Unbekanntes Ankunftsmuster: {pattern}")
+
+
+def _percentile(values, q):
+    if not values:
+        return None
+    if len(values) == 1:
+        return round(values[0], 3)
+    return round(statistics.quantiles(values, n=100, method="inclusive")[q - 1], 3)
+
+
+def run_link_pipeline(link, export_dir=None, memory_cap_mb=None):
+    """
+    🔁 Verarbeitet einen Link wie run_main_logic, nur ohne Oberfläche:
+    Link auswerten, Angebote abrufen (seitenweise an die Export-Pipeline),
+    bereinigen, je Anbieter auswerten und – mit `export_dir` – Excel und Manifest schreiben.
+    Rückgabe: {'params', 'fetch', 'offers_raw', 'offers_valid', 'offers_unique', 'providers', 'exports'}
+    """
+    params = parse_url(link)
+    started_at = datetime.now()
+    run_clock = time.perf_counter()
+    timings = {}
+    pipeline = ExportPipeline(export_dir) if export_dir else None
+
+    stage_start = time.perf_counter()
+    fetch_stats = {}
+    offers = get_all_offers(
+        params['where'], params['job_id'], params['radius'], params['lat'], params['lon'], params['bart'],
+        stats=fetch_stats, on_offers=pipeline.feed if pipeline else None,
+    )
+    timings['abruf'] = time.perf_counter() - stage_start
+    total_raw = len(offers)
+
+    stage_start = time.perf_counter()
+    unique_offers, valid_count = clean_offers(offers, memory_cap_mb)
+    del offers
+    if isinstance(unique_offers, OfferStore):
+        evict_cached_offers(params['where'], params['job_id'], params['lat'], params['lon'], params['bart'])
+    timings['bereinigung'] = time.perf_counter() - stage_start
+
+    stage_start = time.perf_counter()
+    stats = count_offers_by_provider_parallel(unique_offers.values())
+    timings['auswertung'] = time.perf_counter() - stage_start
+
+    exports = []
+    if pipeline:
+        timings['gesamt'] = time.perf_counter() - run_clock
+        manifest = build_run_manifest(
+            params, link, started_at, fetch_stats=fetch_stats, timings=timings,
+            counts={'offers_raw': total_raw, 'offers_valid': valid_count,
+                    'offers_unique': len(unique_offers), 'providers': len(stats)},
+        )
+        pipeline.finish(export_filename(params, export_dir), unique_offers, stats, link, manifest=manifest)
+        exports = pipeline.commit()
+    result = {
+        'params': params,
+        'fetch': fetch_stats,
+        'offers_raw': total_raw,
+        'offers_valid': valid_count,
+        'offers_unique': len(unique_offers),
+        'providers': len(stats),
+        'exports': exports,
+    }
+    if isinstance(unique_offers, OfferStore):
+        unique_offers.close()
+    return result
+
+
+def load_test_links(users, links_per_user, radius):
+    """Links je Nutzer im Format der BA-Suche; jede Suche einmalig (keine Cache-Treffer)."""
+    lat, lon = MOCK_CENTER
+    return [
+        [f"https://web.arbeitsagentur.de/weiterbildungssuche/suche?beruf={user_no * links_per_user + link_no + 1}"
+         f"&ort=Mockstadt_{lon}_{lat}&uk={radius}"
+         for link_no in range(links_per_user)]
+        for user_no in range(users)
+    ]
+
+
+def _evict_links(user_links):
+    # Nur die Such-Cache-Einträge des Lasttests entfernen, Einträge echter Suchen bleiben
+    for links in user_links:
+        for link in links:
+            params = parse_url(link)
+            evict_cached_offers(params['where'], params['job_id'], params['lat'], params['lon'], params['bart'])
+
+
+def _load_test_pass(user_links, starts, export_dir, sample_interval, trace_memory=False):
+    """
+    Ein Durchlauf des Lasttests: jeder Nutzer verarbeitet seine Links wie im
+    Mehrfach-Link-Modus (validate_links, dann nacheinander run_link_pipeline).
+    Mit `trace_memory` läuft tracemalloc mit – die Zeiten sind dann verfälscht.
+    """
+    latencies, errors, requests_sent = [], [], []
+    results_lock = threading.Lock()
+    samples = []
+    stop_sampling = threading.Event()
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0] if trace_memory else None
+
+    def sampler():
+        while not stop_sampling.is_set():
+            samples.append((threading.active_count(), tracemalloc.get_traced_memory()[0] if trace_memory else None))
+            stop_sampling.wait(sample_interval)
+
+    def user(user_no, start_at):
+        time.sleep(max(0.0, start_at - (time.perf_counter() - t0)))
+        links, invalid, _ = validate_links(user_links[user_no])
+        user_dir = os.path.join(export_dir, f"nutzer_{user_no}") if export_dir else None
+        for link_no, (link, _) in enumerate(links):
+            t_start = time.perf_counter()
+            result = None
+            try:
+                result = run_link_pipeline(link, user_dir)
+                failed = not result['fetch'].get('complete') or not result['offers_unique']
+            except Exception as e:
+                failed = True
+                print(f"Lasttest-Fehler (Nutzer {user_no}): {e}")
+            elapsed = time.perf_counter() - t_start
+            with results_lock:
+                latencies.append(elapsed)
+                requests_sent.append(result['fetch'].get('requests', 0) if result else 0)
+                if failed:
+                    errors.append((user_no, link_no))
+        with results_lock:
+            errors.extend((user_no, line_no) for line_no, _, _ in invalid)
+
+    threading.Thread(target=sampler, daemon=True).start()
+    t0 = time.perf_counter()
+    try:
+        workers = [threading.Thread(target=user, args=(i, start), daemon=True) for i, start in enumerate(starts)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        duration = time.perf_counter() - t0
+    finally:
+        stop_sampling.set()
+        if trace_memory:
+            memory_after, memory_peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+    result = {'duration': duration, 'latencies': latencies, 'errors': errors,
+              'requests_sent': requests_sent, 'samples': samples}
+    if trace_memory:
+        result['memory'] = (memory_before, memory_peak, memory_after)
+    return result
+
+
+def run_load_test(users=10, links_per_user=5, arrival="constant", rate=2.0, page_size=None,
+                  radius=100, total_offers=500, latency_ms=20, error_rate=0.0, sample_interval=0.2,
+                  export=True, memory_pass=True):
+    """
+    🧪 Führt einen Lasttest gegen die Mock-API aus.
+
+    Jeder Nutzer startet zu seinem Ankunftszeitpunkt und verarbeitet seine Links wie im
+    Mehrfach-Link-Modus – je Link die komplette Verarbeitung aus run_link_pipeline
+    (Abruf, Bereinigung, Anbieterauswertung und mit `export` Excel + Manifest in einen
+    temporären Ordner). Zeiten stammen aus einem Durchlauf ohne tracemalloc; der
+    Speicher wird in einem zweiten, gleichen Durchlauf gemessen (`memory_pass`).
+    API-Adressen, Seitengröße und fremde Such-Cache-Einträge bleiben unverändert.
+    Gibt einen Bericht (dict) zurück.
+    """
+    global API_URL, DETAIL_URL, _page_size
+    saved = (API_URL, DETAIL_URL, _page_size)
+    user_links = load_test_links(users, links_per_user, radius)
+    starts = arrival_times(users, arrival, rate)
+    export_root = tempfile.TemporaryDirectory(prefix="APISearch_Lasttest_") if export else None
+    server = None
+    try:
+        server, mock_url = start_mock_server(total_offers=total_offers, latency_ms=latency_ms, error_rate=error_rate)
+        API_URL, DETAIL_URL = mock_url, mock_url + "/{angebot_id}"
+        if page_size:
+            set_page_size(page_size)
+        used_page_size = get_page_size()
+
+        threads_before = threading.active_count()
+        transport_before = transport_stats()
+        timing = _load_test_pass(user_links, starts, export_root and os.path.join(export_root.name, "zeit"),
+                                 sample_interval)
+        transport_after = transport_stats()
+        cache_entries = sum(1 for links in user_links for link in links if lookup_cached_offers(
+            *(parse_url(link)[key] for key in ('where', 'job_id', 'radius', 'lat', 'lon', 'bart'))) is not None)
+        memory = None
+        if memory_pass:
+            _evict_links(user_links)  # sonst käme der zweite Durchlauf komplett aus dem Cache
+            memory = _load_test_pass(user_links, starts, export_root and os.path.join(export_root.name, "speicher"),
+                                     sample_interval, trace_memory=True)
+    finally:
+        _evict_links(user_links)
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        API_URL, DETAIL_URL, _page_size = saved
+        if export_root is not None:
+            export_root.cleanup()
+
+    time.sleep(sample_interval)  # Sampler und Server-Threads auslaufen lassen
+    latencies, duration = timing['latencies'], timing['duration']
+    runs = len(latencies)
+    report = {
+        'users': users,
+        'links_per_user': links_per_user,
+        'arrival': arrival,
+        'page_size': used_page_size,
+        'export': export,
+        'duration_s': round(duration, 3),
+        'runs': runs,
+        'throughput_runs_per_s': round(runs / duration, 2) if duration else None,
+        'throughput_requests_per_s': round(sum(timing['requests_sent']) / duration, 2) if duration else None,
+        'latency_s': {
+            'p50': _percentile(sorted(latencies), 50),
+            'p95': _percentile(sorted(latencies), 95),
+            'p99': _percentile(sorted(latencies), 99),
+            'max': round(max(latencies), 3) if latencies else None,
+        },
+        'error_rate': round(len(timing['errors']) / runs, 4) if runs else None,
+        'requests': transport_after['requests'] - transport_before['requests'],
+        'retries': transport_after['retries'] - transport_before['retries'],
+        'new_connections': transport_after['new_connections'] - transport_before['new_connections'],
+        'memory_mb': None,
+        'threads': {
+            'start': threads_before,
+            'peak': max((count for count, _ in timing['samples']), default=threads_before),
+            'end': threading.active_count(),
+        },
+        'search_cache_entries': cache_entries,
+    }
+    if memory is not None:
+        memory_before, memory_peak, memory_after = memory['memory']
+        report['memory_mb'] = {
+            'start': round(memory_before / 1e6, 2),
+            'peak': round(memory_peak / 1e6, 2),
+            'end': round(memory_after / 1e6, 2),
+            'growth': round((memory_after - memory_before) / 1e6, 2),
+            'max_rss': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1) if resource else None,
+        }
+    return report
+
+
+# ============================================
+# 🖥️ Kommandozeile (ohne GUI)
+# ============================================
+def run_cli(argv):
+    """
+    Einstiegspunkt für Aufrufe mit Argumenten, z. B.:
+    APISearch.py serve --port 8765
+    APISearch.py autotune --beruf 7856 --ort Berlin
+    APISearch.py autotune --benchmark
+    APISearch.py sweep --beruf 7856 --ort "Berlin;Hamburg" --uk 25,50 --memory-cap-mb 200
+    APISearch.py trends --out Trendbericht.xlsx
+    APISearch.py fts "Fachinformatiker oder SAP"
+    APISearch.py loadtest --users 20 --links 5 --arrival poisson --page-size 100
+    APISearch.py bench-aggregate --offers 500000 --workers 8
+    Ohne Argumente startet die GUI.
+    """
+    parser = argparse.ArgumentParser(prog="APISearch")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="lokalen HTTP/JSON-Abfragedienst starten")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=SERVICE_DEFAULT_PORT)
+    serve_parser.add_argument("--page-size", type=int, help="Seitengröße fest vorgeben")
+
+    tune_parser = commands.add_parser("autotune", help="optimale Seitengröße für die API ermitteln")
+    tune_parser.add_argument("--beruf", type=int, help="Job-ID einer Beispielsuche mit vielen Treffern")
+    tune_parser.add_argument("--ort", help="Ort, z. B. 'Berlin' oder 'Berlin_13.38_52.53'")
+    tune_parser.add_argument("--uk", type=int, default=200, help="Radius in km")
+    tune_parser.add_argument("--bart", type=int, default=109)
+    tune_parser.add_argument("--samples", type=int, default=AUTOTUNE_SAMPLES, help="Messungen je Seitengröße")
+    tune_parser.add_argument("--benchmark", action="store_true",
+                             help="gegen die Mock-API tunen und Round-Trips/Dauer vorher/nachher vergleichen")
+    tune_parser.add_argument("--offers", type=int, default=2000, help="Angebote in der Mock-API (--benchmark)")
+    tune_parser.add_argument("--latency-ms", type=float, default=20, help="Latenz der Mock-API (--benchmark)")
+
+    sweep_parser = commands.add_parser("sweep", help="Matrix-Suche ohne GUI (z. B. nächtlich)")
+    sweep_parser.add_argument("--beruf", required=True, help="Job-IDs, kommagetrennt")
+    sweep_parser.add_argument("--ort", required=True, help="Orte/PLZ/'ort'-Felder, durch ';' getrennt")
+    sweep_parser.add_argument("--uk", default="50", help="Radien in km, kommagetrennt")
+    sweep_parser.add_argument("--bart", default="109", help="Bildungsarten, kommagetrennt")
+    sweep_parser.add_argument("--out", default="Matrix.xlsx", help="Ziel-Excel-Datei")
+    sweep_parser.add_argument("--memory-cap-mb", type=float, help="Angebote oberhalb dieser Grenze auf die Festplatte auslagern")
+    sweep_parser.add_argument("--store", action="store_true", help="Läufe für Trendberichte speichern")
+    sweep_parser.add_argument("--delta", action="store_true", help="unveränderte Suchen aus der Datenbank übernehmen")
+    sweep_parser.add_argument("--delta-verify-all", action="store_true",
+                              help="mit --delta jede Seite prüfen statt nur einer Stichprobe")
+
+    fts_parser = commands.add_parser("fts", help="gespeicherte Angebote im Volltext durchsuchen")
+    fts_parser.add_argument("query", nargs="?", default="", help="z. B. 'Fachinformatiker oder SAP'")
+    fts_parser.add_argument("--limit", type=int, default=FTS_DEFAULT_LIMIT)
+    fts_parser.add_argument("--rebuild", action="store_true", help="Index aus allen gespeicherten Angeboten neu aufbauen")
+
+    load_parser = commands.add_parser("loadtest", help="Lasttest gegen eine lokale Mock-API")
+    load_parser.add_argument("--users", type=int, default=10)
+    load_parser.add_argument("--links", type=int, default=5, help="Links je Nutzer")
+    load_parser.add_argument("--arrival", choices=("constant", "poisson", "burst"), default="constant")
+    load_parser.add_argument("--rate", type=float, default=2.0, help="Nutzer pro Sekunde (constant/poisson)")
+    load_parser.add_argument("--page-size", type=int)
+    load_parser.add_argument("--uk", type=int, default=100, help="Radius in km")
+    load_parser.add_argument("--offers", type=int, default=500, help="Angebote je Suche in der Mock-API")
+    load_parser.add_argument("--latency-ms", type=float, default=20)
+    load_parser.add_argument("--error-rate", type=float, default=0.0)
+    load_parser.add_argument("--no-export", action="store_true", help="ohne Excel-/Manifest-Export je Link")
+    load_parser.add_argument("--no-memory-pass", action="store_true", help="Speicher nicht in zweitem Durchlauf messen")
+
+    bench_parser = commands.add_parser("bench-aggregate", help="serielle vs. parallele Anbieterauswertung messen")
+    bench_parser.add_argument("--offers", type=int, default=200000, help="Anzahl synthetischer Angebote")
+    bench_parser.add_argument("--workers", type=int, help="Prozesse (Standard: Anzahl CPU-Kerne)")
+
+    trends_parser = commands.add_parser("trends", help="Trendbericht aus gespeicherten Läufen exportieren")
+    trends_parser.add_argument("--out", default="Trendbericht.xlsx", help="Ziel-Excel-Datei")
+    trends_parser.add_argument("--beruf", type=int, help="nur diese Job-ID")
+    trends_parser.add_argument("--ort", help="nur diesen Ort, z. B. 'Neustadt' (alle gleichnamigen) oder 'Neustadt_11.12_50.33'")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        if args.page_size:
+            set_page_size(args.page_size)
+        serve(args.host, args.port)
+    elif args.command == "autotune":
+        if args.benchmark:
+            tuning = run_autotune_benchmark(args.offers, args.latency_ms, samples=args.samples)
+        elif args.beruf is None or not args.ort:
+            tune_parser.error("--beruf und --ort sind erforderlich (außer mit --benchmark)")
+        else:
+            where = resolve_center(args.ort)[0]
+            tuning = autotune_page_size(where, args.beruf, args.uk, args.bart, samples=args.samples)
+        print(json.dumps(tuning, ensure_ascii=False, indent=2))
+    elif args.command == "sweep":
+        global MEMORY_CAP_MB, DELTA_VERIFY_ALL
+        if args.memory_cap_mb:
+            MEMORY_CAP_MB = args.memory_cap_mb
+        DELTA_VERIFY_ALL = args.delta_verify_all
+        split = lambda text, sep=",": [part.strip() for part in text.split(sep) if part.strip()]
+        plan = plan_sweep(split(args.beruf), split(args.ort, ";"), split(args.uk), split(args.bart))
+        pivot, manifest, offer_count = run_sweep_with_manifest(plan, progress=print, delta=args.delta, store=args.store)
+        paths = export_sweep(pivot, args.out, manifest)
+        print(f"{offer_count} eindeutige Angebote von {len(pivot)} Anbietern → {', '.join(paths)}")
+    elif args.command == "fts":
+        if args.rebuild:
+            print(f"{rebuild_fts_index()} Angebote indexiert")
+        if args.query:
+            resolver = get_provider_resolver()
+            offers = search_stored_offers(args.query, limit=args.limit)
+            for offer_id, offer in offers.items():
+                fields = _offer_search_fields(offer, resolver.resolve(offer['angebot']['bildungsanbieter']['name']))
+                print(f"{offer_id}\t{fields[1]}\t{fields[0]}\t{fields[2]}")
+            print(f"{len(offers)} Treffer", file=sys.stderr)
+    elif args.command == "loadtest":
+        report = run_load_test(
+            users=args.users, links_per_user=args.links, arrival=args.arrival, rate=args.rate,
+            page_size=args.page_size, radius=args.uk, total_offers=args.offers,
+            latency_ms=args.latency_ms, error_rate=args.error_rate,
+            export=not args.no_export, memory_pass=not args.no_memory_pass,
+        )
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    elif args.command == "bench-aggregate":
+        print(json.dumps(benchmark_aggregation(args.offers, args.workers), ensure_ascii=False, indent=2))
+    elif args.command == "trends":
+        row_count = export_trend_report(args.out, job_id=args.beruf, region=args.ort)
+        print(f"{row_count} Trendzeilen → {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    # Nötig für Worker-Prozesse in der PyInstaller-.exe
+    multiprocessing.freeze_support()
+    if len(sys.argv) > 1:
+        sys.exit(run_cli(sys.argv[1:]))
+
+
 # ============================================
 # 📘 GUI
 # ============================================
 # 📘 Hier beginnt der GUI Abschnitt
 # ============================================
-root = tk.Tk()
-def on_close():
-    # Optionally confirm with the user
-    if messagebox.askokcancel("Beenden", "Möchten Sie die Anwendung wirklich schließen?"):
-        root.quit()     # Exit the Tkinter mainloop
-        root.destroy()  # Destroy all widgets and properly clean up
-
-def clear_placeholder(event):
-    if url_entry.get() == placeholder:
-        url_entry.delete(0, tk.END)
-        url_entry.configure(style="Normal.TEntry")
-
-def restore_placeholder(event):
-    if not url_entry.get():
-        url_entry.insert(0, placeholder)
-        url_entry.configure(style="Placeholder.TEntry")
+# Die GUI wird nur beim direkten Start aufgebaut – nicht beim Import und nicht
+# in den Worker-Prozessen der parallelen Auswertung.
+if __name__ == "__main__":
+    root = tk.Tk()
+    def on_close():
+        # Optionally confirm with the user
+        if messagebox.askokcancel("Beenden", "Möchten Sie die Anwendung wirklich schließen?"):
+            root.quit()     # Exit the Tkinter mainloop
+            root.destroy()  # Destroy all widgets and properly clean up
+
+    def clear_placeholder(event):
+        if url_entry.get() == placeholder:
+            url_entry.delete(0, tk.END)
+            url_entry.configure(style="Normal.TEntry")
+
+    def restore_placeholder(event):
+        if not url_entry.get():
+            url_entry.insert(0, placeholder)
+            url_entry.configure(style="Placeholder.TEntry")
         
-root.protocol("WM_DELETE_WINDOW", on_close)
+    root.protocol("WM_DELETE_WINDOW", on_close)
 
-root.title("Ausbildungsangebote-Analyse v1")
-root.geometry("800x650")  # Adjusted to fit long link and spacing
+    root.title("Ausbildungsangebote-Analyse v1")
+    root.geometry("800x870")  # Adjusted to fit long link and spacing
 
-use_url_mode = tk.BooleanVar(value=True)
-export_json_var = tk.BooleanVar(value=False)
+    use_url_mode = tk.BooleanVar(value=True)
+    export_json_var = tk.BooleanVar(value=False)
 
-# ============================================
-# 📘 Guide- und Readme Text
-# ============================================
+    # ============================================
+    # 📘 Guide- und Readme Text
+    # ============================================
 
-guide_text = (
-    "👋 Willkommen! Dieses Tool zeigt dir, wie viele Wettbewerber in deiner Stadt\n "
-    "für unsere Umschulungen aktiv sind – z. B. KABÜ, KITS, FISI oder FIAE.\n\n"
-    "Du kannst es auch für andere Ausbildungsangebote nutzen, etwa um neue Themen\n "
-    "oder Standorte zu prüfen.\n\n"
-    "👉 Wähle einfach, wie du suchen möchtest:\n"
-    "• über einen vollständigen Link von der BA-Seite,\n"
-    "• über mehrere Links gleichzeitig, oder\n"
-    "• manuell mit Stadt, Berufs-ID und Radius.\n"
-)
-tk.Label(root, text=guide_text, justify="left", wraplength=880, fg="gray25").grid(row=0, column=0, columnspan=3, pady=(10, 5), padx=(20,0), sticky="w")
-
-readme_text = (
-    "📘 **Anleitung & Hintergrund**\n\n"
-    "Dieses Tool hilft dir dabei, die Ausbildungsangebote der Bundesagentur für Arbeit (BA) "
-    "zu analysieren – speziell mit Blick auf unsere Umschulungen wie KABÜ, KITS, FISI oder FIAE.\n"
-    "So kannst du schnell erkennen, welche Wettbewerber in einer Region aktiv sind, "
-    "und Trends bei neuen Bildungsangeboten einschätzen.\n\n"
-    "Dieses Tool durchsucht die öffentlichen Ausbildungsangebote der Bundesagentur für Arbeit (BA)\n" 
-    "über die offizielle API und wertet sie strukturiert aus.\n" 
-    "Es eignet sich ideal zur Analyse von Anbietern, Kursen und Standorten bei Umschulungen und Ausbildungen.\n\n"
-
-    "✅ **Was das Tool für dich macht:**\n"
-    "• Automatisiertes Abrufen von Ausbildungsangeboten über Link oder manuelle Eingabe\n" 
-    "• Verarbeitung einzelner oder mehrerer Links (je Zeile ein Link)\n" 
-    "• Entfernung von Duplikaten und Filterung ungültiger Angebote\n" 
-    "• Gruppierung und Zählung der Angebote pro Bildungsanbieter\n" 
-    "• Export als Excel (.xlsx) oder optional als JSON\n\n"
-
-    "🚀 **So nutzt du das Tool Schritt für Schritt:**\n"
-    "1. Öffne die Website der BA-Ausbildungssuche und kopiere einen vollständigen Link "
-    "(z. B. mit 'beruf=1234&ort=Berlin_...')\n"
-    "2. Wähle, wie du arbeiten möchtest:\n"
-    " • ✅ 'URL für Parameter verwenden' – für einen einzelnen Link\n" 
-    " • ✅ 'Mehrere Links verarbeiten' – für mehrere Links (je Zeile ein Link)\n" 
-    " • ❌ Beides deaktivieren – um manuell Stadt, ID, Radius etc. einzugeben\n"
-    "3. Klicke auf 'Start' – das Tool liest die Daten aus und zeigt dir die Ergebnisse.\n"
-    "4. Du kannst die Ergebnisse danach exportieren – als Excel (Übersicht) oder JSON (Detaildaten).\n\n"
-
-
-    "⚠️ Wichtige Hinweise & Einschränkungen:\n" 
-    "• Nur Links mit einer konkreten Job-ID ('beruf=...') funktionieren\n" 
-    "• Implizite Suchanfragen ohne ID werden nicht unterstützt\n" 
-    "• Wenn mehr als 50 Angebote im Radius liegen, können nicht alle Ergebnisse\n" 
-    " von der API zurückgegeben werden (API-Beschränkung)\n" 
-    "• Anbieter wie 'WBS TRAINING AG' oder 'karriere tutor' liefern über die API\n" 
-    " manchmal mehr Angebote als auf der Website sichtbar sind\n" 
-    "• Ungültige Einträge (z. B. ohne ID oder Anbietername) werden übersprungen\n" 
-    "• Dieses Tool arbeitet asynchron und parallelisiert, dennoch ist mit Ladezeiten\n" 
-    " bei vielen Treffern zu rechnen.\n\n"
-
-    "📁 **Empfehlung für die Auswertung:**\n"
-    "• Verwende die Excel-Datei für eine schnelle Übersicht oder zur Weitergabe im Team.\n"
-    "• Nutze den JSON-Export für tiefergehende Analysen oder zur internen Weiterverarbeitung.\n\n"
-
-    "🧩 **Technischer Hintergrund:**\n"
-    "Das Tool nutzt die öffentliche API der Bundesagentur für Arbeit, um Ausbildungsangebote "
-    "automatisiert abzufragen und strukturiert auszuwerten.\n\n"
-    "• API-Dokumentation: https://ausbildungssuche.api.bund.dev/\n"
-    "• GitHub-Projekt (open source): https://github.com/florianfreund/APISearch\n"
-)
+    guide_text = (
+        "👋 Willkommen! Dieses Tool zeigt dir, wie viele Wettbewerber in deiner Stadt\n "
+        "für unsere Umschulungen aktiv sind – z. B. KABÜ, KITS, FISI oder FIAE.\n\n"
+        "Du kannst es auch für andere Ausbildungsangebote nutzen, etwa um neue Themen\n "
+        "oder Standorte zu prüfen.\n\n"
+        "👉 Wähle einfach, wie du suchen möchtest:\n"
+        "• über einen vollständigen Link von der BA-Seite,\n"
+        "• über mehrere Links gleichzeitig, oder\n"
+        "• manuell mit Stadt, Berufs-ID und Radius.\n"
+    )
+    tk.Label(root, text=guide_text, justify="left", wraplength=880, fg="gray25").grid(row=0, column=0, columnspan=3, pady=(10, 5), padx=(20,0), sticky="w")
+
+    readme_text = (
+        "📘 **Anleitung & Hintergrund**\n\n"
+        "Dieses Tool hilft dir dabei, die Ausbildungsangebote der Bundesagentur für Arbeit (BA) "
+        "zu analysieren – speziell mit Blick auf unsere Umschulungen wie KABÜ, KITS, FISI oder FIAE.\n"
+        "So kannst du schnell erkennen, welche Wettbewerber in einer Region aktiv sind, "
+        "und Trends bei neuen Bildungsangeboten einschätzen.\n\n"
+        "Dieses Tool durchsucht die öffentlichen Ausbildungsangebote der Bundesagentur für Arbeit (BA)\n" 
+        "über die offizielle API und wertet sie strukturiert aus.\n" 
+        "Es eignet sich ideal zur Analyse von Anbietern, Kursen und Standorten bei Umschulungen und Ausbildungen.\n\n"
+
+        "✅ **Was das Tool für dich macht:**\n"
+        "• Automatisiertes Abrufen von Ausbildungsangeboten über Link oder manuelle Eingabe\n" 
+        "• Verarbeitung einzelner oder mehrerer Links (je Zeile ein Link)\n" 
+        "• Entfernung von Duplikaten und Filterung ungültiger Angebote\n" 
+        "• Gruppierung und Zählung der Angebote pro Bildungsanbieter\n" 
+        "• Export als Excel (.xlsx) oder optional als JSON\n\n"
+
+        "🚀 **So nutzt du das Tool Schritt für Schritt:**\n"
+        "1. Öffne die Website der BA-Ausbildungssuche und kopiere einen vollständigen Link "
+        "(z. B. mit 'beruf=1234&ort=Berlin_...')\n"
+        "2. Wähle, wie du arbeiten möchtest:\n"
+        " • ✅ 'URL für Parameter verwenden' – für einen einzelnen Link\n" 
+        " • ✅ 'Mehrere Links verarbeiten' – für mehrere Links (je Zeile ein Link)\n" 
+        " • ❌ Beides deaktivieren – um manuell Stadt, ID, Radius etc. einzugeben\n"
+        "3. Klicke auf 'Start' – das Tool liest die Daten aus und zeigt dir die Ergebnisse.\n"
+        "4. Du kannst die Ergebnisse danach exportieren – als Excel (Übersicht) oder JSON (Detaildaten).\n\n"
+
+
+        "⚠️ Wichtige Hinweise & Einschränkungen:\n" 
+        "• Nur Links mit einer konkreten Job-ID ('beruf=...') funktionieren\n" 
+        "• Implizite Suchanfragen ohne ID werden nicht unterstützt\n" 
+        "• Wenn mehr als 50 Angebote im Radius liegen, können nicht alle Ergebnisse\n" 
+        " von der API zurückgegeben werden (API-Beschränkung)\n" 
+        "• Anbieter wie 'WBS TRAINING AG' oder 'karriere tutor' liefern über die API\n" 
+        " manchmal mehr Angebote als auf der Website sichtbar sind\n" 
+        "• Ungültige Einträge (z. B. ohne ID oder Anbietername) werden übersprungen\n" 
+        "• Dieses Tool arbeitet asynchron und parallelisiert, dennoch ist mit Ladezeiten\n" 
+        " bei vielen Treffern zu rechnen.\n\n"
+
+        "📁 **Empfehlung für die Auswertung:**\n"
+        "• Verwende die Excel-Datei für eine schnelle Übersicht oder zur Weitergabe im Team.\n"
+        "• Nutze den JSON-Export für tiefergehende Analysen oder zur internen Weiterverarbeitung.\n\n"
+
+        "🧩 **Technischer Hintergrund:**\n"
+        "Das Tool nutzt die öffentliche API der Bundesagentur für Arbeit, um Ausbildungsangebote "
+        "automatisiert abzufragen und strukturiert auszuwerten.\n\n"
+        "• API-Dokumentation: https://ausbildungssuche.api.bund.dev/\n"
+        "• GitHub-Projekt (open source): https://github.com/florianfreund/APISearch\n"
+    )
 
 
 
-# Textfeld mit möglichen Bildungsarten
-bart_text = (
-    "Bildungsarten: \n"
-    "100=Allgemeinbildung, 101=Teilqualifizierung, 102=Berufsausbildung, \n"
-    "103=Gesetzlich/gesetzesähnlich geregelte Fortbildung/Qualifizierung, \n"
-    "104=Fortbildung/Qualifizierung, 105=Abschluss nachholen, 106=Rehabilitation, \n"
-    "107108=Studienangebot - grundständig, 109=Umschulung"
-)
+    # Textfeld mit möglichen Bildungsarten
+    bart_text = (
+        "Bildungsarten: \n"
+        "100=Allgemeinbildung, 101=Teilqualifizierung, 102=Berufsausbildung, \n"
+        "103=Gesetzlich/gesetzesähnlich geregelte Fortbildung/Qualifizierung, \n"
+        "104=Fortbildung/Qualifizierung, 105=Abschluss nachholen, 106=Rehabilitation, \n"
+        "107108=Studienangebot - grundständig, 109=Umschulung"
+    )
 
-# ============================================
-# 📘 GUI-Abschnitt für "README / Anleitung"
-# ============================================
+    # ============================================
+    # 📘 GUI-Abschnitt für "README / Anleitung"
+    # ============================================
 
 
-def show_readme_window():
-    """
-    Öffnet ein neues Fenster mit einer Anleitung oder Beschreibung des Programms.
-    Der Text (readme_text + bart_text) wird in einem scrollbaren Textfeld angezeigt.
-    """
-    readme_win = tk.Toplevel(root) # Neues Unterfenster neben dem Hauptfenster
-    readme_win.title("📖 Anleitung und Hinweise")
-    readme_win.geometry("780x500")
-    readme_win.resizable(True, True)
+    def show_readme_window():
+        """
+        Öffnet ein neues Fenster mit einer Anleitung oder Beschreibung des Programms.
+        Der Text (readme_text + bart_text) wird in einem scrollbaren Textfeld angezeigt.
+        """
+        readme_win = tk.Toplevel(root) # Neues Unterfenster neben dem Hauptfenster
+        readme_win.title("📖 Anleitung und Hinweise")
+        readme_win.geometry("780x500")
+        readme_win.resizable(True, True)
+
+        # Container-Frame für einheitliche ttk-Gestaltung
+        container = ttk.Frame(readme_win, padding=10)
+        container.pack(fill="both", expand=True)
+
+        # Vertikale Scrollbar für das Textfeld
+        scrollbar = ttk.Scrollbar(container, orient="vertical")
+        scrollbar.pack(side="right", fill="y")
+
+        # Textfeld, in das der Hilfetext eingefügt wird
+        text_widget = tk.Text(
+            container,
+            wrap="word",             # Zeilenumbruch nach Wörtern
+            yscrollcommand=scrollbar.set,
+            bg="white",
+            fg="black",
+            font=("Segoe UI", 10),
+            relief="solid",
+            borderwidth=1,
+            padx=10,
+            pady=10
+        )
+        text_widget.pack(side="left", fill="both", expand=True)
+        scrollbar.config(command=text_widget.yview)
+
+        # Anleitungstext einfügen und Schreibschutz aktivieren
+        text_widget.insert("1.0", readme_text + "\n\n\n" + bart_text)
+        text_widget.config(state="disabled")
+
+
+    readme_button = tk.Button(
+        root,
+        text="📖 read Me",
+        command=show_readme_window,
+        bg="#d0e4f7",       # light blue background
+        fg="black",         # text color
+        font=("Segoe UI", 10, "bold"),
+        padx=10,
+        pady=5,
+        relief="raised",
+        borderwidth=2
+    )
+    readme_button.grid(row=0, column=1, sticky="e", padx=10, pady=10)
 
-    # Container-Frame für einheitliche ttk-Gestaltung
-    container = ttk.Frame(readme_win, padding=10)
-    container.pack(fill="both", expand=True)
 
-    # Vertikale Scrollbar für das Textfeld
-    scrollbar = ttk.Scrollbar(container, orient="vertical")
-    scrollbar.pack(side="right", fill="y")
+    # ============================================
+    # 🔗 Eingabefeld für URL (Einzeln oder Mehrfach)
+    # ============================================
+
+    # ttk-Stile für Platzhalter- und normale Eingaben
+    style = ttk.Style()
+    style.configure("Placeholder.TEntry", foreground="gray")
+    style.configure("Normal.TEntry", foreground="black")
+
+    # Beschriftung des URL-Felds
+    ttk.Label(root, text="Vollständiger Link:").grid(row=1, column=0, sticky="e", padx=5, pady=5)
+
+    # Platzhaltertext für das URL-Feld
+    placeholder = "https://web.arbeitsagentur.de/ausbildungssuche/......beispiellink......."
 
-    # Textfeld, in das der Hilfetext eingefügt wird
-    text_widget = tk.Text(
-        container,
-        wrap="word",             # Zeilenumbruch nach Wörtern
-        yscrollcommand=scrollbar.set,
-        bg="white",
-        fg="black",
-        font=("Segoe UI", 10),
+    # URL-Eingabefeld (einzelner Link)
+    url_entry = ttk.Entry(root, width=80, style="Placeholder.TEntry")
+    url_entry.insert(0, placeholder)
+    url_entry.grid(row=1, column=1, columnspan=2, sticky="we", padx=5, pady=5)
+
+    # Platzhalter-Funktionalität aktivieren
+    url_entry.bind("<FocusIn>", clear_placeholder)
+    url_entry.bind("<FocusOut>", restore_placeholder)
+
+    # Variable zur Steuerung, ob Mehrfach-URL-Modus aktiv ist
+    multi_url_mode = tk.BooleanVar(value=False)
+
+
+    # ============================================
+    # 🔁 Funktion zum Umschalten zwischen Einzel- und Mehrfach-Link-Modus
+    # ============================================
+
+
+    def toggle_multi_url_mode():
+        """
+        Aktiviert/Deaktiviert den Mehrfach-Link-Modus.
+        - Wenn aktiv: Einzelnes URL-Feld wird gesperrt, Mehrzeilenfeld wird aktiv.
+        - Wenn inaktiv: Umgekehrt.
+        """
+        if multi_url_mode.get():
+            # Mehrfachmodus aktiv → Einzel-URL-Feld sperren
+            url_entry.config(state='disabled')
+            checkbox_url.config(state='disabled')
+            multi_url_text.config(state='normal')
+            use_url_mode.set(True)
+            toggle_input_mode()
+            parse_button.config(state='disabled')
+            url_entry.config(state='disabled')
+        else:
+            # Einzelmodus aktiv → Textfeld sperren
+            url_entry.config(state='normal')
+            multi_url_text.config(state='disabled')
+            checkbox_url.config(state='normal')
+            parse_button.config(state='normal')
+            url_entry.config(state='normal')
+
+    # Checkbox zur Aktivierung des Mehrfach-Link-Modus
+    ttk.Checkbutton(
+        root,
+        text="Mehrere Links verarbeiten",
+        variable=multi_url_mode,
+        command=toggle_multi_url_mode
+    ).grid(row=4, column=1, sticky="w", padx=5, pady=5)
+
+    # Beschriftung für das Mehrzeilenfeld
+    ttk.Label(root, text="Mehrere Links (je Zeile ein Link):").grid(row=3, column=0, sticky="e")
+
+    # Frame als Container für das Textfeld (optisch wie ein Entry-Feld)
+    multi_url_frame = ttk.Frame(root)
+    multi_url_frame.grid(row=3, column=1, columnspan=2, sticky="we", padx=5, pady=5)
+
+    # Standard-Schriftart aus ttk übernehmen
+    default_font = ttk.Style().lookup("TEntry", "font")
+
+    # Mehrzeilen-Textfeld für mehrere URLs
+    multi_url_text = tk.Text(
+        multi_url_frame,
+        height=5,
+        width=80,
+        wrap="none",
+        font=default_font,
         relief="solid",
         borderwidth=1,
-        padx=10,
-        pady=10
+        background="white",
+        highlightthickness=0,
+        state="disabled"
     )
-    text_widget.pack(side="left", fill="both", expand=True)
-    scrollbar.config(command=text_widget.yview)
-
-    # Anleitungstext einfügen und Schreibschutz aktivieren
-    text_widget.insert("1.0", readme_text + "\n\n\n" + bart_text)
-    text_widget.config(state="disabled")
-
-
-readme_button = tk.Button(
-    root,
-    text="📖 read Me",
-    command=show_readme_window,
-    bg="#d0e4f7",       # light blue background
-    fg="black",         # text color
-    font=("Segoe UI", 10, "bold"),
-    padx=10,
-    pady=5,
-    relief="raised",
-    borderwidth=2
-)
-readme_button.grid(row=0, column=1, sticky="e", padx=10, pady=10)
 
 
-# ============================================
-# 🔗 Eingabefeld für URL (Einzeln oder Mehrfach)
-# ============================================
+    multi_url_text.grid(row=3, column=1, columnspan=2, sticky="we", padx=5)
+
 
-# ttk-Stile für Platzhalter- und normale Eingaben
-style = ttk.Style()
-style.configure("Placeholder.TEntry", foreground="gray")
-style.configure("Normal.TEntry", foreground="black")
+    # ============================================
+    # 🧭 Optionen und Parameter-Eingabefelder
+    # ============================================
 
-# Beschriftung des URL-Felds
-ttk.Label(root, text="Vollständiger Link:").grid(row=1, column=0, sticky="e", padx=5, pady=5)
+    # Checkbox: Soll die URL direkt für Parameter verwendet werden?
+    checkbox_url = ttk.Checkbutton(root, text="URL für Parameter verwenden", variable=use_url_mode, command=toggle_input_mode)
+    checkbox_url.grid(row=2, column=1, columnspan=2, sticky="w", pady=(5, 10))
 
-# Platzhaltertext für das URL-Feld
-placeholder = "https://web.arbeitsagentur.de/ausbildungssuche/......beispiellink......."
+    # Button, um aus der URL Parameter automatisch auszulesen
+    parse_button = ttk.Button(root, text="🔍 Link auslesen", command=populate_fields_from_link)
+    parse_button.grid(row=2, column=2, sticky="e", padx=(5, 10))
 
-# URL-Eingabefeld (einzelner Link)
-url_entry = ttk.Entry(root, width=80, style="Placeholder.TEntry")
-url_entry.insert(0, placeholder)
-url_entry.grid(row=1, column=1, columnspan=2, sticky="we", padx=5, pady=5)
+    # ============================================
+    # 📥 MANUELLE PARAMETER-EINGABE
+    # ============================================
 
-# Platzhalter-Funktionalität aktivieren
-url_entry.bind("<FocusIn>", clear_placeholder)
-url_entry.bind("<FocusOut>", restore_placeholder)
+    # Diese Felder werden verwendet, wenn keine URL geparst wird
+    # (also im manuellen Modus)
+    ttk.Label(root, text="Stadt (z.B. Berlin):").grid(row=5, column=0, sticky="e")
+    city_entry = ttk.Entry(root)
+    city_entry.insert(0, "Berlin")
+    city_entry.grid(row=5, column=1)
 
-# Variable zur Steuerung, ob Mehrfach-URL-Modus aktiv ist
-multi_url_mode = tk.BooleanVar(value=False)
+    def fill_place_fields(place):
+        """Trägt Stadtname und Koordinaten eines nachgeschlagenen Orts in die Eingabefelder ein."""
+        for entry, value in ((city_entry, place['where']), (lat_entry, f"{place['lat']:.6f}"), (lon_entry, f"{place['lon']:.6f}")):
+            entry.delete(0, tk.END)
+            entry.insert(0, value)
 
+    def fill_coordinates_from_city():
+        """
+        Sucht die eingegebene Stadt (oder PLZ) im Offline-Ortsverzeichnis
+        und trägt Stadtname und Koordinaten in die Eingabefelder ein.
+        """
+        resolve_place_interactive(city_entry.get(), fill_place_fields)
 
-# ============================================
-# 🔁 Funktion zum Umschalten zwischen Einzel- und Mehrfach-Link-Modus
-# ============================================
+    # Button: Koordinaten offline aus dem Ortsverzeichnis übernehmen
+    coords_button = ttk.Button(root, text="📍 Koordinaten suchen", command=fill_coordinates_from_city)
+    coords_button.grid(row=5, column=2, sticky="w")
 
+    ttk.Label(root, text="Berufs-ID:").grid(row=6, column=0, sticky="e")
+    job_id_entry = ttk.Entry(root)
+    job_id_entry.insert(0, "7856")
+    job_id_entry.grid(row=6, column=1)
 
-def toggle_multi_url_mode():
-    """
-    Aktiviert/Deaktiviert den Mehrfach-Link-Modus.
-    - Wenn aktiv: Einzelnes URL-Feld wird gesperrt, Mehrzeilenfeld wird aktiv.
-    - Wenn inaktiv: Umgekehrt.
-    """
-    if multi_url_mode.get():
-        # Mehrfachmodus aktiv → Einzel-URL-Feld sperren
-        url_entry.config(state='disabled')
-        checkbox_url.config(state='disabled')
-        multi_url_text.config(state='normal')
-        use_url_mode.set(True)
-        toggle_input_mode()
-        parse_button.config(state='disabled')
-        url_entry.config(state='disabled')
-    else:
-        # Einzelmodus aktiv → Textfeld sperren
-        url_entry.config(state='normal')
-        multi_url_text.config(state='disabled')
-        checkbox_url.config(state='normal')
-        parse_button.config(state='normal')
-        url_entry.config(state='normal')
-
-# Checkbox zur Aktivierung des Mehrfach-Link-Modus
-ttk.Checkbutton(
-    root,
-    text="Mehrere Links verarbeiten",
-    variable=multi_url_mode,
-    command=toggle_multi_url_mode
-).grid(row=4, column=1, sticky="w", padx=5, pady=5)
-
-# Beschriftung für das Mehrzeilenfeld
-ttk.Label(root, text="Mehrere Links (je Zeile ein Link):").grid(row=3, column=0, sticky="e")
-
-# Frame als Container für das Textfeld (optisch wie ein Entry-Feld)
-multi_url_frame = ttk.Frame(root)
-multi_url_frame.grid(row=3, column=1, columnspan=2, sticky="we", padx=5, pady=5)
-
-# Standard-Schriftart aus ttk übernehmen
-default_font = ttk.Style().lookup("TEntry", "font")
-
-# Mehrzeilen-Textfeld für mehrere URLs
-multi_url_text = tk.Text(
-    multi_url_frame,
-    height=5,
-    width=80,
-    wrap="none",
-    font=default_font,
-    relief="solid",
-    borderwidth=1,
-    background="white",
-    highlightthickness=0,
-    state="disabled"
-)
+    ttk.Label(root, text="Radius (km):").grid(row=7, column=0, sticky="e")
+    radius_entry = ttk.Entry(root)
+    radius_entry.insert(0, "50")
+    radius_entry.grid(row=7, column=1)
 
+    ttk.Label(root, text="Breitengrad (lat):").grid(row=8, column=0, sticky="e")
+    lat_entry = ttk.Entry(root)
+    lat_entry.insert(0, "52.531976")
+    lat_entry.grid(row=8, column=1)
 
-multi_url_text.grid(row=3, column=1, columnspan=2, sticky="we", padx=5)
+    ttk.Label(root, text="Längengrad (lon):").grid(row=9, column=0, sticky="e")
+    lon_entry = ttk.Entry(root)
+    lon_entry.insert(0, "13.386738")
+    lon_entry.grid(row=9, column=1)
 
+    ttk.Label(root, text="Bildungsart (Umschulung = 109):").grid(row=10, column=0, sticky="e")
+    bart_entry = ttk.Entry(root)
+    bart_entry.insert(0, "109")
+    bart_entry.grid(row=10, column=1)
 
-# ============================================
-# 🧭 Optionen und Parameter-Eingabefelder
-# ============================================
 
-# Checkbox: Soll die URL direkt für Parameter verwendet werden?
-checkbox_url = ttk.Checkbutton(root, text="URL für Parameter verwenden", variable=use_url_mode, command=toggle_input_mode)
-checkbox_url.grid(row=2, column=1, columnspan=2, sticky="w", pady=(5, 10))
+    # ============================================
+    # 💾 EXPORT-EINSTELLUNGEN
+    # ============================================
 
-# Button, um aus der URL Parameter automatisch auszulesen
-parse_button = ttk.Button(root, text="🔍 Link auslesen", command=populate_fields_from_link)
-parse_button.grid(row=2, column=2, sticky="e", padx=(5, 10))
+    # Variable speichert das aktuelle Exportverzeichnis
+    export_directory = tk.StringVar(value=os.getcwd())
 
-# ============================================
-# 📥 MANUELLE PARAMETER-EINGABE
-# ============================================
+    # Button: Benutzer kann Exportverzeichnis auswählen
+    ttk.Button(root, text="📁 Exportverzeichnis auswählen", command=select_export_directory).grid(
+        row=11, column=0, pady=(5, 0), padx=(30, 0), sticky="e"
+    )
 
-# Diese Felder werden verwendet, wenn keine URL geparst wird
-# (also im manuellen Modus)
-ttk.Label(root, text="Stadt (z.B. Berlin):").grid(row=5, column=0, sticky="e")
-city_entry = ttk.Entry(root)
-city_entry.insert(0, "Berlin")
-city_entry.grid(row=5, column=1)
+    # Label zeigt das aktuell gewählte Verzeichnis an
+    export_path_label = tk.Label(root, textvariable=export_directory, fg="gray30", anchor="w", wraplength=500)
+    export_path_label.grid(row=11, column=1, sticky="w", padx=(20, 10), pady=(5, 0))
 
-ttk.Label(root, text="Berufs-ID:").grid(row=6, column=0, sticky="e")
-job_id_entry = ttk.Entry(root)
-job_id_entry.insert(0, "7856")
-job_id_entry.grid(row=6, column=1)
+    # Checkbox: Soll das komplette Suchergebnis als JSON-Datei exportiert werden?
+    export_json_checkbox = ttk.Checkbutton(root, text="komplettes Suchergebnis als JSON exportieren", variable=export_json_var)
+    export_json_checkbox.grid(row=12, column=1, sticky="w", pady=(5, 0), padx=(30, 0))
 
-ttk.Label(root, text="Radius (km):").grid(row=7, column=0, sticky="e")
-radius_entry = ttk.Entry(root)
-radius_entry.insert(0, "50")
-radius_entry.grid(row=7, column=1)
+    # Checkbox: Angebotsdetails (Preise, Dauer, Termine) nachladen – nur neue Angebote kosten Requests
+    enrich_details_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(root, text="Angebotsdetails nachladen (für JSON)", variable=enrich_details_var).grid(
+        row=12, column=2, sticky="w", pady=(5, 0)
+    )
 
-ttk.Label(root, text="Breitengrad (lat):").grid(row=8, column=0, sticky="e")
-lat_entry = ttk.Entry(root)
-lat_entry.insert(0, "52.531976")
-lat_entry.grid(row=8, column=1)
 
-ttk.Label(root, text="Längengrad (lon):").grid(row=9, column=0, sticky="e")
-lon_entry = ttk.Entry(root)
-lon_entry.insert(0, "13.386738")
-lon_entry.grid(row=9, column=1)
+    # ============================================
+    # 🧮 Matrix-Suche (GUI)
+    # ============================================
 
-ttk.Label(root, text="Bildungsart (Umschulung = 109):").grid(row=10, column=0, sticky="e")
-bart_entry = ttk.Entry(root)
-bart_entry.insert(0, "109")
-bart_entry.grid(row=10, column=1)
+    def show_sweep_window():
+        """
+        Öffnet ein Fenster für die Matrix-Suche über mehrere Job-IDs, Orte,
+        Radien und Bildungsarten. Das Ergebnis wird als Pivot-Tabelle
+        (Anbieter × Job × Ort) nach Excel exportiert.
+        """
+        sweep_win = tk.Toplevel(root)
+        sweep_win.title("🧮 Matrix-Suche")
+        sweep_win.geometry("620x360")
+
+        ttk.Label(sweep_win, text="Job-IDs (kommagetrennt):").grid(row=0, column=0, sticky="e", padx=5, pady=5)
+        job_ids_entry = ttk.Entry(sweep_win, width=50)
+        job_ids_entry.insert(0, job_id_entry.get())
+        job_ids_entry.grid(row=0, column=1, sticky="we", padx=5, pady=5)
+
+        ttk.Label(sweep_win, text="Orte/PLZ (je Zeile, z. B. Berlin):").grid(row=1, column=0, sticky="ne", padx=5, pady=5)
+        centers_text = tk.Text(sweep_win, height=6, width=50, font=default_font, relief="solid", borderwidth=1)
+        centers_text.grid(row=1, column=1, sticky="we", padx=5, pady=5)
+
+        ttk.Label(sweep_win, text="Radien in km (kommagetrennt):").grid(row=2, column=0, sticky="e", padx=5, pady=5)
+        radii_entry = ttk.Entry(sweep_win, width=50)
+        radii_entry.insert(0, "25, 50, 100")
+        radii_entry.grid(row=2, column=1, sticky="we", padx=5, pady=5)
+
+        ttk.Label(sweep_win, text="Bildungsarten (kommagetrennt):").grid(row=3, column=0, sticky="e", padx=5, pady=5)
+        barts_entry = ttk.Entry(sweep_win, width=50)
+        barts_entry.insert(0, "109")
+        barts_entry.grid(row=3, column=1, sticky="we", padx=5, pady=5)
+
+        def split_list(text):
+            return [part.strip() for part in re.split(r"[,;\n]", text) if part.strip()]
+
+        def start_sweep():
+            inputs = (
+                split_list(job_ids_entry.get()),
+                split_list(centers_text.get("1.0", tk.END)),
+                split_list(radii_entry.get()),
+                split_list(barts_entry.get()),
+            )
+            if not all(inputs):
+                messagebox.showwarning("Keine Suche", "Bitte mindestens eine Job-ID, einen Ort, einen Radius und eine Bildungsart angeben.")
+                return
 
+            progress_win, progress_listbox, ok_button = show_progress_window()
 
-# ============================================
-# 💾 EXPORT-EINSTELLUNGEN
-# ============================================
+            def add_progress(msg):
+                progress_listbox.insert(tk.END, msg)
+                progress_listbox.yview_moveto(1)
 
-# Variable speichert das aktuelle Exportverzeichnis
-export_directory = tk.StringVar(value=os.getcwd())
+            def task():
+                # Orte werden im Hintergrund aufgelöst (Ortsverzeichnis lädt beim ersten Zugriff)
+                try:
+                    plan = plan_sweep(*inputs)
+                except ValueError as e:
+                    root.after(0, lambda e=e: (progress_win.destroy(), messagebox.showerror("Eingabefehler", str(e))))
+                    return
+                try:
+                    cell_count = sum(len(g['radii']) for g in plan)
+                    root.after(0, add_progress, f"Matrix-Suche: {cell_count} Suchzellen in {len(plan)} Gruppen")
+                    pivot, manifest, offer_count = run_sweep_with_manifest(
+                        plan, progress=lambda m: root.after(0, add_progress, m),
+                        delta=delta_crawl_var.get(), memory_cap_mb=gui_memory_cap(), store=store_runs_var.get())
+                    root.after(0, add_progress, f"✅ {offer_count} eindeutige Angebote von {len(pivot)} Anbietern")
+
+                    now = datetime.now()
+                    filename = os.path.join(
+                        export_directory.get(),
+                        f"{now.strftime('%Y-%m-%d')}_Matrix_Arbeitsagentur_Ausbildungssuche_{now.strftime('%H-%M-%S')}.xlsx"
+                    )
 
-# Button: Benutzer kann Exportverzeichnis auswählen
-ttk.Button(root, text="📁 Exportverzeichnis auswählen", command=select_export_directory).grid(
-    row=11, column=0, pady=(5, 0), padx=(30, 0), sticky="e"
-)
+                    def finalize_export():
+                        try:
+                            os.makedirs(export_directory.get(), exist_ok=True)
+                            for path in export_sweep(pivot, filename, manifest):
+                                add_progress(f"Gespeichert als:\n{path}")
+                            messagebox.showinfo("Fertig", f"Matrix mit {len(pivot)} Anbietern wurde exportiert.")
+                            progress_win.destroy()
+                        except Exception as e:
+                            messagebox.showerror("Fehler beim Export", str(e))
+
+                    root.after(0, lambda: ok_button.config(state="normal", command=finalize_export))
+                except Exception as e:
+                    traceback.print_exc()
+                    root.after(0, lambda e=e: messagebox.showerror("Fehler", str(e)))
 
-# Label zeigt das aktuell gewählte Verzeichnis an
-export_path_label = tk.Label(root, textvariable=export_directory, fg="gray30", anchor="w", wraplength=500)
-export_path_label.grid(row=11, column=1, sticky="w", padx=(20, 10), pady=(5, 0))
+            threading.Thread(target=task, daemon=True).start()
 
-# Checkbox: Soll das komplette Suchergebnis als JSON-Datei exportiert werden?
-export_json_checkbox = ttk.Checkbutton(root, text="komplettes Suchergebnis als JSON exportieren", variable=export_json_var)
-export_json_checkbox.grid(row=12, column=1, sticky="w", pady=(5, 0), padx=(30, 0))
+        ttk.Button(sweep_win, text="Matrix-Suche starten", command=start_sweep).grid(row=4, column=0, columnspan=2, pady=15)
 
 
-# ============================================
-# ▶️ START-BUTTON UND HAUPTAKTION
-# ============================================
+    # ============================================
+    # ▶️ START-BUTTON UND HAUPTAKTION
+    # ============================================
 
-def on_start_button_click():
-    """
-    Wird aufgerufen, wenn der Benutzer auf 'Start' klickt.
-    - Prüft Eingaben
-    - Startet die Hauptlogik (einzeln oder mehrfach)
-    """
-    # Eingaben überprüfen
-    if not validate_inputs():
-        return
+    def on_start_button_click():
+        """
+        Wird aufgerufen, wenn der Benutzer auf 'Start' klickt.
+        - Prüft Eingaben
+        - Startet die Hauptlogik (einzeln oder mehrfach)
+        """
+        # Eingaben überprüfen
+        if not validate_inputs():
+            return
     
-    # Wenn Mehrfach-Link-Modus aktiv ist
-    if multi_url_mode.get():
-        urls = multi_url_text.get("1.0", tk.END).strip().splitlines()
-        urls = [url.strip() for url in urls if url.strip()]
+        # Wenn Mehrfach-Link-Modus aktiv ist
+        if multi_url_mode.get():
+            lines = multi_url_text.get("1.0", tk.END).splitlines()
+            links, invalid, duplicates = validate_links(lines)
+
+            # Alle ungültigen Zeilen auf einmal melden
+            if invalid:
+                shown = "\n".join(f"Zeile {n}: {msg}" for n, _, msg in invalid[:15])
+                if len(invalid) > 15:
+                    shown += f"\n… und {len(invalid) - 15} weitere"
+                if not links:
+                    messagebox.showerror("Ungültige Links", shown)
+                    return
+                if not messagebox.askyesno(
+                    "Ungültige Links",
+                    f"{len(invalid)} von {len(invalid) + len(links) + duplicates} Links sind ungültig:\n\n{shown}\n\n"
+                    f"Mit den {len(links)} gültigen Links fortfahren?"
+                ):
+                    return
         
-        # Wenn keine gültigen Links eingegeben wurden → Warnung
-        if not urls:
-            messagebox.showwarning("Keine Links", "Bitte geben Sie mindestens einen gültigen Link ein.")
+            # Wenn keine gültigen Links eingegeben wurden → Warnung
+            if not links:
+                messagebox.showwarning("Keine Links", "Bitte geben Sie mindestens einen gültigen Link ein.")
+                return
+            if duplicates:
+                messagebox.showinfo("Doppelte Links", f"{duplicates} Links entsprechen einer bereits enthaltenen Suche und werden übersprungen.")
+
+            # Funktion, um alle Links nacheinander zu verarbeiten
+            def run_all_links():
+                for url, _ in links:
+                    root.after(0, lambda u=url: (
+                        url_entry.config(state="normal"),
+                        url_entry.delete(0, tk.END),
+                        url_entry.insert(0, u),
+                        url_entry.config(state="disabled"),
+                    ))
+                    run_main_logic(url)
+                    time.sleep(2)  # kurze Pause zwischen den Ausführungen
+
+            # Verarbeitung in separatem Thread starten (GUI bleibt reaktionsfähig)
+            threading.Thread(target=run_all_links, daemon=True).start()
+
+        elif not use_url_mode.get() and not (lat_entry.get().strip() or lon_entry.get().strip()):
+            # Manuell ohne Koordinaten: erst den Ort nachschlagen (ggf. mit Rückfrage)
+            resolve_place_interactive(city_entry.get(), lambda place: (fill_place_fields(place), run_main_logic()))
+
+        else:
+            # Einzel-Link-Modus: direkt Hauptlogik starten
+            run_main_logic()
+
+    # Start-Button in der GUI
+    ttk.Button(root, text="Start", command=on_start_button_click).grid(row=13, column=0, columnspan=3, pady=15)
+
+    # Button für die Matrix-Suche (mehrere Jobs × Orte)
+    ttk.Button(root, text="🧮 Matrix-Suche", command=show_sweep_window).grid(row=14, column=0, columnspan=3)
+
+    # Optional: gemeinsamen lokalen Dienst nutzen (z. B. http://127.0.0.1:8765)
+    ttk.Label(root, text="Dienst-URL (optional):").grid(row=15, column=0, sticky="e", pady=(10, 0))
+    service_url_var = tk.StringVar(value="")
+    ttk.Entry(root, textvariable=service_url_var, width=40).grid(row=15, column=1, sticky="w", pady=(10, 0))
+
+    # ============================================
+    # 📈 Trendbericht (GUI)
+    # ============================================
+
+    def export_trends():
+        """
+        Exportiert den Trendbericht über alle gespeicherten Läufe
+        in das gewählte Exportverzeichnis.
+        """
+        now = datetime.now()
+        filename = os.path.join(
+            export_directory.get(),
+            f"{now.strftime('%Y-%m-%d')}_Trendbericht_{now.strftime('%H-%M-%S')}.xlsx"
+        )
+        try:
+            os.makedirs(export_directory.get(), exist_ok=True)
+            row_count = export_trend_report(filename)
+        except Exception as e:
+            traceback.print_exc()
+            messagebox.showerror("Fehler beim Export", str(e))
+            return
+        if row_count:
+            messagebox.showinfo("Fertig", f"Trendbericht mit {row_count} Zeilen gespeichert als:\n{filename}")
+        else:
+            messagebox.showwarning("Keine Daten", "Es wurden noch keine Läufe gespeichert.")
+
+    # Checkbox: Läufe in der lokalen Datenbank ablegen (Grundlage für Trendberichte)
+    store_runs_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(root, text="Lauf speichern (Trends)", variable=store_runs_var).grid(
+        row=16, column=1, sticky="w", pady=(10, 0)
+    )
+    ttk.Button(root, text="📈 Trendbericht", command=export_trends).grid(row=16, column=2, sticky="w", pady=(10, 0))
+
+    def search_stored():
+        """
+        Volltextsuche über alle gespeicherten Läufe; Treffer erscheinen in der Ergebnisansicht.
+        """
+        text = simpledialog.askstring(
+            "Gespeicherte Angebote durchsuchen",
+            "Suchbegriffe (Präfixe möglich, 'oder' für Alternativen):", parent=root
+        )
+        if not text:
+            return
+        try:
+            offers = search_stored_offers(text)
+        except sqlite3.OperationalError as e:
+            messagebox.showerror("Ungültige Suche", str(e))
+            return
+        if not offers:
+            messagebox.showinfo("Keine Treffer", f"Keine gespeicherten Angebote zu '{text}' gefunden.")
             return
+        win = show_results_window(offers, count_offers_by_provider(offers.values()))
+        win.title(f"Suche '{text}' – {len(offers)} Treffer" + (" (gekürzt)" if len(offers) >= FTS_DEFAULT_LIMIT else ""))
 
-        # Funktion, um alle Links nacheinander zu verarbeiten
-        def run_all_links():
-            for url in urls:
-                url_entry.config(state="normal")
-                url_entry.delete(0, tk.END)
-                url_entry.insert(0, url)
-                run_main_logic()
-                time.sleep(2)  # kurze Pause zwischen den Ausführungen
+    ttk.Button(root, text="🔍 Gespeicherte Angebote durchsuchen", command=search_stored).grid(
+        row=18, column=0, columnspan=3, pady=(10, 0)
+    )
+
+    # Checkbox: Wiederholte Suchen nur bei Änderungen vollständig neu laden
+    delta_crawl_var = tk.BooleanVar(value=DELTA_CRAWL)
+    ttk.Checkbutton(root, text="Nur Änderungen abrufen (Delta)", variable=delta_crawl_var).grid(
+        row=19, column=1, sticky="w", pady=(5, 0)
+    )
 
-        # Verarbeitung in separatem Thread starten (GUI bleibt reaktionsfähig)
-        threading.Thread(target=run_all_links, daemon=True).start()
+    # Optionale Speichergrenze für große Suchen (Angebote darüber → temporäre Datei)
+    ttk.Label(root, text="Speichergrenze MB (optional):").grid(row=20, column=0, sticky="e", pady=(5, 0))
+    memory_cap_var = tk.StringVar(value="")
+    ttk.Entry(root, textvariable=memory_cap_var, width=10).grid(row=20, column=1, sticky="w", pady=(5, 0))
 
-    else:
-        # Einzel-Link-Modus: direkt Hauptlogik starten
-        run_main_logic()
+    def gui_memory_cap():
+        """
+        Speichergrenze aus der GUI in MB; leer oder ungültig → MEMORY_CAP_MB.
+        """
+        try:
+            return float(memory_cap_var.get().replace(",", ".")) or None
+        except ValueError:
+            return None
+
+    # Weitere Exportformate (NDJSON parallel zur Suche, die übrigen direkt danach im Hintergrund)
+    export_ndjson_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(root, text="NDJSON (fortlaufend während der Suche)", variable=export_ndjson_var).grid(
+        row=17, column=1, sticky="w", pady=(5, 0)
+    )
+    export_parquet_var = tk.BooleanVar(value=False)
+    ttk.Checkbutton(
+        root, text="Parquet" if pyarrow else "Parquet (pyarrow nicht installiert)", variable=export_parquet_var,
+        state="normal" if pyarrow else "disabled"
+    ).grid(row=17, column=2, sticky="w", pady=(5, 0))
 
-# Start-Button in der GUI
-ttk.Button(root, text="Start", command=on_start_button_click).grid(row=13, column=0, columnspan=3, pady=15)
+    # ============================================
+    # 🔧 INITIALISIERUNG & PROGRAMMSTART
+    # ============================================
 
-# ============================================
-# 🔧 INITIALISIERUNG & PROGRAMMSTART
-# ============================================
+    # Aktiviert oder deaktiviert Eingabefelder je nach aktivem Modus
+    toggle_input_mode()
 
-# Aktiviert oder deaktiviert Eingabefelder je nach aktivem Modus
-toggle_input_mode()
+    # Ortsverzeichnis schon im Hintergrund laden (mit 'DE.txt' einige Sekunden)
+    threading.Thread(target=load_gazetteer, daemon=True).start()
 
-# Startet die Haupt-Event-Schleife der Tkinter-GUI
-root.mainloop()
\ No newline at end of file
+    # Startet die Haupt-Event-Schleife der Tkinter-GUI
+    root.mainloop()
\ No newline at end of file
@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import APISearch
+except ImportError as e:  # Laufzeitabhängigkeiten (requests, pandas …) fehlen
+    APISearch = None
+    _import_error = str(e)
+
+
+def pytest_collection_modifyitems(config, items):
+    if APISearch is None:
+        skip = pytest.mark.skip(reason=f"APISearch nicht importierbar: {_import_error}")
+        for item in items:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def app():
+    return APISearch
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    """
+    Jede Prüfung arbeitet in einem eigenen Verzeichnis (Datenbank, Anbieter-Cache,
+    Autotuning) und mit leerem Such-Cache.
+    """
+    if APISearch is None:
+        yield
+        return
+    monkeypatch.setattr(APISearch, "app_path", lambda name: str(tmp_path / name))
+    monkeypatch.setattr(APISearch, "_page_size", None)
+    monkeypatch.setattr(APISearch, "_provider_resolver", None)
+    APISearch.search_cache.clear()
+    yield
+    APISearch.search_cache.clear()
+
+
+@pytest.fixture
+def mock_api(monkeypatch):
+    """
+    Startet die Mock-API und leitet alle API-Zugriffe dorthin um.
+    Aufruf: mock_api(total_offers=..., latency_ms=...) → Server
+    """
+    servers = []
+
+    def start(**kwargs):
+        server, url = APISearch.start_mock_server(**kwargs)
+        servers.append(server)
+        monkeypatch.setattr(APISearch, "API_URL", url)
+        monkeypatch.setattr(APISearch, "DETAIL_URL", url + "/{angebot_id}")
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def make_offer(offer_id, provider="Anbieter A", title="Fachinformatiker", city="Berlin",
+               lat=52.52, lon=13.40, beginn="2026-01-01", ende="2026-12-31", street="Hauptstr. 1"):
+    return {
+        'id': offer_id,
+        'angebot': {'id': f"a-{offer_id}", 'titel': title, 'bildungsanbieter': {'name': provider}},
+        'adresse': {'ortStrasse': {'name': city, 'strasse': street, 'koordinaten': {'lat': lat, 'lon': lon}}},
+        'beginn': beginn,
+        'ende': ende,
+    }
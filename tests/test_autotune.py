@@ -0,0 +1,34 @@
+import statistics
+
+
+def test_autotune_takes_median_of_samples(app, mock_api):
+    mock_api(total_offers=300)
+    tuning = app.autotune_page_size("Mockstadt", 1, 300, 109, candidates=(50, 100), samples=3, save=False)
+    for size in ("50", "100"):
+        assert len(tuning['latency_samples'][size]) == 3
+        assert tuning['latency'][size] == round(statistics.median(tuning['latency_samples'][size]), 4)
+
+
+def test_autotune_without_save_leaves_file_alone(app, mock_api, tmp_path):
+    mock_api(total_offers=100)
+    app.autotune_page_size("Mockstadt", 1, 300, 109, candidates=(50,), samples=1, save=False)
+    assert not (tmp_path / app.AUTOTUNE_FILE).exists()
+
+
+def test_benchmark_counts_round_trips(app, mock_api):
+    mock_api(total_offers=250)
+    report = app.benchmark_page_sizes("Mockstadt", 1, 300, *app.MOCK_CENTER, 109, [50, 250], repeats=2)
+    assert report[50]['requests'] == 5
+    assert report[250]['requests'] == 1
+    assert report[50]['offers'] == report[250]['offers'] > 0
+    assert app.get_page_size() == app.PAGE_SIZE
+    assert not app.search_cache
+
+
+def test_autotune_benchmark_compares_before_and_after(app):
+    api_url = app.API_URL
+    report = app.run_autotune_benchmark(total_offers=400, latency_ms=0, samples=1)
+    assert report['before']['page_size'] == app.PAGE_SIZE
+    assert report['after']['page_size'] == report['tuning']['page_size']
+    assert report['after']['requests'] <= report['before']['requests']
+    assert app.API_URL == api_url
@@ -0,0 +1,67 @@
+import pytest
+
+RADIUS = 300
+
+
+@pytest.fixture
+def crawl(app, mock_api):
+    """100 Angebote auf 10 Seiten; jeder Aufruf ohne Such-Cache (wie ein neuer Lauf)."""
+    mock_api(total_offers=100)
+    app.set_page_size(10)
+
+    def run(**kwargs):
+        app.search_cache.clear()
+        stats = {}
+        offers = app.get_offers_delta("Mockstadt", 1, RADIUS, *app.MOCK_CENTER, app.DEFAULT_BART,
+                                      stats=stats, **kwargs)
+        return offers, stats
+    return run
+
+
+def change_offer(app, monkeypatch, changed_i):
+    original = app._mock_offer
+
+    def mock_offer(job_id, i, total):
+        offer = original(job_id, i, total)
+        if i == changed_i:
+            offer['angebot']['titel'] = "Geänderter Kurs"
+        return offer
+    monkeypatch.setattr(app, "_mock_offer", mock_offer)
+
+
+def test_first_crawl_stores_every_page(crawl):
+    offers, stats = crawl()
+    assert len(offers) == 100
+    assert (stats['delta'], stats['complete'], stats['requests']) == ("neu", True, 10)
+
+
+def test_sample_is_not_reported_as_complete(app, crawl):
+    crawl()
+    offers, stats = crawl()
+    assert len(offers) == 100
+    assert stats['delta'] == "stichprobe"
+    assert stats['complete'] is False
+    assert stats['requests'] == 2 + app.DELTA_SAMPLE_PAGES
+    assert stats['pages_unverified'] == 10 - stats['requests']
+
+
+def test_middle_page_change_is_found_by_full_check(app, crawl, monkeypatch):
+    crawl()
+    change_offer(app, monkeypatch, 55)
+
+    offers, stats = crawl(verify_all=True)
+    assert (stats['delta'], stats['complete'], stats['requests']) == ("geändert", True, 10)
+    assert (stats['pages_changed'], stats['pages_unchanged']) == (1, 9)
+    assert "Geänderter Kurs" in {o['angebot']['titel'] for o in offers}
+
+    _, stats = crawl(verify_all=True)
+    assert (stats['delta'], stats['pages_changed']) == ("unverändert", 0)
+
+
+def test_sampled_change_fetches_each_page_once(app, crawl, monkeypatch):
+    crawl()
+    change_offer(app, monkeypatch, 55)
+    monkeypatch.setattr(app, "DELTA_SAMPLE_PAGES", 8)  # Stichprobe umfasst alle Seiten
+
+    _, stats = crawl()
+    assert (stats['delta'], stats['complete'], stats['requests']) == ("geändert", True, 10)
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from conftest import make_offer
+
+
+def test_details_are_fetched_and_cached(app, mock_api):
+    mock_api()
+    offers = [make_offer(i) for i in range(4)]
+    enricher = app.DetailEnricher()
+    try:
+        enricher.submit(offers)
+        assert enricher.wait()['fetched'] == 4
+        assert set(enricher.details_for(offers)) == {f"a-{i}" for i in range(4)}
+    finally:
+        enricher.close()
+
+    again = app.DetailEnricher()
+    try:
+        again.submit(offers)
+        stats = again.wait()
+        assert (stats['fetched'], stats['cached']) == (0, 4)
+    finally:
+        again.close()
+
+
+def test_stale_details_are_refetched(app, mock_api):
+    mock_api()
+    conn = app.open_database()
+    stale = (datetime.now() - timedelta(days=app.DETAIL_CACHE_TTL_DAYS + 1)).isoformat(timespec="seconds")
+    conn.execute("INSERT INTO offer_details (angebot_id, fetched_at, payload) VALUES (?, ?, ?)",
+                 ("a-1", stale, app.pack_json({'alt': True})))
+    conn.commit()
+    conn.close()
+
+    enricher = app.DetailEnricher()
+    try:
+        enricher.submit([make_offer(1)])
+        assert enricher.wait()['fetched'] == 1
+        assert 'alt' not in enricher.details_for([make_offer(1)])["a-1"]
+    finally:
+        enricher.close()
+
+
+def test_missing_endpoint_stops_enrichment(app, monkeypatch):
+    calls = []
+    monkeypatch.setattr(app, "fetch_offer_detail", lambda key: calls.append(key) or (404, None))
+    enricher = app.DetailEnricher(max_parallel=1)
+    try:
+        enricher.submit([make_offer(i) for i in range(20)])
+        stats = enricher.wait()
+        assert stats['endpoint_missing']
+        assert len(calls) == app.DETAIL_MISSING_AFTER
+        enricher.submit([make_offer(99)])
+        assert len(enricher.futures) == 20
+    finally:
+        enricher.close()
+
+
+def test_close_is_idempotent_and_stops_executor(app, mock_api):
+    mock_api(latency_ms=50)
+    enricher = app.DetailEnricher(max_parallel=1)
+    enricher.submit([make_offer(i) for i in range(10)])
+    enricher.close()
+    enricher.close()
+    assert enricher.executor._shutdown
+    assert enricher.stats['fetched'] < 10
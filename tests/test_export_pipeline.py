@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+
+import pytest
+
+from conftest import make_offer
+
+
+def run_data(app):
+    offers = {i: make_offer(i) for i in range(1, 4)}
+    return offers, app.count_offers_by_provider(offers.values(), resolve_names=False)
+
+
+def test_finish_writes_only_temp_files_until_commit(app, tmp_path):
+    offers, stats = run_data(app)
+    out = tmp_path / "export"
+    pipeline = app.ExportPipeline(str(out))
+    assert pipeline.finish(str(out / "lauf.xlsx"), offers, stats, "https://example.org", json_export=True)
+    assert all(name.startswith(".~APISearch_") for name in os.listdir(out))
+
+    paths = pipeline.commit()
+    assert sorted(os.path.basename(p) for p in paths) == ["lauf.json", "lauf.xlsx"]
+    assert sorted(os.listdir(out)) == ["lauf.json", "lauf.xlsx"]
+    assert len(json.loads((out / "lauf.json").read_text(encoding="utf-8"))) == 3
+
+
+def test_writers_start_before_commit(app, tmp_path, monkeypatch):
+    offers, stats = run_data(app)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_excel(stats, search_url, path, manifest=None):
+        started.set()
+        release.wait(5)
+        open(path, "wb").close()
+
+    monkeypatch.setattr(app, "export_to_excel", slow_excel)
+    pipeline = app.ExportPipeline(str(tmp_path))
+    pipeline.finish(str(tmp_path / "lauf.xlsx"), offers, stats, "u")
+    assert started.wait(5)                              # läuft schon vor "Export starten"
+    release.set()
+    assert pipeline.commit() == [str(tmp_path / "lauf.xlsx")]
+
+
+def test_abort_after_finish_removes_temp_files(app, tmp_path):
+    offers, stats = run_data(app)
+    pipeline = app.ExportPipeline(str(tmp_path), ndjson=True)
+    pipeline.feed(offers.values())
+    pipeline.finish(str(tmp_path / "lauf.xlsx"), offers, stats, "u", json_export=True, manifest={})
+    pipeline.abort()
+    assert os.listdir(tmp_path) == []
+    with pytest.raises(app.ExportAborted):
+        pipeline.commit()
+
+
+def test_abort_before_finish_leaves_no_files(app, tmp_path):
+    offers, stats = run_data(app)
+    pipeline = app.ExportPipeline(str(tmp_path), ndjson=True)
+    pipeline.feed(offers.values())
+    pipeline.abort()
+    pipeline.feed(offers.values())                      # nach Abbruch wirkungslos
+    assert pipeline.finish(str(tmp_path / "lauf.xlsx"), offers, stats, "u", json_export=True) is False
+    with pytest.raises(app.ExportAborted):
+        pipeline.commit()
+    assert os.listdir(tmp_path) == []
+
+
+def test_ndjson_streams_and_is_committed(app, tmp_path):
+    offers, stats = run_data(app)
+    pipeline = app.ExportPipeline(str(tmp_path), ndjson=True)
+    pipeline.feed(list(offers.values()))
+    pipeline.feed(list(offers.values()))                # Überschneidung → keine Duplikate
+    pipeline.finish(str(tmp_path / "lauf.xlsx"), offers, stats, "u")
+    pipeline.commit()
+    lines = (tmp_path / "lauf.ndjson").read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".~APISearch_")]
+
+
+def test_manifest_is_written_after_export(app, tmp_path):
+    offers, stats = run_data(app)
+    started = app.datetime.now()
+    manifest = app.build_run_manifest({'where': "Berlin", 'job_id': 1, 'radius': 50, 'lat': 52.52, 'lon': 13.4,
+                                       'bart': 109}, "u", started, timings={'gesamt': 1.0})
+    assert manifest['finished_at'] is None
+    assert 'transport' not in manifest                  # z. B. Dienst-Modus: kein eigener Abruf
+
+    pipeline = app.ExportPipeline(str(tmp_path))
+    pipeline.finish(str(tmp_path / "lauf.xlsx"), offers, stats, "u", manifest=manifest)
+    pipeline.commit()
+
+    written = json.loads((tmp_path / ("lauf" + app.MANIFEST_SUFFIX)).read_text(encoding="utf-8"))
+    assert written['finished_at'] >= written['started_at']
+    assert written['timings_s']['export'] >= 0
+    assert written['timings_s']['gesamt'] >= 1.0
+    assert written['exports'] == ["lauf.xlsx", "lauf" + app.MANIFEST_SUFFIX]
+
+
+def test_metadata_sheet_without_providers(app, tmp_path):
+    pd = pytest.importorskip("pandas")
+    pipeline = app.ExportPipeline(str(tmp_path))
+    pipeline.finish(str(tmp_path / "leer.xlsx"), {}, {}, "https://example.org")
+    pipeline.commit()
+
+    sheets = pd.read_excel(tmp_path / "leer.xlsx", sheet_name=None)
+    assert sheets["Sheet1"].empty
+    assert list(sheets["Sheet1"].columns)[:2] == ["Anbieter", "Anzahl Angebote"]
+    assert sheets["Metadaten"]["Wert"].tolist() == ["https://example.org"]
@@ -0,0 +1,27 @@
+from conftest import make_offer
+
+
+def stats(app, offers):
+    return app.count_offers_by_provider(offers, resolve_names=False)["Anbieter A"]
+
+
+def test_reposted_offer_is_collapsed(app):
+    p = stats(app, [make_offer(1), make_offer(2)])
+    assert (p['count'], p['collapsed_count']) == (2, 1)
+
+
+def test_different_street_is_kept(app):
+    # Zwei Standorte derselben Stadt sind keine Duplikate
+    p = stats(app, [make_offer(1, street="Hauptstr. 1"), make_offer(2, street="Bahnhofstr. 5")])
+    assert (p['count'], p['collapsed_count']) == (2, 2)
+
+
+def test_missing_dates_are_not_collapsed(app):
+    # Ohne Termin lassen sich Duplikate nicht von weiteren Terminen unterscheiden
+    p = stats(app, [make_offer(1, beginn=None, ende=None), make_offer(2, beginn=None, ende=None)])
+    assert (p['count'], p['collapsed_count']) == (2, 2)
+
+
+def test_one_date_is_enough_to_collapse(app):
+    p = stats(app, [make_offer(1, ende=None), make_offer(2, ende=None)])
+    assert (p['count'], p['collapsed_count']) == (2, 1)
@@ -0,0 +1,64 @@
+import sqlite3
+
+from conftest import make_offer
+
+PARAMS = {'job_id': 1, 'where': "Berlin", 'radius': 50, 'bart': 109}
+
+# Schema der Datenbank vor DB_SCHEMA_VERSION 1: Volltextindex mit eigenen Texten
+LEGACY_SCHEMA = """
+CREATE TABLE offers (offer_id TEXT PRIMARY KEY, provider TEXT NOT NULL, payload BLOB NOT NULL);
+CREATE VIRTUAL TABLE offers_fts USING fts5(titel, anbieter, ort);
+"""
+
+
+def titles(offers):
+    return sorted(offer['angebot']['titel'] for offer in offers.values())
+
+
+def test_search_finds_stored_offers(app):
+    app.store_run(PARAMS, [make_offer(1, title="Fachinformatiker Anwendungsentwicklung", city="Köln"),
+                           make_offer(2, title="Kaufmann Büromanagement", city="Berlin")])
+
+    assert titles(app.search_stored_offers("fachinf köln")) == ["Fachinformatiker Anwendungsentwicklung"]
+    assert len(app.search_stored_offers("fachinformatiker oder kaufmann")) == 2
+
+
+def test_updated_offer_replaces_index_entry(app):
+    app.store_run(PARAMS, [make_offer(1, title="Fachinformatiker")])
+    app.store_run(PARAMS, [make_offer(1, title="Mechatroniker")])
+
+    assert app.search_stored_offers("fachinformatiker") == {}
+    assert titles(app.search_stored_offers("mechatroniker")) == ["Mechatroniker"]
+
+
+def test_legacy_database_is_migrated(app, tmp_path):
+    db_path = str(tmp_path / "legacy.db")
+    offer = make_offer(7, title="Industriemechaniker", city="Hamburg")
+    legacy = sqlite3.connect(db_path)
+    legacy.executescript(LEGACY_SCHEMA)
+    legacy.execute("INSERT INTO offers (offer_id, provider, payload) VALUES (?, ?, ?)",
+                   ("7", "Anbieter A", app.pack_json(offer)))
+    legacy.execute("INSERT INTO offers_fts (rowid, titel, anbieter, ort) VALUES (1, 'veraltet', '', '')")
+    legacy.commit()
+    legacy.close()
+
+    conn = app.open_database(db_path)
+    try:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == app.DB_SCHEMA_VERSION
+        assert conn.execute("SELECT titel, ort FROM offers").fetchone() == ("Industriemechaniker", "Hamburg")
+    finally:
+        conn.close()
+    assert titles(app.search_stored_offers("industriemech hamburg", db_path=db_path)) == ["Industriemechaniker"]
+    assert app.search_stored_offers("veraltet", db_path=db_path) == {}
+
+
+def test_rebuild_works_in_batches(app):
+    app.store_run(PARAMS, [make_offer(i, title=f"Kurs {i}") for i in range(1, 8)])
+    conn = app.open_database()
+    with conn:
+        conn.execute("INSERT INTO offers_fts (offers_fts) VALUES ('delete-all')")
+    conn.close()
+    assert app.search_stored_offers("kurs") == {}
+
+    assert app.rebuild_fts_index(batch_size=3) == 7
+    assert len(app.search_stored_offers("kurs")) == 7
@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+
+GEONAMES_ROWS = [
+    # Land, PLZ, Ort, Bundesland, Code, Kreis, Code, Gemeinde, Code, lat, lon, Genauigkeit
+    ("DE", "10115", "Berlin", "Berlin", "BE", "", "", "", "", "52.5323", "13.3846", "4"),
+    ("DE", "12623", "Berlin", "Berlin", "BE", "", "", "", "", "52.5003", "13.6205", "4"),
+    ("DE", "96465", "Neustadt", "Bayern", "BY", "Landkreis Coburg", "", "", "", "50.3299", "11.1209", "4"),
+    ("DE", "01844", "Neustadt", "Sachsen", "SN", "Landkreis Sächsische Schweiz-Osterzgebirge", "", "", "", "51.0243", "14.2138", "4"),
+    ("DE", "67433", "Neustadt an der Weinstraße", "Rheinland-Pfalz", "RP", "", "", "", "", "49.3501", "8.1389", "4"),
+]
+
+
+@pytest.fixture
+def geonames(app, tmp_path, monkeypatch):
+    (tmp_path / app.GEONAMES_FILE).write_text(
+        "".join("\t".join(row) + "\n" for row in GEONAMES_ROWS), encoding="utf-8")
+    monkeypatch.setattr(app, "_gazetteer", None)
+    yield
+    app._gazetteer = None
+
+
+def test_postcodes_of_one_place_are_merged(app, geonames):
+    place = app.resolve_place("Berlin")
+    assert place['where'] == "Berlin"
+    assert place['lat'] == pytest.approx((52.5323 + 52.5003) / 2)
+
+
+def test_same_named_places_are_kept_apart(app, geonames):
+    with pytest.raises(app.AmbiguousPlaceError) as info:
+        app.resolve_place("Neustadt")
+    candidates = info.value.candidates
+    assert sorted(p.region for p in candidates) == [
+        "Landkreis Coburg, Bayern", "Landkreis Sächsische Schweiz-Osterzgebirge, Sachsen"]
+    # Kein gemittelter Phantom-Ort zwischen beiden
+    assert {round(p.lat, 4) for p in candidates} == {50.3299, 51.0243}
+
+
+def test_postcode_picks_one_of_the_same_named_places(app, geonames):
+    place = app.resolve_place("96465")
+    assert (place['where'], place['lat']) == ("Neustadt", 50.3299)
+
+
+def test_exact_name_wins_over_longer_prefix_matches(app, monkeypatch):
+    monkeypatch.setattr(app, "_gazetteer", None)
+    assert app.resolve_place("Köln")['where'] == "Köln"
+
+
+def test_ambiguous_prefix_is_not_guessed(app, monkeypatch):
+    monkeypatch.setattr(app, "_gazetteer", None)
+    with pytest.raises(app.AmbiguousPlaceError) as info:
+        app.resolve_place("Frankf")
+    assert {p.name for p in info.value.candidates} >= {"Frankfurt am Main", "Frankfurt (Oder)"}
+    # Für Matrix-Suche und Dienst: verständliche Fehlermeldung
+    with pytest.raises(ValueError, match="mehrdeutig"):
+        app.resolve_center("Frankf")
+
+
+def test_unknown_place(app, monkeypatch):
+    monkeypatch.setattr(app, "_gazetteer", None)
+    assert app.resolve_place("Xyzzyhausen") is None
+
+
+class FakeRoot:
+    """Ersetzt das Tk-Hauptfenster: after() ruft sofort auf, config() merkt sich den Cursor."""
+    def __init__(self):
+        self.cursor = None
+
+    def after(self, delay, func, *args):
+        func(*args)
+
+    def config(self, cursor=None):
+        self.cursor = cursor
+
+
+def resolve_interactive(app, monkeypatch, resolve):
+    root = FakeRoot()
+    monkeypatch.setattr(app, "root", root, raising=False)
+    monkeypatch.setattr(app, "resolve_place", resolve)
+    finished = threading.Event()
+    calls = {}
+
+    def record(name):
+        def call(*args):
+            calls[name] = args
+            finished.set()
+        return call
+    monkeypatch.setattr(app.messagebox, "showerror", record("error"))
+    monkeypatch.setattr(app.messagebox, "showwarning", record("warning"))
+    app.resolve_place_interactive("Neustadt", record("resolved"))
+    assert finished.wait(5)
+    return root, calls
+
+
+def test_ambiguous_place_opens_chooser(app, monkeypatch):
+    candidates = [app.Place("Neustadt", 49.35, 8.14, "RP"), app.Place("Neustadt", 50.33, 11.12, "BY")]
+
+    def ambiguous(text):
+        raise app.AmbiguousPlaceError(text, candidates)
+    monkeypatch.setattr(app, "ask_place_choice", lambda text, offered: offered[1])
+
+    root, calls = resolve_interactive(app, monkeypatch, ambiguous)
+    assert calls["resolved"] == ({'where': "Neustadt", 'lat': 50.33, 'lon': 11.12},)
+    assert root.cursor == ""
+
+
+def test_lookup_error_is_reported(app, monkeypatch):
+    def broken(text):
+        raise OSError("Ortsverzeichnis nicht lesbar")
+
+    root, calls = resolve_interactive(app, monkeypatch, broken)
+    assert "Ortsverzeichnis nicht lesbar" in calls["error"][1]
+    assert "resolved" not in calls
+    assert root.cursor == ""
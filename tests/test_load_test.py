@@ -0,0 +1,53 @@
+from conftest import make_offer
+
+
+def test_load_test_runs_full_pipeline_and_restores_state(app):
+    api_url, detail_url = app.API_URL, app.DETAIL_URL
+    app.store_cached_offers("Berlin", 1, 50, 52.52, 13.40, 109, [make_offer(1)])
+
+    report = app.run_load_test(users=2, links_per_user=2, rate=100, page_size=20,
+                               total_offers=60, latency_ms=0, sample_interval=0.05)
+
+    assert report['runs'] == 4
+    assert report['error_rate'] == 0
+    assert report['page_size'] == 20
+    assert report['memory_mb']['peak'] >= report['memory_mb']['start']
+    assert (app.API_URL, app.DETAIL_URL, app._page_size) == (api_url, detail_url, None)
+    # fremder Cache-Eintrag bleibt, Einträge des Lasttests sind entfernt
+    assert list(app.search_cache) == [app._search_cache_key("Berlin", 1, 52.52, 13.40, 109)]
+
+
+def test_link_pipeline_writes_export_and_manifest(app, mock_api, tmp_path):
+    mock_api(total_offers=30)
+    (link,) = app.load_test_links(1, 1, radius=app.MOCK_MAX_DISTANCE_KM)[0]
+
+    result = app.run_link_pipeline(link, str(tmp_path / "export"))
+
+    assert result['offers_unique'] == 30
+    assert len(result['exports']) == 2
+    assert any(path.endswith(".xlsx") for path in result['exports'])
+    assert any(path.endswith(app.MANIFEST_SUFFIX) for path in result['exports'])
+
+
+def test_mock_honors_radius(app, mock_api):
+    mock_api(total_offers=300)
+    page = app.search(0, "Mockstadt", 1, 100, app.DEFAULT_BART, size=1000)
+    assert page['page']['totalElements'] == 101
+    assert len(page['_embedded']['termine']) == 101
+
+
+def test_link_pipeline_removes_spill_file(app, mock_api, tmp_path, monkeypatch):
+    mock_api(total_offers=60)
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+    monkeypatch.setattr(app.tempfile, "tempdir", str(spill_dir))
+    spilled = []
+    close = app.OfferStore.close
+    monkeypatch.setattr(app.OfferStore, "close", lambda store: (spilled.append(store._path), close(store)))
+    (link,) = app.load_test_links(1, 1, radius=app.MOCK_MAX_DISTANCE_KM)[0]
+
+    result = app.run_link_pipeline(link, str(tmp_path / "export"), memory_cap_mb=0.001)
+
+    assert result['offers_unique'] == 60
+    assert spilled and spilled[0].startswith(str(spill_dir))   # wirklich ausgelagert …
+    assert list(spill_dir.iterdir()) == []                      # … und wieder gelöscht
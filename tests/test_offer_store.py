@@ -0,0 +1,97 @@
+import os
+
+from conftest import make_offer
+
+
+def test_keys_are_normalized_to_str(app):
+    store = app.OfferStore(memory_cap_mb=0.001)
+    try:
+        for i in range(50):
+            store[i] = make_offer(i)
+        assert store._conn is not None            # Teil liegt auf der Festplatte
+        assert 3 in store and "3" in store
+        assert 49 in store and "49" in store
+        assert store[49]['id'] == 49
+        assert set(store.keys()) == {str(i) for i in range(50)}
+        assert len(store) == 50
+    finally:
+        store.close()
+
+
+def test_overwrite_on_disk_keeps_count(app):
+    store = app.OfferStore(memory_cap_mb=0.0001)
+    try:
+        store[1] = make_offer(1, title="Alt")
+        store[2] = make_offer(2)
+        store["2"] = make_offer(2, title="Neu")
+        assert len(store) == 2
+        assert store[2]['angebot']['titel'] == "Neu"
+    finally:
+        store.close()
+
+
+def test_bloom_filter_grows_beyond_expected_count(app):
+    store = app.OfferStore(memory_cap_mb=1, expected_count=10)
+    try:
+        assert store._blooms[0].capacity == app.BLOOM_INITIAL_CAPACITY
+        big = app.OfferStore(memory_cap_mb=1, expected_count=50000)
+        assert big._blooms[0].capacity == 50000
+        big.close()
+
+        small = app.OfferStore(memory_cap_mb=5)
+        small._blooms = [app.BloomFilter(capacity=20)]
+        for i in range(100):
+            small[i] = make_offer(i)
+        assert len(small._blooms) > 1
+        assert all(i in small for i in range(100))
+        assert 1000 not in small
+        small.close()
+    finally:
+        store.close()
+
+
+def test_sweep_pivot_from_cell_counts(app, mock_api, monkeypatch):
+    mock_api(total_offers=120)
+    plan = app.plan_sweep(["1"], ["Mockstadt_13.404954_52.520008"], ["300", "100"], ["109"])
+    store, cells = app.run_sweep(plan, memory_cap_mb=0.01)
+    try:
+        assert all(cell.provider_counts for cell in cells)
+        pivot = app.build_sweep_pivot(store, cells)
+        assert pivot[("Gesamt (eindeutig)", "", "", "")].sum() == len(store)
+        wide = next(c for c in cells if c.radius == 300)
+        assert pivot[(1, "Mockstadt", 300, 109)].sum() == len(wide.offer_ids)
+        assert not app.search_cache                  # begrenzter Speicher → Cache geleert
+    finally:
+        store.close()
+
+
+def spilled_store(app):
+    store = app.OfferStore(memory_cap_mb=0.001)
+    for i in range(1, 50):
+        store[i] = make_offer(i)
+    assert os.path.exists(store._path)
+    return store
+
+
+def test_run_store_closes_after_task_and_window(app):
+    store = spilled_store(app)
+    run_offers = app.RunOfferStore()
+    run_offers.offers = store
+    run_offers.index = app.build_offer_index(store)
+    run_offers.release("task")
+    assert os.path.exists(store._path)              # Fenster (Export, Ergebnisse) nutzt ihn noch
+    path = store._path
+    run_offers.release("window")
+    assert not os.path.exists(path)
+    assert len(run_offers.index.result().rows) == 49
+
+
+def test_run_store_closes_when_window_closed_first(app):
+    store = spilled_store(app)
+    path = store._path
+    run_offers = app.RunOfferStore()
+    run_offers.offers = store
+    run_offers.release("window")                    # Abbruch während der Suche
+    assert os.path.exists(path)
+    run_offers.release("task")
+    assert not os.path.exists(path)
@@ -0,0 +1,33 @@
+from conftest import make_offer
+
+
+def sample_offers():
+    return [make_offer(i, provider=f"Anbieter {i % 7} GmbH", title=f"Kurs {i % 3}",
+                       beginn=f"2026-0{1 + i % 5}-01") for i in range(300)]
+
+
+def test_parallel_matches_serial(app, monkeypatch):
+    monkeypatch.setattr(app, "PARALLEL_AGGREGATION_THRESHOLD", 10)
+    monkeypatch.setattr(app, "PARALLEL_NORMALIZE_THRESHOLD", 2)
+    offers = sample_offers()
+    serial = app.count_offers_by_provider(offers)
+    parallel = app.count_offers_by_provider_parallel(offers, workers=2)
+    assert parallel.keys() == serial.keys()
+    for name in serial:
+        assert parallel[name]['count'] == serial[name]['count']
+        assert parallel[name]['collapsed_count'] == serial[name]['collapsed_count']
+        assert parallel[name]['variants'] == serial[name]['variants']
+
+
+def test_parallel_name_resolution_matches_serial(app, monkeypatch):
+    names = ["WBS TRAINING AG", "WBS Training AG Berlin", "IT Akademie GmbH", "IT Akademie Dresden Nord"]
+    serial = app.resolve_provider_names(names)
+
+    monkeypatch.setattr(app, "_provider_resolver", None)
+    monkeypatch.setattr(app, "PARALLEL_NORMALIZE_THRESHOLD", 2)
+    assert app.resolve_provider_names(names, workers=2) == serial
+
+
+def test_process_pool_uses_spawn(app):
+    with app._process_pool(1) as pool:
+        assert pool._mp_context.get_start_method() == "spawn"
@@ -0,0 +1,59 @@
+import json
+import threading
+
+
+def resolver(app, tmp_path):
+    return app.ProviderResolver(cache_path=str(tmp_path / "cache.json"),
+                                mapping_path=str(tmp_path / "mapping.json"))
+
+
+def test_variants_are_merged(app, tmp_path):
+    r = resolver(app, tmp_path)
+    assert r.resolve("WBS TRAINING AG") == r.resolve("WBS Training AG") == r.resolve("WBS Training AG Berlin")
+    assert r.resolve("Ganz anderer Anbieter e.V.") == "Ganz anderer Anbieter e.V."
+
+
+def test_canonical_name_is_stable(app, tmp_path):
+    r = resolver(app, tmp_path)
+    first = r.resolve("WBS Training AG Berlin")
+    # Kürzere Varianten tauchen später auf – der Name bleibt trotzdem
+    assert r.resolve("WBS TRAINING AG") == first
+    assert r.resolve("WBS Training") == first
+    r.save()
+
+    reloaded = resolver(app, tmp_path)
+    assert reloaded.resolve("WBS Training") == first
+    assert reloaded.resolve("WBS TRAINING AG") == first
+    assert reloaded.names == r.names
+
+
+def test_groups_do_not_grow_transitively(app, tmp_path):
+    r = resolver(app, tmp_path)
+    base = r.resolve("IT Akademie GmbH")
+    assert r.resolve("IT Akademie Dresden Nord") == base       # Standortzusatz
+    # Nur dem zweiten Namen ähnlich, nicht dem kanonischen → eigene Gruppe
+    assert r.resolve("IT Akadamie Dresden Nord") != base
+
+
+def test_mapping_overrides_canonical_name(app, tmp_path):
+    (tmp_path / "mapping.json").write_text(json.dumps({"WBS Training AG": "WBS Gruppe"}), encoding="utf-8")
+    r = resolver(app, tmp_path)
+    assert r.resolve("WBS TRAINING AG") == "WBS Gruppe"
+    assert r.resolve("WBS Training AG Berlin") == "WBS Gruppe"
+
+
+def test_malformed_mapping_is_ignored(app, tmp_path, capsys):
+    (tmp_path / "mapping.json").write_text("{kein json", encoding="utf-8")
+    r = resolver(app, tmp_path)
+    assert r.resolve("WBS Training AG") == "WBS Training AG"
+    assert "Anbieter-Mapping" in capsys.readouterr().out
+
+
+def test_singleton_is_created_once(app):
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(app.get_provider_resolver())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len({id(r) for r in seen}) == 1
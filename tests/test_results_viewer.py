@@ -0,0 +1,39 @@
+from conftest import make_offer
+
+
+def offers_by_id(*offers):
+    return {offer['id']: offer for offer in offers}
+
+
+def test_index_is_built_in_background(app):
+    offers = offers_by_id(
+        make_offer(1, provider="WBS Training AG", title="Fachinformatiker", city="Köln"),
+        make_offer(2, provider="Karriere Tutor GmbH", title="Kaufmann", city="Berlin"),
+    )
+    index = app.build_offer_index(offers).result(timeout=10)
+
+    assert len(index.rows) == 2
+    assert [index.rows[i][2] for i in index.query("koeln")] == ["Köln"]
+    assert [index.rows[i][1] for i in index.query(provider="Karriere Tutor GmbH")] == ["Kaufmann"]
+
+
+def test_window_stays_while_scrolling_inside(app):
+    assert app.viewer_window_offset(0, app.VIEWER_WINDOW, 10_000, 0.0, 0.05) is None
+    assert app.viewer_window_offset(200, app.VIEWER_WINDOW, 10_000, 0.4, 0.45) is None
+
+
+def test_window_moves_forward_and_back(app):
+    window = app.VIEWER_WINDOW
+    forward = app.viewer_window_offset(0, window, 10_000, 0.88, 0.92)
+    assert forward == int(0.88 * window) - app.VIEWER_CHUNK
+
+    backward = app.viewer_window_offset(1000, window, 10_000, 0.02, 0.06)
+    assert backward == 1000 + int(0.02 * window) - app.VIEWER_CHUNK
+
+
+def test_window_is_clamped_at_the_end(app):
+    window = app.VIEWER_WINDOW
+    total = window + 50
+    assert app.viewer_window_offset(0, window, total, 0.95, 0.99) == total - window
+    # am Ende angekommen: nichts mehr nachzuladen
+    assert app.viewer_window_offset(total - window, window, total, 0.95, 1.0) is None
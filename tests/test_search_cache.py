@@ -0,0 +1,72 @@
+from conftest import make_offer
+
+BERLIN = (52.52, 13.40)
+
+
+def store(app, radius, offers, where="Berlin", job_id=1):
+    app.store_cached_offers(where, job_id, radius, *BERLIN, 109, offers)
+
+
+def test_smaller_radius_is_derived_from_cached_search(app):
+    near = make_offer(1, lat=52.52, lon=13.41)
+    far = make_offer(2, lat=53.55, lon=9.99)  # Hamburg
+    store(app, 300, [near, far])
+
+    assert app.lookup_cached_offers("Berlin", 1, 300, *BERLIN, 109) == [near, far]
+    assert app.lookup_cached_offers("Berlin", 1, 10, *BERLIN, 109) == [near]
+
+
+def test_larger_radius_is_a_miss(app):
+    store(app, 25, [make_offer(1)])
+    assert app.lookup_cached_offers("Berlin", 1, 50, *BERLIN, 109) is None
+    assert app.lookup_cached_offers("Berlin", 2, 25, *BERLIN, 109) is None
+
+
+def test_expired_entries_are_dropped(app, monkeypatch):
+    store(app, 50, [make_offer(1)])
+    monkeypatch.setattr(app, "SEARCH_CACHE_TTL", -1)
+    assert app.lookup_cached_offers("Berlin", 1, 50, *BERLIN, 109) is None
+    assert len(app.search_cache) == 0
+
+
+def test_expired_entry_is_replaced_by_smaller_radius(app, monkeypatch):
+    store(app, 100, [make_offer(1)])
+    monkeypatch.setattr(app, "SEARCH_CACHE_TTL", -1)
+    store(app, 25, [make_offer(2)])
+    monkeypatch.undo()
+    (entry,) = app.search_cache.values()
+    assert entry['radius'] == 25
+
+
+def test_least_recently_used_entry_is_evicted(app, monkeypatch):
+    monkeypatch.setattr(app, "SEARCH_CACHE_MAX_ENTRIES", 2)
+    for job_id in (1, 2):
+        store(app, 50, [make_offer(job_id)], job_id=job_id)
+    assert app.lookup_cached_offers("Berlin", 1, 50, *BERLIN, 109) is not None  # 1 zuletzt genutzt
+    store(app, 50, [make_offer(3)], job_id=3)
+
+    assert app.lookup_cached_offers("Berlin", 2, 50, *BERLIN, 109) is None
+    assert app.lookup_cached_offers("Berlin", 1, 50, *BERLIN, 109) is not None
+    assert app.lookup_cached_offers("Berlin", 3, 50, *BERLIN, 109) is not None
+
+
+def test_second_search_is_served_from_cache(app, mock_api):
+    mock_api(total_offers=120)
+    first, second = {}, {}
+    offers = app.get_all_offers("Mockstadt", 1, 400, *app.MOCK_CENTER, 109, stats=first)
+    again = app.get_all_offers("Mockstadt", 1, 100, *app.MOCK_CENTER, 109, stats=second)
+
+    assert first['complete'] and not first['cache_hit'] and first['requests'] == 6
+    assert second['cache_hit'] and second['requests'] == 0
+    assert len(offers) == 120
+    assert {o['id'] for o in again} <= {o['id'] for o in offers}
+
+
+def test_result_at_known_api_cap_is_not_cached(app, mock_api):
+    mock_api(total_offers=app.API_RESULT_CAP)
+    stats = {}
+    offers = app.get_all_offers("Mockstadt", 1, 400, *app.MOCK_CENTER, 109, stats=stats)
+
+    assert len(offers) == app.API_RESULT_CAP
+    assert stats['capped'] and not stats['complete']
+    assert app.lookup_cached_offers("Mockstadt", 1, 400, *app.MOCK_CENTER, 109) is None
@@ -0,0 +1,76 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from conftest import make_offer
+
+
+def test_refetch_overwrites_stored_offer(app, monkeypatch):
+    monkeypatch.setattr(app, "service_offer_store", app.OrderedDict())
+    app.store_service_offers([make_offer(1, title="Alt")])
+    unique = app.store_service_offers([make_offer(1, title="Neu")])
+    assert unique[1]['angebot']['titel'] == "Neu"
+    assert app.service_offer_store[1][1]['angebot']['titel'] == "Neu"
+
+
+def test_store_is_bounded(app, monkeypatch):
+    monkeypatch.setattr(app, "service_offer_store", app.OrderedDict())
+    monkeypatch.setattr(app, "SERVICE_STORE_MAX_OFFERS", 3)
+    app.store_service_offers([make_offer(i) for i in range(5)])
+    assert list(app.service_offer_store) == [2, 3, 4]
+
+
+def test_expired_offers_are_dropped(app, monkeypatch):
+    monkeypatch.setattr(app, "service_offer_store", app.OrderedDict())
+    now = [1000.0]
+    monkeypatch.setattr(app.time, "monotonic", lambda: now[0])
+    app.store_service_offers([make_offer(1)])
+    now[0] += app.SERVICE_STORE_TTL + 1
+    app.store_service_offers([make_offer(2)])
+    assert list(app.service_offer_store) == [2]
+
+
+def test_invalid_offers_are_not_stored(app, monkeypatch):
+    monkeypatch.setattr(app, "service_offer_store", app.OrderedDict())
+    broken = make_offer(1)
+    broken['angebot']['titel'] = ""
+    assert app.store_service_offers([broken]) == {}
+    assert not app.service_offer_store
+
+
+def test_lookup_by_id_respects_ttl(app, monkeypatch):
+    monkeypatch.setattr(app, "service_offer_store", app.OrderedDict())
+    now = [1000.0]
+    monkeypatch.setattr(app.time, "monotonic", lambda: now[0])
+    app.store_service_offers([make_offer(1)])
+    assert app.get_service_offer(1)['id'] == 1
+    assert app.get_service_offer(2) is None
+    now[0] += app.SERVICE_STORE_TTL + 1
+    assert app.get_service_offer(1) is None
+    assert not app.service_offer_store
+
+
+def test_offer_endpoint_serves_offers_from_earlier_search(app, mock_api, monkeypatch):
+    monkeypatch.setattr(app, "service_offer_store", app.OrderedDict())
+    mock_api(total_offers=5)
+    server = app.ThreadingHTTPServer(("127.0.0.1", 0), app.SearchRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def get(path):
+        with urllib.request.urlopen(base + path, timeout=10) as response:
+            return json.load(response)
+
+    try:
+        result = get(f"/search?beruf=1&ort=Mockstadt_13.404954_52.520008&uk={app.MOCK_MAX_DISTANCE_KM}")
+        offer = result['offers'][0]
+        assert get(f"/offer?id={offer['id']}") == offer
+        with pytest.raises(urllib.error.HTTPError) as missing:
+            get("/offer?id=999999")
+        assert missing.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,48 @@
+import json
+
+from conftest import make_offer
+
+
+def cell(app, where, lat, lon, offer_ids, job_id=1, radius=50, bart=109):
+    return app.SweepCell(job_id, where, radius, bart, lat, lon, set(offer_ids))
+
+
+def test_plan_sweep_groups_radii_and_drops_duplicate_centers(app):
+    plan = app.plan_sweep(["1", "1"], ["Berlin_13.4_52.5", "Berlin_13.4_52.5"], ["25", "50"], ["109"])
+    assert len(plan) == 1
+    assert plan[0]['radii'] == [50, 25]
+
+
+def test_same_named_centers_get_separate_columns(app):
+    store = {
+        1: make_offer(1, provider="A"),
+        2: make_offer(2, provider="A"),
+        3: make_offer(3, provider="B"),
+    }
+    cells = [
+        cell(app, "Neustadt", 49.35, 8.14, [1, 2]),
+        cell(app, "Neustadt", 50.33, 11.12, [3]),
+        cell(app, "Berlin", 52.52, 13.40, [1]),
+    ]
+    pivot = app.build_sweep_pivot(store, cells)
+
+    places = set(pivot.columns.get_level_values("Ort")) - {""}
+    assert places == {"Berlin", "Neustadt (49.3500, 8.1400)", "Neustadt (50.3300, 11.1200)"}
+    assert pivot.loc["A", (1, "Neustadt (49.3500, 8.1400)", 50, 109)] == 2
+    assert pivot.loc["B", (1, "Neustadt (50.3300, 11.1200)", 50, 109)] == 1
+    assert pivot.loc["A", (1, "Neustadt (50.3300, 11.1200)", 50, 109)] == 0
+    assert pivot.loc["A", ("Gesamt (eindeutig)", "", "", "")] == 2
+
+
+def test_sweep_writes_manifest(app, mock_api, tmp_path):
+    mock_api(total_offers=40)
+    plan = app.plan_sweep(["1"], ["Mockstadt_13.404954_52.520008"], ["300", "100"], ["109"])
+    pivot, manifest, offer_count = app.run_sweep_with_manifest(plan)
+    paths = app.export_sweep(pivot, str(tmp_path / "Matrix.xlsx"), manifest)
+
+    assert [p.rsplit("/", 1)[-1] for p in paths] == ["Matrix.xlsx", "Matrix" + app.MANIFEST_SUFFIX]
+    written = json.loads(open(paths[1], encoding="utf-8").read())
+    assert [c['radius'] for c in written['sweep']['cells']] == [300, 100]
+    assert written['counts']['offers_unique'] == offer_count == 40
+    assert written['transport']['requests'] >= 1
+    assert 'export' in written['timings_s'] and written['finished_at']
@@ -0,0 +1,71 @@
+import itertools
+
+import pytest
+
+
+@pytest.fixture(params=["requests", "httpx"])
+def transport(request, app, monkeypatch):
+    """Führt jede Prüfung einmal über die requests-Session und einmal über httpx aus."""
+    if request.param == "requests":
+        monkeypatch.setattr(app, "session", app.create_session())
+        monkeypatch.setattr(app, "http2_client", None)
+    else:
+        client = app._create_http2_client()
+        if client is None:
+            pytest.skip("httpx/h2 nicht installiert")
+        monkeypatch.setattr(app, "http2_client", client)
+    monkeypatch.setattr(app, "API_RETRY_BACKOFF", 0)
+    return request.param
+
+
+def counts_during(app, action):
+    before = app.transport_stats()
+    action()
+    after = app.transport_stats()
+    return {key: after[key] - before[key] for key in ('requests', 'new_connections', 'retries')}
+
+
+def test_new_connections_are_counted(app, mock_api, transport):
+    mock_api(total_offers=5)
+    params = {'page': 0, 'size': 5, 'ids': 1}
+
+    first = counts_during(app, lambda: app.api_get(app.API_URL, params=params))
+    second = counts_during(app, lambda: app.api_get(app.API_URL, params=params))
+
+    assert first['new_connections'] == 1
+    assert second == {'requests': 1, 'new_connections': 0, 'retries': 0}
+
+
+def test_server_errors_are_retried(app, mock_api, transport, monkeypatch):
+    mock_api(total_offers=5, error_rate=0.5)
+    # erster Request scheitert mit 503, alle weiteren gelingen
+    draws = itertools.chain([0.0], itertools.repeat(1.0))
+    monkeypatch.setattr(app.random, "random", lambda: next(draws))
+
+    holder = {}
+    stats = counts_during(app, lambda: holder.setdefault(
+        'response', app.api_get(app.API_URL, params={'page': 0, 'size': 5, 'ids': 1})))
+
+    assert holder['response'].status_code == 200
+    assert stats['retries'] == 1
+
+
+def test_retry_gives_up_after_limit(app, mock_api, transport, monkeypatch):
+    mock_api(total_offers=5, error_rate=1.0)
+    monkeypatch.setattr(app, "API_RETRIES", 2)
+    if transport == "requests":
+        monkeypatch.setattr(app, "session", app.create_session())
+
+    response = app.api_get(app.API_URL, params={'page': 0, 'size': 5, 'ids': 1})
+    assert response.status_code == 503
+
+
+def test_warm_up_runs_once(app, mock_api, transport, monkeypatch):
+    mock_api(total_offers=5)
+    monkeypatch.setattr(app, "_warmed_up", app.threading.Event())
+
+    first = counts_during(app, lambda: app.warm_up_connections(count=2))
+    again = counts_during(app, lambda: app.warm_up_connections(count=2))
+
+    assert first['requests'] >= 1
+    assert again['requests'] == 0
@@ -0,0 +1,79 @@
+import math
+
+from conftest import make_offer
+
+PARAMS = {'job_id': 1, 'where': "Berlin", 'radius': 50, 'bart': 109}
+
+
+def run(app, *providers, params=PARAMS):
+    offers = [make_offer(f"{params['where']}-{p}-{i}", provider=p) for i, p in enumerate(providers)]
+    return app.store_run(params, offers)
+
+
+def status(app):
+    trends, _ = app.trend_report()
+    return dict(zip(trends['provider'], trends['status']))
+
+
+def test_entry_and_exit(app):
+    run(app, "Alpha Schule", "Beta Akademie")
+    run(app, "Alpha Schule", "Gamma Institut")
+    assert status(app) == {"Alpha Schule": "aktiv", "Beta Akademie": "ausgeschieden", "Gamma Institut": "neu"}
+
+
+def test_returning_provider_is_new(app):
+    run(app, "Alpha Schule", "Beta Akademie")
+    run(app, "Alpha Schule")
+    run(app, "Alpha Schule", "Beta Akademie")
+    assert status(app)["Beta Akademie"] == "neu"
+
+
+def test_timeline_separates_missing_from_unmeasured(app, monkeypatch):
+    stamps = iter(["2026-01-01T00:00:00", "2026-02-01T00:00:00", "2026-03-01T00:00:00"])
+
+    class Clock:
+        @staticmethod
+        def now():
+            return Clock
+
+        @staticmethod
+        def isoformat(timespec=None):
+            return next(stamps)
+
+    monkeypatch.setattr(app, "datetime", Clock)
+    hamburg = dict(PARAMS, where="Hamburg")
+    run(app, "Alpha Schule", "Beta Akademie")        # Berlin, Januar
+    run(app, "Alpha Schule", params=hamburg)         # Hamburg, Februar
+    run(app, "Alpha Schule")                         # Berlin, März
+
+    _, timeline = app.trend_report()
+    pivot = app.timeline_pivot(timeline)
+    beta = pivot.loc[(1, "Berlin", 50, 109, "Beta Akademie")]
+    assert beta["2026-01-01T00:00:00"] == 1
+    assert math.isnan(beta["2026-02-01T00:00:00"])   # Berlin im Februar nicht gemessen
+    assert beta["2026-03-01T00:00:00"] == 0          # gemessen, Anbieter fehlt
+    hamburg_alpha = pivot.loc[(1, "Hamburg", 50, 109, "Alpha Schule")]
+    assert math.isnan(hamburg_alpha["2026-01-01T00:00:00"])
+
+
+def test_export_writes_timeline(app, tmp_path):
+    run(app, "Alpha Schule")
+    out = tmp_path / "trend.xlsx"
+    assert app.export_trend_report(str(out)) == 1
+    assert set(app.pd.ExcelFile(out).sheet_names) == {"Trends", "Zeitreihe"}
+
+
+def test_same_named_places_are_separate_segments(app):
+    coburg = dict(PARAMS, where="Neustadt", lat=50.33, lon=11.12)
+    weinstrasse = dict(PARAMS, where="Neustadt", lat=49.35, lon=8.14)
+    run(app, "Alpha Schule", params=coburg)
+    run(app, "Beta Akademie", params=weinstrasse)
+    run(app, "Alpha Schule", params=coburg)
+
+    trends, _ = app.trend_report(region="Neustadt")  # Ortsname passt auf beide
+    segments = dict(zip(trends['region'], trends['provider']))
+    assert segments == {"Neustadt_11.12_50.33": "Alpha Schule", "Neustadt_8.14_49.35": "Beta Akademie"}
+    assert "ausgeschieden" not in set(trends['status'])   # Nachbarort verdrängt niemanden
+
+    trends, _ = app.trend_report(region="Neustadt_8.14_49.35")
+    assert list(trends['provider']) == ["Beta Akademie"]